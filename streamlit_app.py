@@ -1,13 +1,29 @@
 # streamlit_app.py - HTML 렌더링 문제 수정 버전
 
 import streamlit as st
-import requests
-import json
 import datetime
+import inspect
+import os
 import time
-from typing import Dict, List, Optional
-from dataclasses import dataclass
-import pytz
+from typing import Optional, Tuple
+
+import numpy as np
+from streamlit.errors import StreamlitAPIException
+
+from weather_breaker import CircuitBreaker, CircuitOpen
+from weather_cache import ObservationCache, SingleFlight
+from weather_data import DEMO_SOURCE, WeatherData
+from weather_history import ObservationHistory
+from weather_metrics import METRICS, start_metrics_server, timed
+from weather_http import get_upstream_client
+from weather_prefetch import RefreshAheadPrefetcher
+from weather_quota import QuotaScheduler
+from weather_timeouts import AdaptiveTimeouts
+from weather_trace import TraceRecorder, create_recorder, new_session_id
+from weather_forecast import Forecast, condition_main
+from weather_batch import departure_batch, transport_batch
+from weather_service import (CITIES, WeatherService, create_breaker, create_forecast_cache, create_history,
+                             create_observation_cache, create_prefetcher, create_quota, create_timeouts)
 
 # 페이지 설정 - 모바일 최적화
 st.set_page_config(
@@ -67,60 +83,102 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@dataclass
-class WeatherData:
-    """날씨 데이터 클래스"""
-    temperature: float
-    feels_like: float
-    humidity: int
-    pressure: float
-    weather_condition: str
-    weather_description: str
-    wind_speed: float
-    visibility: float
-    sunrise: datetime.datetime = None
-    sunset: datetime.datetime = None
-    timezone_offset: int = 0  # UTC 기준 오프셋 (초)
-    timestamp: datetime.datetime = None
-    source: str = "데모 데이터"
-
-class WeatherApp:
-    """스마트 출퇴근 도우미 메인 클래스"""
+@st.cache_resource
+def get_observation_cache() -> ObservationCache:
+    """모든 세션이 공유하는 관측값 캐시 (5분 TTL, 만료 후 1시간까지 stale 제공, SQLite 저장)"""
+    return create_observation_cache()
+
+@st.cache_resource
+def get_forecast_cache() -> ObservationCache:
+    """모든 세션이 공유하는 예보 캐시 (30분 TTL)"""
+    return create_forecast_cache()
+
+@st.cache_resource
+def get_history() -> Optional[ObservationHistory]:
+    """모든 세션이 공유하는 도시별 관측 이력 (메모리 맵 파일)"""
+    return create_history()
+
+@st.cache_resource
+def get_inflight() -> SingleFlight:
+    """모든 세션이 공유하는 진행 중 업스트림 조회 목록 (같은 도시 동시 조회를 하나로 합침)"""
+    return SingleFlight()
+
+@st.cache_resource
+def get_quota() -> QuotaScheduler:
+    """모든 세션이 공유하는 API 키별 호출 한도 (사용자 조회 > refresh-ahead > 배치)"""
+    return create_quota()
+
+@st.cache_resource
+def get_breaker() -> CircuitBreaker:
+    """모든 세션이 공유하는 업스트림 회로 차단기 (장애 중에는 타임아웃을 기다리지 않음)"""
+    return create_breaker()
+
+@st.cache_resource
+def get_timeouts() -> AdaptiveTimeouts:
+    """모든 세션이 공유하는 엔드포인트별 응답 시간 기반 타임아웃"""
+    return create_timeouts()
+
+@st.cache_resource
+def get_recorder() -> Optional[TraceRecorder]:
+    """WEATHER_TRACE_FILE이 있으면 모든 세션이 공유하는 사용 기록 파일 (없으면 기록 안 함)"""
+    return create_recorder()
+
+# 기온 추이 차트 - st.line_chart는 재실행마다 Altair 차트를 만들고 검증해서 화면에서 가장 비쌈
+# (도시 전환 한 번 CPU의 대부분). 같은 모양의 Vega-Lite 명세를 직접 넘기고 긴 형식 변환은 브라우저에서.
+HISTORY_CHART_SPEC = {
+    "transform": [{"fold": ["기온 (°C)", "체감온도 (°C)"]}],
+    "mark": "line",
+    "encoding": {
+        "x": {"field": "관측", "type": "quantitative", "title": None},
+        "y": {"field": "value", "type": "quantitative", "title": None, "scale": {"zero": False}},
+        "color": {"field": "key", "type": "nominal", "title": None},
+    },
+}
+
+# 탭 전환은 상태를 가진 탭(on_change)이어야 서버가 알 수 있음 (streamlit 1.50+)
+STATEFUL_TABS = "on_change" in inspect.signature(st.tabs).parameters
+# stale 데이터를 보여준 뒤 백그라운드 갱신 완료를 기다리는 최대 시간 (초, 넘으면 다시 실행하지 않음)
+REVALIDATION_POLL = 1.0
+
+def record_event(event: str, value: str, cache: Optional[str] = None):
+    """익명 세션 이벤트 기록 (기록이 꺼져 있으면 아무것도 안 함)"""
+    recorder = get_recorder()
+    if recorder is None:
+        return
+    if "trace_session" not in st.session_state:
+        st.session_state.trace_session = new_session_id()
+    recorder.record(st.session_state.trace_session, event, value, cache)
+
+@st.cache_resource
+def get_prefetcher(_refresh) -> RefreshAheadPrefetcher:
+    """모든 세션이 공유하는 refresh-ahead 프리페처 (만료 30초 전 갱신)"""
+    return create_prefetcher(_refresh, get_observation_cache())
+
+@st.cache_resource
+def get_metrics_server(_service: WeatherService):
+    """WEATHER_METRICS_PORT가 있으면 GET /metrics 서버 시작 (공유 자원의 지표만 읽으므로 첫 세션 것을 사용)"""
+    port = os.environ.get("WEATHER_METRICS_PORT")
+    if not port:
+        return None
+    return start_metrics_server(_service.metrics_text, host=os.environ.get("WEATHER_METRICS_HOST", "127.0.0.1"),
+                                port=int(port))
+
+class WeatherApp(WeatherService):
+    """스마트 출퇴근 도우미 메인 클래스 (조회/추천 로직은 WeatherService)"""
     
     def __init__(self):
-        self.api_key = self.get_api_key()
-        self.backup_data = {
-            "temp": 22,
-            "feels_like": 24,
-            "humidity": 65,
-            "weather": "Clear",
-            "description": "맑음 (데모 데이터)",
-            "wind_speed": 3.2
-        }
-        
-        # 주요 도시별 시간대 매핑
-        self.city_timezones = {
-            'Seoul': 'Asia/Seoul',
-            'Busan': 'Asia/Seoul',
-            'Incheon': 'Asia/Seoul',
-            'Daegu': 'Asia/Seoul',
-            'Daejeon': 'Asia/Seoul',
-            'Gwangju': 'Asia/Seoul',
-            'Tokyo': 'Asia/Tokyo',
-            'Osaka': 'Asia/Tokyo',
-            'Beijing': 'Asia/Shanghai',
-            'Shanghai': 'Asia/Shanghai',
-            'New York': 'America/New_York',
-            'London': 'Europe/London',
-            'Paris': 'Europe/Paris',
-            'Sydney': 'Australia/Sydney',
-            'Los Angeles': 'America/Los_Angeles',
-            'Bangkok': 'Asia/Bangkok',
-            'Singapore': 'Asia/Singapore',
-            'Hong Kong': 'Asia/Hong_Kong',
-            'Mumbai': 'Asia/Kolkata',
-            'Dubai': 'Asia/Dubai'
-        }
+        super().__init__(
+            api_key=self.get_api_key(),
+            cache=get_observation_cache(),
+            forecast_cache=get_forecast_cache(),
+            history=get_history(),
+            http=get_upstream_client(),
+            prefetcher=get_prefetcher(self._refresh_entry),
+            inflight=get_inflight(),
+            quota=get_quota(),
+            breaker=get_breaker(),
+            timeouts=get_timeouts(),
+        )
 
     def get_api_key(self) -> str:
         """API 키 가져오기 - session_state 우선"""
@@ -133,130 +191,14 @@ class WeatherApp:
         except:
             return ""
 
-    def get_weather_icon(self, condition: str) -> str:
-        """날씨 조건에 따른 이모지 아이콘 반환"""
-        icons = {
-            'clear': '☀️',
-            'clouds': '☁️',
-            'rain': '🌧️',
-            'drizzle': '🌦️',
-            'thunderstorm': '⛈️',
-            'snow': '❄️',
-            'mist': '🌫️',
-            'fog': '🌫️',
-            'haze': '🌫️'
-        }
-        condition_lower = condition.lower()
-        for key, icon in icons.items():
-            if key in condition_lower:
-                return icon
-        return '🌤️'
-
-    def get_city_local_time(self, city: str, timezone_offset: int = None) -> tuple:
-        """도시의 현지 시간 반환"""
-        try:
-            # 시간대 매핑에서 찾기
-            timezone_name = self.city_timezones.get(city)
-            
-            if timezone_name:
-                # pytz를 사용한 정확한 시간대
-                tz = pytz.timezone(timezone_name)
-                local_time = datetime.datetime.now(tz)
-            elif timezone_offset:
-                # API에서 받은 오프셋 사용
-                offset_hours = timezone_offset / 3600
-                tz = pytz.FixedOffset(int(offset_hours * 60))
-                local_time = datetime.datetime.now(tz)
-            else:
-                # 기본값: UTC
-                local_time = datetime.datetime.utcnow()
-                timezone_name = "UTC"
-            
-            return local_time, timezone_name
-            
-        except Exception as e:
-            # 오류 시 서울 시간 반환
-            seoul_tz = pytz.timezone('Asia/Seoul')
-            return datetime.datetime.now(seoul_tz), 'Asia/Seoul'
-
-    @st.cache_data(ttl=300)  # 5분 캐시
-    def fetch_weather_data(_self, city: str, api_key: str = None) -> Optional[WeatherData]:
-        """날씨 데이터 가져오기"""
-        # API 키 우선순위: 매개변수 > 인스턴스 변수
-        current_api_key = api_key or _self.api_key
-        
-        if not current_api_key:
-            return _self._get_backup_weather_data(city)
-            
-        try:
-            url = "https://api.openweathermap.org/data/2.5/weather"
-            params = {
-                'q': city,
-                'appid': current_api_key,
-                'units': 'metric',
-                'lang': 'kr'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # 일출/일몰 시간 변환 (Unix timestamp → 현지 시간으로 변환)
-            timezone_offset_hours = data['timezone'] / 3600
-            
-            sunrise_utc = datetime.datetime.fromtimestamp(data['sys']['sunrise'], tz=datetime.timezone.utc)
-            sunset_utc = datetime.datetime.fromtimestamp(data['sys']['sunset'], tz=datetime.timezone.utc)
-            
-            # 현지 시간대로 변환
-            local_tz = datetime.timezone(datetime.timedelta(hours=timezone_offset_hours))
-            sunrise_local = sunrise_utc.astimezone(local_tz)
-            sunset_local = sunset_utc.astimezone(local_tz)
-            
-            return WeatherData(
-                temperature=data['main']['temp'],
-                feels_like=data['main']['feels_like'],
-                humidity=data['main']['humidity'],
-                pressure=data['main']['pressure'],
-                weather_condition=data['weather'][0]['main'],
-                weather_description=data['weather'][0]['description'],
-                wind_speed=data['wind']['speed'],
-                visibility=data.get('visibility', 10000) / 1000,
-                sunrise=sunrise_local,
-                sunset=sunset_local,
-                timezone_offset=data['timezone'],  # UTC 기준 오프셋 (초)
-                timestamp=datetime.datetime.now(),
-                source="OpenWeatherMap API"
-            )
-            
-        except Exception as e:
-            st.warning(f"⚠️ API 호출 실패: 데모 데이터를 사용합니다")
-            return _self._get_backup_weather_data(city)
-
-    def _get_backup_weather_data(self, city: str) -> WeatherData:
-        """백업 날씨 데이터 반환"""
-        # 현지 시간 기준으로 일출/일몰 설정
-        local_time, _ = self.get_city_local_time(city)
-        
-        # 계절에 맞는 일출/일몰 시간 (7월 기준)
-        sunrise_time = local_time.replace(hour=6, minute=0, second=0, microsecond=0)
-        sunset_time = local_time.replace(hour=19, minute=30, second=0, microsecond=0)
-        
-        return WeatherData(
-            temperature=self.backup_data['temp'],
-            feels_like=self.backup_data['feels_like'],
-            humidity=self.backup_data['humidity'],
-            pressure=1013,
-            weather_condition=self.backup_data['weather'],
-            weather_description=self.backup_data['description'],
-            wind_speed=self.backup_data['wind_speed'],
-            visibility=10.0,
-            sunrise=sunrise_time,
-            sunset=sunset_time,
-            timezone_offset=32400,  # KST (+9)
-            timestamp=local_time,
-            source="데모 데이터"
-        )
+    def _on_fetch_error(self, city: str, error: Exception):
+        """조회 실패 시 데모 데이터로 대체한다고 알림"""
+        if isinstance(error, CircuitOpen):
+            st.warning(f"⚠️ 날씨 서버 장애: 데모 데이터를 사용합니다 ({error.retry_after:.0f}초 후 다시 연결 시도)")
+            return
+        st.warning(f"⚠️ API 호출 실패: 데모 데이터를 사용합니다")
 
+    @timed("render_weather_card")
     def display_weather_info(self, weather: WeatherData, city: str):
         """날씨 정보 표시 - 단순화된 버전"""
         # 도시 현지 시간 계산
@@ -269,10 +211,16 @@ class WeatherApp:
         st.write(f"🌐 시간대: {timezone_name}")
         
         # 데이터 출처 강조 표시
-        if weather.source == "데모 데이터":
+        age_minutes = None
+        if weather.source == DEMO_SOURCE:
             st.error(f"⚠️ **데이터 출처: {weather.source}** - API 키를 확인하세요!")
         else:
             st.success(f"✅ **데이터 출처: {weather.source}**")
+            age_seconds = time.time() - weather.observed_at
+            age_minutes = int(age_seconds // 60)
+            # 캐시 TTL이 지난 관측값 (stale-while-revalidate)
+            if age_seconds >= self.cache.ttl:
+                st.warning(f"⏳ **{age_minutes}분 전 관측값**입니다 - 최신 날씨를 가져오는 중...")
         
         # 날씨 정보 카드
         icon = self.get_weather_icon(weather.weather_condition)
@@ -299,381 +247,129 @@ class WeatherApp:
                 st.metric("🌇 일몰", weather.sunset.strftime('%H:%M'))
         
         # 업데이트 시간
-        st.caption(f"🔄 마지막 업데이트: {weather.timestamp.strftime('%H:%M:%S')}")
+        if age_minutes is not None:
+            st.caption(f"🔄 마지막 업데이트: {weather.timestamp.strftime('%H:%M:%S')} ({age_minutes}분 전)")
+        else:
+            st.caption(f"🔄 마지막 업데이트: {weather.timestamp.strftime('%H:%M:%S')}")
         st.caption("💡 다른 날씨 앱과 1-3°C 차이는 정상입니다")
 
-    def get_outfit_recommendation(self, weather: WeatherData) -> List[str]:
-        """개선된 옷차림 추천 - 실제 기상 데이터 기반"""
-        recommendations = []
-        temp = weather.temperature
-        feels_like = weather.feels_like
-        humidity = weather.humidity
-        wind_speed = weather.wind_speed
-        condition = weather.weather_condition.lower()
-        
-        # 체감온도 기준 기본 복장
-        effective_temp = feels_like if abs(feels_like - temp) > 2 else temp
-        
-        if effective_temp < -10:
-            recommendations.extend([
-                "🧥 두꺼운 패딩 또는 겨울 코트 필수",
-                "🧤 방한장갑, 목도리, 털모자 착용",
-                "👢 방수 겨울부츠, 미끄럼방지 밑창",
-                "🔥 핫팩 여러 개 준비 (손, 발, 몸통용)"
-            ])
-        elif effective_temp < 0:
-            recommendations.extend([
-                "🧥 패딩 재킷 또는 울코트",
-                "🧤 장갑과 목도리 필수",
-                "👢 따뜻한 부츠 착용"
-            ])
-        elif effective_temp < 10:
-            recommendations.extend([
-                "🧥 두꺼운 자켓 또는 코트",
-                "👕 니트나 긴팔 셔츠 + 카디건",
-                "👖 긴바지, 두꺼운 양말"
-            ])
-        elif effective_temp < 15:
-            recommendations.extend([
-                "👔 얇은 자켓 또는 가디건",
-                "👕 긴팔 셔츠 또는 얇은 니트",
-                "👖 긴바지 추천"
-            ])
-        elif effective_temp < 20:
-            recommendations.extend([
-                "👕 긴팔 또는 얇은 가디건",
-                "👖 긴바지 또는 면바지",
-                "🧥 얇은 겉옷 가져가기"
-            ])
-        elif effective_temp < 25:
-            recommendations.extend([
-                "👕 반팔 또는 얇은 긴팔",
-                "👖 면바지 또는 7부바지",
-                "🧥 가벼운 겉옷 준비"
-            ])
-        else:
-            recommendations.extend([
-                "👕 반팔, 민소매 또는 통풍 잘 되는 옷",
-                "🩳 반바지 또는 치마",
-                "🕶️ 선글라스, 모자 준비",
-                "🧴 선크림 SPF 30+ 필수"
-            ])
-        
-        # 날씨별 추가 권장사항
-        if 'rain' in condition or 'drizzle' in condition:
-            recommendations.extend([
-                "☔ 우산 또는 방수 우비 필수",
-                "👢 방수 신발 착용",
-                "🎒 방수 가방 또는 가방 커버"
-            ])
-        elif 'thunderstorm' in condition:
-            recommendations.extend([
-                "⛈️ 완전 방수 의류 필수",
-                "🏠 가능하면 실내 대기 권장"
-            ])
-        elif 'snow' in condition:
-            recommendations.extend([
-                "❄️ 미끄럼방지 신발 필수",
-                "🧥 방수 외투 착용",
-                "🧤 방수 장갑 권장"
-            ])
-        
-        # 습도별 조언
-        if humidity > 80:
-            recommendations.append("💨 통풍 잘 되는 소재 선택 (면, 리넨)")
-        elif humidity < 30:
-            recommendations.append("💧 보습 로션 사용, 립밤 준비")
-        
-        # 바람별 조언
-        if wind_speed > 10:
-            recommendations.append("💨 바람막이 재킷 또는 윈드브레이커 추천")
-        
-        return recommendations
-
-    def get_transport_recommendation(self, weather: WeatherData) -> List[str]:
-        """개선된 교통수단 추천 - 종합적 기상 조건 분석"""
-        recommendations = []
-        condition = weather.weather_condition.lower()
-        wind_speed = weather.wind_speed
-        visibility = weather.visibility
-        temp = weather.temperature
-        humidity = weather.humidity
-        
-        # 기상 위험도 계산
-        risk_score = 0
-        
-        if 'rain' in condition or 'drizzle' in condition:
-            risk_score += 3
-        elif 'thunderstorm' in condition:
-            risk_score += 5
-        elif 'snow' in condition:
-            risk_score += 4
-        elif 'fog' in condition or 'mist' in condition:
-            risk_score += 2
-        
-        if wind_speed > 15:
-            risk_score += 3
-        elif wind_speed > 10:
-            risk_score += 1
-            
-        if visibility < 5:
-            risk_score += 2
-        elif visibility < 10:
-            risk_score += 1
-            
-        if temp < -5 or temp > 35:
-            risk_score += 2
-            
-        # 위험도별 교통수단 추천
-        if risk_score >= 7:
-            recommendations.extend([
-                "🚇 지하철 강력 추천 (가장 안전하고 정시성 우수)",
-                "🏠 가능하면 재택근무 또는 일정 연기 고려",
-                "🚗 자차 이용 시 극도로 주의운전",
-                "🚴‍♂️ 자전거/킥보드/도보 절대 금지"
-            ])
-        elif risk_score >= 4:
-            recommendations.extend([
-                "🚇 지하철 이용 강력 추천",
-                "🚌 버스 이용 시 배차간격 지연 예상",
-                "🚗 자차 이용 시 안전거리 충분히 확보",
-                "🚴‍♂️ 개인형 이동수단 피하기"
-            ])
-        elif risk_score >= 2:
-            recommendations.extend([
-                "🚇 지하철/🚌 버스 모두 무난",
-                "🚗 자차 이용 시 주의운전",
-                "🚴‍♂️ 자전거/킥보드 신중히 판단",
-                "📱 실시간 교통정보 확인 권장"
-            ])
-        else:
-            recommendations.extend([
-                "🚶‍♂️ 도보나 자전거로 이동하기 좋은 날",
-                "🚴‍♂️ 킥보드, 자전거 등 친환경 이동수단 추천",
-                "🚇🚌 모든 대중교통 쾌적하게 이용 가능",
-                "🚗 드라이브하기 좋은 날씨"
-            ])
-        
-        # 세부 조건별 추가 권장사항
-        if 'rain' in condition:
-            recommendations.append("☔ 대중교통 이용 시 우산 준비, 젖은 신발 주의")
-        if wind_speed > 12:
-            recommendations.append("💨 고층건물 주변 돌풍 주의")
-        if visibility < 5:
-            recommendations.append("👁️ 낮은 가시거리, 차량 전조등 점등 필수")
-        if temp < 0:
-            recommendations.append("🧊 노면 결빙 가능성, 미끄럼 주의")
-        if humidity > 85:
-            recommendations.append("💧 높은 습도로 실내 환기 필요")
-            
-        return recommendations
-
-    def get_departure_time_recommendation(self, weather: WeatherData, city: str) -> List[str]:
-        """개선된 출발시간 추천 - 현지 교통패턴 & 기상조건 분석"""
-        recommendations = []
-        condition = weather.weather_condition.lower()
-        wind_speed = weather.wind_speed
-        visibility = weather.visibility
-        
-        # 현지 시간 기준으로 출퇴근 시간 판단
-        local_time, _ = self.get_city_local_time(city, weather.timezone_offset)
-        current_hour = local_time.hour
-        weekday = local_time.weekday()  # 0=월요일, 6=일요일
-        
-        # 기상 조건에 따른 지연 시간 계산
-        delay_minutes = 0
-        
-        if 'thunderstorm' in condition:
-            delay_minutes += 30
-        elif 'snow' in condition:
-            delay_minutes += 25
-        elif 'rain' in condition or 'drizzle' in condition:
-            delay_minutes += 15
-        elif 'fog' in condition or 'mist' in condition:
-            delay_minutes += 10
-            
-        if wind_speed > 15:
-            delay_minutes += 10
-        elif wind_speed > 10:
-            delay_minutes += 5
-            
-        if visibility < 5:
-            delay_minutes += 15
-        elif visibility < 10:
-            delay_minutes += 5
-        
-        # 주말/평일 구분
-        is_weekend = weekday >= 5
-        
-        if is_weekend:
-            recommendations.append("🎉 주말이므로 교통량이 평일보다 적습니다")
-        
-        # 시간대별 교통 분석 (평일 기준)
-        if not is_weekend:
-            if 6 <= current_hour <= 9:
-                recommendations.append(f"🌅 출근시간대 ({current_hour}시): 교통혼잡 예상")
-                delay_minutes += 10
-            elif 17 <= current_hour <= 20:
-                recommendations.append(f"🌆 퇴근시간대 ({current_hour}시): 극심한 교통혼잡")
-                delay_minutes += 15
-            elif 11 <= current_hour <= 13:
-                recommendations.append(f"🍽️ 점심시간대 ({current_hour}시): 약간의 혼잡")
-                delay_minutes += 5
-            elif 22 <= current_hour or current_hour <= 5:
-                recommendations.append(f"🌙 심야시간 ({current_hour}시): 대중교통 운행 간격 확인")
-                if current_hour >= 23 or current_hour <= 4:
-                    delay_minutes += 20  # 심야 대중교통 대기시간
-        
-        # 최종 출발시간 권장사항
-        if delay_minutes >= 30:
-            recommendations.extend([
-                f"⏰ 평소보다 {delay_minutes}분 일찍 출발 권장",
-                "🏠 가능하면 재택근무 또는 일정 조정 고려",
-                "📱 실시간 교통정보 필수 확인",
-                "🚇 대중교통 지연 및 운행 중단 가능성 체크"
-            ])
-        elif delay_minutes >= 15:
-            recommendations.extend([
-                f"⏰ 평소보다 {delay_minutes}분 일찍 출발",
-                "📱 실시간 교통정보 확인 필수",
-                "🚇 대중교통 배차간격 늘어날 수 있음"
-            ])
-        elif delay_minutes >= 5:
-            recommendations.extend([
-                f"⏰ 평소보다 {delay_minutes}분 정도 일찍 출발",
-                "📱 교통정보 한 번 체크해보기"
-            ])
-        else:
-            recommendations.extend([
-                "✅ 평소 시간에 출발해도 충분",
-                "🌤️ 좋은 날씨로 쾌적한 이동 예상"
-            ])
-        
-        # 도시별 특수 상황 고려
-        if city in ['Seoul', 'Busan', 'Tokyo']:
-            if delay_minutes > 0:
-                recommendations.append("🚇 지하철망 발달 지역: 지하철 우선 이용 권장")
-        elif city in ['New York', 'London']:
-            if delay_minutes > 10:
-                recommendations.append("🚌 대도시 교통체증: 지하철/버스 혼용 고려")
-        elif city in ['Los Angeles']:
-            if delay_minutes > 0:
-                recommendations.append("🚗 자동차 도시: 고속도로 우회로 검토")
-                
-        return recommendations
-
-    def get_health_advice(self, weather: WeatherData) -> List[str]:
-        """개선된 건강 조언 - 기상의학 기반 종합 분석"""
-        advice = []
-        temp = weather.temperature
-        feels_like = weather.feels_like
-        humidity = weather.humidity
-        pressure = weather.pressure
-        condition = weather.weather_condition.lower()
-        wind_speed = weather.wind_speed
-        
-        # 온도별 건강 관리
-        if temp < -10:
-            advice.extend([
-                "🥶 체온저하 위험: 따뜻한 음료 자주 섭취",
-                "🫀 심혈관 질환자 외출 시 특별 주의",
-                "🏠 실내외 온도차 20도 이상 시 서서히 적응",
-                "🤧 호흡기 보호: 마스크나 목도리로 찬공기 차단"
-            ])
-        elif temp < 0:
-            advice.extend([
-                "🧊 동상 위험 부위 (손가락, 발가락, 귀) 보온 철저",
-                "💧 실내 건조 주의: 가습기 사용 권장",
-                "🍲 따뜻한 음식으로 체온 유지"
-            ])
-        elif temp > 35:
-            advice.extend([
-                "🌡️ 열사병 주의: 그늘에서 휴식 자주 취하기",
-                "💧 탈수 방지: 30분마다 물 한 컵씩 섭취",
-                "🧂 전해질 보충: 이온음료나 소금 조금 섭취",
-                "❄️ 에어컨 사용 시 실내외 온도차 5-7도 유지"
-            ])
-        elif temp > 30:
-            advice.extend([
-                "💦 충분한 수분 섭취 (하루 2-3L)",
-                "😎 직사광선 피하고 그늘 이용",
-                "🍉 수분 많은 과일 섭취 권장"
-            ])
-        
-        # 습도별 건강 영향
-        if humidity > 85:
-            advice.extend([
-                "💨 고습도로 인한 답답함: 통풍 자주 시키기",
-                "🦠 세균 번식 주의: 개인위생 철저히",
-                "👕 땀 흡수 잘 되는 면 소재 의류 착용"
-            ])
-        elif humidity > 70:
-            advice.append("🌫️ 높은 습도: 체감온도 상승, 수분 섭취 증가")
-        elif humidity < 30:
-            advice.extend([
-                "🏜️ 건조 주의: 피부 보습제 수시로 사용",
-                "👃 코 점막 건조 방지: 식염수 스프레이 활용",
-                "💧 가습기 사용 또는 젖은 수건 활용"
-            ])
-        elif humidity < 40:
-            advice.append("🌵 약간 건조: 립밤, 핸드크림 준비")
-        
-        # 기압별 건강 영향
-        if pressure < 1000:
-            advice.extend([
-                "📉 저기압: 관절염/두통 악화 가능",
-                "😴 충분한 수면과 휴식 권장",
-                "🧘‍♀️ 스트레칭이나 가벼운 운동으로 혈액순환 개선"
-            ])
-        elif pressure > 1030:
-            advice.append("📈 고기압: 대체로 몸이 가벼움, 야외활동 좋은 날")
-        
-        # 날씨별 건강 주의사항
-        if 'rain' in condition or 'thunderstorm' in condition:
-            advice.extend([
-                "🌧️ 우울감 주의: 실내 조명 밝게 하기",
-                "☔ 젖은 옷 즉시 갈아입기 (감기 예방)",
-                "🦶 발 습기 제거: 양말 여분 준비"
-            ])
-        
-        if 'snow' in condition:
-            advice.extend([
-                "❄️ 미끄러짐 사고 주의: 보폭 줄이고 천천히 걷기",
-                "👁️ 설맹 주의: 선글라스 착용 권장"
-            ])
-        
-        if wind_speed > 15:
-            advice.extend([
-                "💨 강풍으로 인한 안구건조: 인공눈물 사용",
-                "🌪️ 비산물질 주의: 마스크 착용"
-            ])
-        
-        # 계절별 기본 건강관리
-        advice.extend([
-            "😷 미세먼지 차단: 보건용 마스크 착용",
-            "🚶‍♂️ 날씨에 맞는 적절한 운동 지속",
-            "🥗 제철 음식과 비타민 섭취로 면역력 강화",
-            "💤 규칙적인 수면 패턴 유지 (7-8시간)"
-        ])
-        
-        # 체감온도와 실제온도 차이가 클 때 추가 조언
-        temp_diff = abs(feels_like - temp)
-        if temp_diff > 5:
-            advice.append(f"🌡️ 체감온도({feels_like:.1f}°C)와 실제온도 차이 큼: 체온조절 신경쓰기")
-        
-        return advice
+    @timed("render_commute_forecast")
+    def display_commute_forecast(self, forecast: Forecast):
+        """앞으로 24시간 중 출퇴근 시간대(6-9시, 17-20시) 예보 표시"""
+        upcoming = forecast.upcoming(time.time(), hours=24)
+        hours = forecast.local_hours[upcoming]
+        commute = upcoming[((hours >= 6) & (hours <= 9)) | ((hours >= 17) & (hours <= 20))]
+        if len(commute) == 0:
+            return
+        
+        # 예보 시점 전체에 교통 위험도/지연 시간 규칙을 한 번에 적용
+        transport = transport_batch(forecast.temperature[commute], forecast.humidity[commute],
+                                    forecast.wind_speed[commute], forecast.visibility[commute],
+                                    forecast.condition_code[commute])
+        departure = departure_batch(forecast.wind_speed[commute], forecast.visibility[commute],
+                                    forecast.condition_code[commute], forecast.local_hours[commute],
+                                    forecast.local_weekdays[commute], forecast.city)
+        
+        st.markdown("**📅 다음 출퇴근 시간대 예보**")
+        for row, i in enumerate(commute):
+            local_time = forecast.local_time(i)
+            icon = self.get_weather_icon(condition_main(forecast.condition_code[i]))
+            st.write(
+                f"{icon} {local_time.strftime('%m/%d %H시')}: "
+                f"{forecast.temperature[i]:.1f}°C (체감 {forecast.feels_like[i]:.1f}°C), "
+                f"습도 {forecast.humidity[i]}%, 바람 {forecast.wind_speed[i]:.1f}m/s "
+                f"→ 교통 위험도 {transport.risk_score[row]}, {departure.delay_minutes[row]}분 일찍 출발"
+            )
 
-def main():
-    """메인 앱 함수"""
-    app = WeatherApp()
+    @timed("render_history")
+    def display_history_trend(self, city: str, hours: float = 24):
+        """최근 관측 이력의 기온/체감온도 추이 표시 (메모리 맵 뷰를 그대로 사용)"""
+        if self.history is None:
+            return
+        window = self.history.recent(city, since=time.time() - hours * 3600)
+        if len(window) < 2:
+            return
+        
+        st.markdown(f"**📈 최근 {hours:.0f}시간 기온 추이** ({len(window)}회 관측)")
+        st.vega_lite_chart({
+            "관측": np.arange(len(window)),
+            "기온 (°C)": window['temperature'],
+            "체감온도 (°C)": window['feels_like'],
+        }, HISTORY_CHART_SPEC, use_container_width=True)
+        first, last = window[0], window[-1]
+        st.caption(f"🕐 {datetime.datetime.fromtimestamp(int(first['observed_at'])).strftime('%H:%M')} → "
+                   f"{datetime.datetime.fromtimestamp(int(last['observed_at'])).strftime('%H:%M')}, "
+                   f"기온 변화 {float(last['temperature'] - first['temperature']):+.1f}°C")
+
+def watch_revalidation(app: WeatherApp, city: str, api_key: str):
+    """백그라운드 갱신 완료 대기 - 새 데이터가 도착하거나 갱신이 끝나면 도시 화면만 다시 실행
+
+    REVALIDATION_POLL초 안에 끝나지 않으면 (느린 업스트림) 다시 실행하지 않고 그대로 둡니다.
+    기다리는 동안 상태 줄을 고쳐 쓰므로 다른 조작이 들어오면 Streamlit이 바로 이 실행을 멈춥니다.
+    st.rerun(scope="fragment")는 fragment만 다시 실행하는 중에만 쓸 수 있으므로, 첫 화면처럼
+    전체 실행 중이면 전체를 다시 실행합니다.
+    """
+    status = st.empty()
+    deadline = time.monotonic() + REVALIDATION_POLL
+    while app.is_revalidating(city, api_key) and not app.has_fresh_data(city, api_key):
+        if time.monotonic() >= deadline:
+            status.caption("⏳ 최신 날씨를 아직 가져오는 중입니다 - 다음에 화면을 바꿀 때 반영됩니다")
+            return
+        status.caption("⏳ 최신 날씨를 가져오는 중...")
+        time.sleep(0.1)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def display_admin(app: WeatherApp):
+    """관리 화면 (?admin=1, WEATHER_ADMIN=1일 때만) - 단계별 소요 시간과 캐시/업스트림 지표"""
+    st.title("📊 성능 지표")
+    if not METRICS.enabled:
+        st.info("단계별 소요 시간은 WEATHER_METRICS=1로 실행해야 기록됩니다")
     
-    # 헤더
-    st.title("🌤️ 스마트 출퇴근 도우미")
-    st.markdown("**전 세계 도시별 현지 시간 & 날씨 기반 맞춤 가이드**")
-    st.divider()
+    stages = METRICS.stages()
+    if stages:
+        st.subheader("⏱️ 단계별 소요 시간 (ms)")
+        st.table([
+            {"단계": stage, "횟수": stats["count"],
+             **{q: round(stats[q] * 1000, 3) for q in ("p50", "p95", "p99")}}
+            for stage, stats in stages.items()
+        ])
     
-    # API 키 설정 (사이드바)
-    with st.sidebar:
+    st.subheader("🔢 캐시 / 업스트림")
+    st.table([
+        {"지표": name, "라벨": ", ".join(f"{k}={v}" for k, v in labels.items()), "값": value}
+        for name, _, labels, value in METRICS.counters() + app.metric_samples()
+    ])
+    with st.expander("Prometheus 텍스트"):
+        st.code(app.metrics_text(), language="text")
+
+def render_recommendations(title: str, recs):
+    """추천 탭 하나 - 제목과 번호 붙인 추천 목록"""
+    st.markdown(title)
+    for i, rec in enumerate(recs, 1):
+        st.write(f"{i}. {rec}")
+
+def render_details(weather: WeatherData):
+    """상세 날씨 정보 (습도/바람/가시거리/기압)"""
+    with METRICS.timer("render_details"):
+        st.subheader("📊 상세 날씨 정보")
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("💧 습도", f"{weather.humidity}%")
+        with col2:
+            st.metric("💨 바람", f"{weather.wind_speed:.1f}m/s")
+        with col3:
+            st.metric("👁️ 가시거리", f"{weather.visibility:.1f}km")
+        with col4:
+            st.metric("🌡️ 기압", f"{weather.pressure}hPa")
+
+@st.fragment
+def render_sidebar(app: WeatherApp):
+    """API 키 설정 (사이드바) - 입력/삭제는 사이드바만 다시 그리고, 키가 바뀌면 전체 재실행"""
+    with METRICS.timer("render_sidebar"):
         st.header("⚙️ 설정")
         
         # 실시간 API 키 상태 확인
@@ -682,11 +378,20 @@ def main():
         if current_api_key:
             st.success("✅ API 키 설정됨")
             st.info(f"🔑 API 키 길이: {len(current_api_key)}자")
+            # 도시 화면만 다시 그릴 때는 갱신되지 않음 (다음 전체 재실행 때 반영)
+            remaining = app.quota.remaining(current_api_key)
+            st.caption(f"📊 API 호출: 최근 1분 {app.quota.ledger.calls(1, current_api_key)}번 / "
+                       f"분당 {app.quota.per_minute}번"
+                       + (f", 오늘 남은 호출 {remaining['day']:,}번" if remaining['day'] is not None else ""))
+            if not app.breaker.closed:
+                st.caption(f"🔌 날씨 서버 응답 없음 - 마지막 관측값 표시 중 "
+                           f"({app.breaker.retry_after():.0f}초 후 다시 연결 시도)")
             # API 키 삭제 버튼 추가
             if st.button("🗑️ API 키 삭제"):
                 if "api_key" in st.session_state:
                     del st.session_state.api_key
-                st.cache_data.clear()
+                # 삭제한 키로 가져온 항목만 제거
+                app.cache.invalidate_key(current_api_key)
                 st.rerun()
         else:
             st.warning("🔑 API 키가 설정되지 않았습니다")
@@ -698,8 +403,7 @@ def main():
             
             if api_key_input:
                 st.session_state.api_key = api_key_input
-                # API 키 변경 시 캐시 클리어
-                st.cache_data.clear()
+                # 캐시 키에 API 키가 포함되므로 전체 캐시를 비울 필요 없음
                 st.success("✅ API 키가 설정되었습니다!")
                 st.rerun()
         
@@ -715,88 +419,124 @@ def main():
         • 기타 전 세계 주요 도시
         """)
 
-    # 메인 컨텐츠
+@st.fragment
+def render_dashboard(app: WeatherApp):
+    """도시 선택 + 날씨/추천 화면 - 도시 변경, 새로고침, 탭 전환, 백그라운드 갱신 완료는 이 부분만 다시 실행"""
+    revalidating = draw_dashboard(app)
+    if revalidating is not None:
+        # 화면을 다 그린 뒤 갱신을 기다림 (기다리는 시간은 render_dashboard 단계 시간에서 제외)
+        watch_revalidation(app, *revalidating)
+
+@timed("render_dashboard")
+def draw_dashboard(app: WeatherApp) -> Optional[Tuple[str, str]]:
+    """render_dashboard의 화면 그리기 - stale 데이터를 보여주고 백그라운드 갱신 중이면 (도시, API 키) 반환"""
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        cities = [
-            "Seoul", "Busan", "Incheon", "Daegu", "Daejeon", "Gwangju",
-            "Tokyo", "Osaka", "Beijing", "Shanghai", "Hong Kong", "Singapore",
-            "New York", "Los Angeles", "London", "Paris", "Sydney", "Dubai"
-        ]
-        
         selected_city = st.selectbox(
             "🏙️ 도시를 선택하세요",
-            cities,
+            CITIES,
             index=0,
             help="선택한 도시의 현지 시간과 날씨를 표시합니다"
         )
     
     with col2:
         if st.button("🔄 새로고침", use_container_width=True):
-            st.cache_data.clear()
-            st.rerun()
+            # 보고 있는 도시만 다시 가져오기 (아래 조회가 바로 새 값을 받으므로 재실행 불필요)
+            record_event("refresh", selected_city)
+            app.refresh_city(selected_city, app.get_api_key())
     
     # 날씨 정보 가져오기
     with st.spinner(f"🌤️ {selected_city}의 날씨 정보를 가져오는 중..."):
         # 실시간으로 API 키 확인
         current_api_key = app.get_api_key()
-        weather_data = app.fetch_weather_data(selected_city, current_api_key)
+        recording = get_recorder() is not None
+        cache_state = app.cache_state(selected_city, current_api_key) if recording else None
+        weather_data = app.fetch_weather_data(selected_city, current_api_key, allow_stale=True)
     
-    if weather_data:
-        # 날씨 정보 표시 (현지 시간 포함)
-        app.display_weather_info(weather_data, selected_city)
-        
-        st.divider()
-        
-        # 상세 날씨 정보
-        st.subheader("📊 상세 날씨 정보")
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("💧 습도", f"{weather_data.humidity}%")
-        with col2:
-            st.metric("💨 바람", f"{weather_data.wind_speed:.1f}m/s")
-        with col3:
-            st.metric("👁️ 가시거리", f"{weather_data.visibility:.1f}km")
-        with col4:
-            st.metric("🌡️ 기압", f"{weather_data.pressure}hPa")
-        
-        st.divider()
-        
-        # 추천사항 탭
-        st.subheader("💡 스마트 추천")
-        
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "👔 복장",
-            "🚇 교통",
-            "⏰ 시간",
-            "💊 건강"
-        ])
-        
-        with tab1:
-            st.markdown("**👔 오늘의 복장 추천**")
-            outfit_recs = app.get_outfit_recommendation(weather_data)
-            for i, rec in enumerate(outfit_recs, 1):
-                st.write(f"{i}. {rec}")
-        
-        with tab2:
-            st.markdown("**🚇 교통수단 추천**")
-            transport_recs = app.get_transport_recommendation(weather_data)
-            for i, rec in enumerate(transport_recs, 1):
-                st.write(f"{i}. {rec}")
-        
-        with tab3:
-            st.markdown("**⏰ 출발시간 가이드**")
-            time_recs = app.get_departure_time_recommendation(weather_data, selected_city)
-            for i, rec in enumerate(time_recs, 1):
-                st.write(f"{i}. {rec}")
+    # 사용 기록 - 첫 화면과 도시를 바꾼 화면만
+    if recording and st.session_state.get("trace_city") != selected_city:
+        if weather_data is None or weather_data.source == DEMO_SOURCE:
+            cache_state = "demo"
+        record_event("city" if "trace_city" in st.session_state else "start", selected_city, cache_state)
+        st.session_state.trace_city = selected_city
+    
+    # stale 데이터를 보여준 경우 - 갱신 중이면 다 그린 뒤 완료를 기다리고, 끝났는데도 없으면 알림
+    revalidating = False
+    if (weather_data and weather_data.source != DEMO_SOURCE
+            and not app.has_fresh_data(selected_city, current_api_key)):
+        revalidating = app.is_revalidating(selected_city, current_api_key)
+        if not revalidating:
+            st.caption("⚠️ 최신 날씨를 가져오지 못했습니다 - 마지막 관측값을 표시합니다")
+    
+    if not weather_data:
+        return None
+    
+    # 날씨 정보 표시 (현지 시간 포함)
+    app.display_weather_info(weather_data, selected_city)
+    
+    st.divider()
+    
+    render_details(weather_data)
+    
+    app.display_history_trend(selected_city)
+    
+    st.divider()
+    
+    # 추천사항 탭
+    st.subheader("💡 스마트 추천")
+    
+    # 기록 중이면 탭 전환도 기록 (탭 전환마다 이 부분만 재실행)
+    tab_options = {}
+    if recording and STATEFUL_TABS:
+        tab_options = dict(key="trace_tab", on_change=lambda: record_event("tab", st.session_state.trace_tab))
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "👔 복장",
+        "🚇 교통",
+        "⏰ 시간",
+        "💊 건강"
+    ], **tab_options)
+    
+    with tab1, METRICS.timer("render_outfit_tab"):
+        render_recommendations("**👔 오늘의 복장 추천**", app.get_outfit_recommendation(weather_data))
+    
+    with tab2, METRICS.timer("render_transport_tab"):
+        render_recommendations("**🚇 교통수단 추천**", app.get_transport_recommendation(weather_data))
+    
+    with tab3, METRICS.timer("render_departure_tab"):
+        render_recommendations("**⏰ 출발시간 가이드**",
+                               app.get_departure_time_recommendation(weather_data, selected_city))
         
-        with tab4:
-            st.markdown("**💊 건강 관리 조언**")
-            health_recs = app.get_health_advice(weather_data)
-            for i, rec in enumerate(health_recs, 1):
-                st.write(f"{i}. {rec}")
+        forecast = app.fetch_forecast(selected_city, current_api_key)
+        if forecast is not None:
+            app.display_commute_forecast(forecast)
+    
+    with tab4, METRICS.timer("render_health_tab"):
+        render_recommendations("**💊 건강 관리 조언**", app.get_health_advice(weather_data))
+    
+    return (selected_city, current_api_key) if revalidating else None
+
+@timed("rerun")
+def main():
+    """메인 앱 함수 - 전체 재실행은 첫 화면과 API 키 변경 때만 (나머지는 fragment 단위)"""
+    app = WeatherApp()
+    get_metrics_server(app)
+    
+    if os.environ.get("WEATHER_ADMIN") == "1" and st.query_params.get("admin") == "1":
+        display_admin(app)
+        return
+    
+    # 헤더
+    st.title("🌤️ 스마트 출퇴근 도우미")
+    st.markdown("**전 세계 도시별 현지 시간 & 날씨 기반 맞춤 가이드**")
+    st.divider()
+    
+    # fragment는 자기 영역 밖(st.sidebar)에 쓸 수 없으므로 사이드바 안에서 호출
+    with st.sidebar:
+        render_sidebar(app)
+    
+    # 메인 컨텐츠
+    render_dashboard(app)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
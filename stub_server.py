@@ -0,0 +1,395 @@
+# stub_server.py - OpenWeatherMap 로컬 대역 서버 (오프라인 테스트용)
+#
+# 실행: python stub_server.py --port 8765
+# 앱 연결: OPENWEATHER_BASE_URL=http://127.0.0.1:8765/data/2.5 streamlit run streamlit_app.py
+# (API 키는 아무 값이나 입력하면 됩니다)
+#
+# 장애 주입: 응답 지연 분포와 5xx / 429 / 응답 없음(타임아웃) / 연결 끊김 비율을 정할 수 있습니다.
+#   python stub_server.py --latency 0.08 --distribution lognormal --spread 0.6 \
+#       --error-rate 0.02 --timeout-rate 0.01 --per-minute 60 --fault-seed 7
+# 코드에서는 start_stub_server(faults=Faults(...)), 실행 중 변경은 server.faults.error_rate = 0.5
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# 도시명: (OpenWeatherMap ID, 위도, 경도, 국가, UTC 오프셋(초), 평균 기온)
+STUB_CITIES = {
+    'Seoul': (1835848, 37.57, 126.98, 'KR', 32400, 14),
+    'Busan': (1838524, 35.10, 129.04, 'KR', 32400, 16),
+    'Incheon': (1843564, 37.46, 126.71, 'KR', 32400, 13),
+    'Daegu': (1835329, 35.87, 128.59, 'KR', 32400, 15),
+    'Daejeon': (1835235, 36.32, 127.42, 'KR', 32400, 14),
+    'Gwangju': (1841811, 35.15, 126.92, 'KR', 32400, 15),
+    'Tokyo': (1850147, 35.69, 139.69, 'JP', 32400, 17),
+    'Osaka': (1853909, 34.69, 135.50, 'JP', 32400, 17),
+    'Beijing': (1816670, 39.91, 116.40, 'CN', 28800, 13),
+    'Shanghai': (1796236, 31.22, 121.46, 'CN', 28800, 18),
+    'Hong Kong': (1819729, 22.29, 114.16, 'HK', 28800, 24),
+    'Singapore': (1880252, 1.29, 103.85, 'SG', 28800, 28),
+    'New York': (5128581, 40.71, -74.01, 'US', -14400, 13),
+    'Los Angeles': (5368361, 34.05, -118.24, 'US', -25200, 19),
+    'London': (2643743, 51.51, -0.13, 'GB', 3600, 11),
+    'Paris': (2988507, 48.85, 2.35, 'FR', 7200, 12),
+    'Sydney': (2147714, -33.87, 151.21, 'AU', 39600, 18),
+    'Dubai': (292223, 25.26, 55.30, 'AE', 14400, 28),
+    'Bangkok': (1609350, 13.75, 100.50, 'TH', 25200, 29),
+    'Mumbai': (1275339, 19.01, 72.85, 'IN', 19800, 27),
+}
+STUB_IDS = {info[0]: name for name, info in STUB_CITIES.items()}
+
+# (조건 코드, main, 한국어 설명)
+STUB_CONDITIONS = [
+    (800, 'Clear', '맑음'),
+    (802, 'Clouds', '구름조금'),
+    (804, 'Clouds', '흐림'),
+    (300, 'Drizzle', '가벼운 실비'),
+    (500, 'Rain', '실 비'),
+    (501, 'Rain', '보통 비'),
+    (211, 'Thunderstorm', '뇌우'),
+    (600, 'Snow', '가벼운 눈'),
+    (701, 'Mist', '박무'),
+    (741, 'Fog', '안개'),
+]
+
+GROUP_MAX_IDS = 20
+FORECAST_STEPS = 40  # 5일 × 3시간
+
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+# 주입한 장애 종류 (StubWeatherServer.faults_injected 키)
+ERROR = "error"            # 500/502/503
+RATE_LIMITED = "429"       # 무작위 또는 분당 한도 초과
+TIMEOUT = "timeout"        # hang초 동안 응답 없음
+DROP = "drop"              # 응답 없이 연결 끊기
+
+
+@dataclass
+class Faults:
+    """응답 지연 분포와 장애 비율 (비율은 요청마다 0~1 확률, 실행 중에 바꿔도 됨)
+
+    latency: 지연 (초) - fixed: 그대로, uniform: ±spread초, exponential: 평균,
+             lognormal: 중앙값 (spread는 로그 표준편차, 0.5면 p99가 중앙값의 약 3배)
+    spike_rate / spike_latency: 일부 요청에만 더하는 긴 지연 (꼬리 지연 흉내)
+    per_minute: API 키별 최근 60초 요청이 이보다 많으면 429 (0이면 한도 없음)
+    retry_after: 429 응답의 Retry-After 헤더 (초, None이면 헤더 없음 - 클라이언트는 60초로 봄)
+    hang: timeout_rate에 걸린 요청이 응답하기 전 기다리는 시간 - 클라이언트 타임아웃보다 길게
+    seed: 정하면 같은 요청 순서에 같은 장애가 나옴
+    """
+
+    latency: float = 0.0
+    distribution: str = "fixed"
+    spread: float = 0.0
+    spike_rate: float = 0.0
+    spike_latency: float = 1.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    per_minute: int = 0
+    retry_after: Optional[float] = None
+    timeout_rate: float = 0.0
+    hang: float = 30.0
+    drop_rate: float = 0.0
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False, repr=False)
+    _calls: Dict[str, deque] = field(init=False, repr=False, default_factory=dict)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"지연 분포는 {', '.join(DISTRIBUTIONS)} 중 하나: {self.distribution}")
+        self._rng = random.Random(self.seed)
+
+    def sample(self, api_key: str) -> Tuple[float, Optional[str]]:
+        """요청 하나에 대한 (지연 초, 장애 종류 또는 None)"""
+        with self._lock:
+            rng = self._rng
+            roll = rng.random()
+            for fault, rate in ((DROP, self.drop_rate), (TIMEOUT, self.timeout_rate),
+                                (RATE_LIMITED, self.rate_limit_rate), (ERROR, self.error_rate)):
+                if roll < rate:
+                    return self._delay(rng), fault
+                roll -= rate
+            if self.per_minute and not self._admit(api_key):
+                return self._delay(rng), RATE_LIMITED
+            return self._delay(rng), None
+
+    def error_status(self) -> int:
+        with self._lock:
+            return self._rng.choice((500, 502, 503))
+
+    def _delay(self, rng: random.Random) -> float:
+        if self.distribution == "uniform":
+            delay = rng.uniform(self.latency - self.spread, self.latency + self.spread)
+        elif self.distribution == "exponential":
+            delay = rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        elif self.distribution == "lognormal":
+            delay = self.latency * rng.lognormvariate(0, self.spread) if self.latency > 0 else 0.0
+        else:
+            delay = self.latency
+        if self.spike_rate and rng.random() < self.spike_rate:
+            delay += self.spike_latency
+        return max(0.0, delay)
+
+    def _admit(self, api_key: str) -> bool:
+        now = time.monotonic()
+        calls = self._calls.setdefault(api_key, deque())
+        while calls and calls[0] <= now - 60:
+            calls.popleft()
+        if len(calls) >= self.per_minute:
+            return False
+        calls.append(now)
+        return True
+
+
+def current_weather_payload(city: str, now: float = None) -> dict:
+    """도시별 현재 날씨 응답 생성 - 10분 단위로 값이 바뀌는 결정적 데이터"""
+    now = time.time() if now is None else now
+    city_id, lat, lon, country, offset, base_temp = STUB_CITIES[city]
+    rng = random.Random(f"{city}:{int(now // 600)}")
+
+    temp = round(base_temp + rng.uniform(-12, 12), 2)
+    code, main, description = rng.choice(STUB_CONDITIONS)
+    if main == 'Snow' and temp > 2:
+        code, main, description = 500, 'Rain', '실 비'
+    wind = round(rng.uniform(0, 18), 2)
+    humidity = rng.randint(20, 98)
+
+    # 현지 자정 기준 06:00 일출 / 19:00 일몰
+    local_midnight = (int(now) + offset) // 86400 * 86400 - offset
+    return {
+        'coord': {'lon': lon, 'lat': lat},
+        'weather': [{'id': code, 'main': main, 'description': description, 'icon': '01d'}],
+        'base': 'stations',
+        'main': {
+            'temp': temp,
+            'feels_like': round(temp - wind * 0.3 + (humidity - 50) * 0.03, 2),
+            'temp_min': round(temp - 2, 2),
+            'temp_max': round(temp + 2, 2),
+            'pressure': rng.randint(990, 1040),
+            'humidity': humidity,
+        },
+        'visibility': rng.choice([10000, 10000, 10000, 8000, 6000, 3000, 1000]),
+        'wind': {'speed': wind, 'deg': rng.randint(0, 359)},
+        'clouds': {'all': rng.randint(0, 100)},
+        'dt': int(now),
+        'sys': {
+            'country': country,
+            'sunrise': local_midnight + 6 * 3600,
+            'sunset': local_midnight + 19 * 3600,
+        },
+        'timezone': offset,
+        'id': city_id,
+        'name': city,
+        'cod': 200,
+    }
+
+
+def forecast_payload(city: str, now: float = None) -> dict:
+    """5일/3시간 예보 응답 생성 - 각 시점은 current_weather_payload로 만든 값"""
+    now = time.time() if now is None else now
+    city_id, lat, lon, country, offset, _ = STUB_CITIES[city]
+    first = (int(now) // 10800 + 1) * 10800
+    steps = []
+    for i in range(FORECAST_STEPS):
+        current = current_weather_payload(city, first + i * 10800)
+        steps.append({
+            'dt': current['dt'],
+            'main': current['main'],
+            'weather': current['weather'],
+            'clouds': current['clouds'],
+            'wind': current['wind'],
+            'visibility': current['visibility'],
+            'pop': 0.8 if current['weather'][0]['main'] in ('Rain', 'Drizzle', 'Thunderstorm', 'Snow') else 0.1,
+            'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(current['dt'])),
+        })
+    return {
+        'cod': '200',
+        'message': 0,
+        'cnt': len(steps),
+        'list': steps,
+        'city': {
+            'id': city_id, 'name': city, 'coord': {'lat': lat, 'lon': lon},
+            'country': country, 'timezone': offset,
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/data/2.5/weather, /data/2.5/group, /data/2.5/forecast 처리"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive 지원
+    disable_nagle_algorithm = True  # 헤더/본문을 따로 쓰므로 Nagle 지연(~40ms) 방지
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.record_hit(url.path)
+        delay, fault = self.server.faults.sample(query.get('appid', ''))
+        if fault:
+            self.server.record_fault(fault)
+        if fault == DROP:
+            self.close_connection = True  # 응답 없이 연결 종료 → 클라이언트는 ConnectionError
+            return
+        if fault == TIMEOUT:
+            delay += self.server.faults.hang
+        if delay:
+            time.sleep(delay)
+        if fault == RATE_LIMITED:
+            retry_after = self.server.faults.retry_after
+            return self.send_json(429, {'cod': 429, 'message': 'Your account is temporary blocked due to '
+                                        'exceeding of requests limitation of your subscription type.'},
+                                  headers={'Retry-After': f"{retry_after:g}"} if retry_after is not None else None)
+        if fault == ERROR:
+            status = self.server.faults.error_status()
+            return self.send_json(status, {'cod': status, 'message': 'Internal error'})
+
+        if not query.get('appid'):
+            return self.send_json(401, {'cod': 401, 'message': 'Invalid API key.'})
+
+        if url.path.endswith('/weather'):
+            city = query.get('q') or STUB_IDS.get(int(query.get('id', 0) or 0))
+            if city not in STUB_CITIES:
+                return self.send_json(404, {'cod': '404', 'message': 'city not found'})
+            return self.send_json(200, current_weather_payload(city))
+
+        if url.path.endswith('/forecast'):
+            city = query.get('q') or STUB_IDS.get(int(query.get('id', 0) or 0))
+            if city not in STUB_CITIES:
+                return self.send_json(404, {'cod': '404', 'message': 'city not found'})
+            return self.send_json(200, forecast_payload(city))
+
+        if url.path.endswith('/group'):
+            ids = [int(i) for i in query.get('id', '').split(',') if i.strip()]
+            if not ids or len(ids) > GROUP_MAX_IDS:
+                return self.send_json(400, {'cod': '400', 'message': 'Wrong number of ids'})
+            items = []
+            for city_id in ids:
+                if city_id in STUB_IDS:
+                    item = current_weather_payload(STUB_IDS[city_id])
+                    # group 응답은 시간대 오프셋을 sys 안에 담음
+                    item['sys']['timezone'] = item.pop('timezone')
+                    items.append(item)
+            return self.send_json(200, {'cnt': len(items), 'list': items})
+
+        self.send_json(404, {'cod': '404', 'message': 'Internal error'})
+
+    def send_json(self, status: int, body: dict, headers: Dict[str, str] = None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 타임아웃으로 먼저 연결을 끊음
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    """요청 경로별 호출 횟수와 주입한 장애 수를 세는 대역 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), verbose: bool = False, latency: float = 0.0,
+                 faults: Faults = None):
+        super().__init__(address, StubHandler)
+        self.verbose = verbose
+        self.faults = faults or Faults()
+        if latency:
+            self.faults.latency = latency
+        self.hits = Counter()
+        self.faults_injected = Counter()
+        self._hits_lock = threading.Lock()
+
+    @property
+    def latency(self) -> float:
+        """응답 전 대기 시간 (초) - 느린 업스트림 흉내 (faults.latency)"""
+        return self.faults.latency
+
+    @latency.setter
+    def latency(self, seconds: float):
+        self.faults.latency = seconds
+
+    def record_hit(self, path: str):
+        with self._hits_lock:
+            self.hits[path.rsplit('/', 1)[-1]] += 1
+
+    def record_fault(self, fault: str):
+        with self._hits_lock:
+            self.faults_injected[fault] += 1
+
+    @property
+    def base_url(self) -> str:
+        """OPENWEATHER_BASE_URL로 사용할 주소"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/data/2.5"
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, verbose: bool = False,
+                      latency: float = 0.0, faults: Faults = None) -> StubWeatherServer:
+    """백그라운드 스레드에서 대역 서버 시작 (port=0이면 빈 포트 자동 선택)"""
+    server = StubWeatherServer((host, port), verbose=verbose, latency=latency, faults=faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    """장애 주입 옵션 추가 (대역 서버를 띄우는 다른 도구와 같은 옵션)"""
+    group = parser.add_argument_group("대역 서버 장애 주입")
+    group.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초, 분포에 따라 평균/중앙값)")
+    group.add_argument("--distribution", choices=DISTRIBUTIONS, default="fixed", help="응답 지연 분포")
+    group.add_argument("--spread", type=float, default=0.0,
+                       help="uniform: ±초, lognormal: 로그 표준편차")
+    group.add_argument("--spike-rate", type=float, default=0.0, help="긴 지연을 더할 요청 비율")
+    group.add_argument("--spike-latency", type=float, default=1.0, help="긴 지연 (초)")
+    group.add_argument("--error-rate", type=float, default=0.0, help="5xx 응답 비율")
+    group.add_argument("--rate-limit-rate", type=float, default=0.0, help="무작위 429 응답 비율")
+    group.add_argument("--per-minute", type=int, default=0, help="API 키별 분당 한도 (넘으면 429, 0=없음)")
+    group.add_argument("--retry-after", type=float, default=None, help="429 응답의 Retry-After (초)")
+    group.add_argument("--timeout-rate", type=float, default=0.0, help="응답하지 않는(타임아웃) 요청 비율")
+    group.add_argument("--hang", type=float, default=30.0, help="타임아웃 요청의 응답 지연 (초)")
+    group.add_argument("--drop-rate", type=float, default=0.0, help="응답 없이 연결을 끊는 요청 비율")
+    group.add_argument("--fault-seed", type=int, default=None, help="장애 난수 시드 (재현용)")
+
+
+def faults_from_args(args: argparse.Namespace) -> Faults:
+    return Faults(latency=args.latency, distribution=args.distribution, spread=args.spread,
+                  spike_rate=args.spike_rate, spike_latency=args.spike_latency, error_rate=args.error_rate,
+                  rate_limit_rate=args.rate_limit_rate, per_minute=args.per_minute, retry_after=args.retry_after,
+                  timeout_rate=args.timeout_rate, hang=args.hang, drop_rate=args.drop_rate, seed=args.fault_seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenWeatherMap 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubWeatherServer((args.host, args.port), verbose=args.verbose, faults=faults_from_args(args))
+    print(f"🌤️ 대역 서버 실행 중: {server.base_url}")
+    print(f"   {server.faults}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# weather_api.py - 화면 없는 JSON API (키오스크/내부 연동용, Streamlit 불필요)
+#
+# 실행: OPENWEATHER_API_KEY=... python weather_api.py --port 8080
+#   GET /weather/{city}          현재 날씨 (도시는 weather_service.CITIES / CITY_TIMEZONES에 있는 것만)
+#   GET /recommendations/{city}  복장/교통/출발시간/건강 추천
+#   GET /healthz                 상태 확인
+#   GET /metrics                 Prometheus 텍스트 형식 지표 (단계별 시간은 WEATHER_METRICS=1일 때)
+# 벤치마크: python weather_api.py --benchmark   (로컬 대역 서버 + 클라이언트 프로세스)
+#
+# Streamlit 앱과 같은 WeatherService를 쓰고, WEATHER_CACHE_DB / WEATHER_HISTORY_FILE이
+# 같으면 캐시 저장소와 관측 이력도 공유합니다.
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from weather_breaker import CircuitOpen
+from weather_data import DEMO_SOURCE, WeatherData
+from weather_metrics import METRICS
+from weather_quota import QuotaExceeded, is_rate_limited
+from weather_service import CITIES, CITY_TIMEZONES, WeatherService, create_history, create_observation_cache
+
+MAX_RENDERED = 1024  # 미리 만들어 둔 응답 본문 최대 개수
+# 조회할 수 있는 도시 - 그 밖의 이름은 업스트림에 보내지 않음 (호출 한도/캐시를 쓰지 않게)
+SUPPORTED_CITIES = frozenset(CITIES) | frozenset(CITY_TIMEZONES)
+
+
+class RenderedResponse:
+    """직렬화까지 끝난 응답 - 같은 관측값이면 본문/ETag를 다시 만들지 않음"""
+    __slots__ = ('weather', 'variant', 'body', 'etag')
+
+    def __init__(self, weather: WeatherData, variant, body: bytes):
+        self.weather = weather
+        self.variant = variant
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """/weather/{city}, /recommendations/{city}, /healthz, /metrics 처리"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive 지원
+    disable_nagle_algorithm = True  # 헤더/본문을 따로 쓰므로 Nagle 지연(~40ms) 방지
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/healthz":
+            return self.send_body(200, b'{"ok":true}', {'Cache-Control': 'no-store'})
+        if path == "/metrics":
+            return self.send_body(200, self.server.service.metrics_text().encode('utf-8'),
+                                  {'Cache-Control': 'no-store'},
+                                  content_type='text/plain; version=0.0.4; charset=utf-8')
+
+        kind, _, city = path.strip("/").partition("/")
+        city = unquote(city)
+        if kind not in ("weather", "recommendations") or not city or "/" in city:
+            return self.send_error_json(404, "not found")
+        if city not in SUPPORTED_CITIES:
+            return self.send_error_json(404, f"unknown city: {city}")
+
+        with METRICS.timer(f"api_{kind}"):
+            self.serve_city(kind, city)
+
+    def serve_city(self, kind: str, city: str):
+        """날씨/추천 응답 (단계 시간 api_weather / api_recommendations)"""
+        try:
+            weather = self.server.service.fetch_weather_data(city, self.server.api_key, allow_stale=True,
+                                                             fallback=False)
+        except QuotaExceeded:
+            # 호출 한도가 다 찼고 보여줄 캐시 항목도 없음
+            return self.send_quota_exhausted()
+        except CircuitOpen as e:
+            # 업스트림 장애로 회로가 열렸고 보여줄 캐시 항목도 없음 - 기다리지 않고 바로 응답
+            body = json.dumps({'error': "upstream unavailable"}).encode('utf-8')
+            return self.send_body(503, body, {'Cache-Control': 'no-store',
+                                              'Retry-After': str(max(1, round(e.retry_after)))})
+        except requests.HTTPError as e:
+            if is_rate_limited(e):
+                # 업스트림 429 - 보여줄 캐시 항목이 있었다면 fetch_weather_data가 이미 돌려줬음
+                return self.send_quota_exhausted()
+            status = e.response.status_code if e.response is not None else 502
+            if status == 404:
+                return self.send_error_json(404, f"unknown city: {city}")
+            return self.send_error_json(502, "upstream error")
+        except Exception:
+            return self.send_error_json(502, "upstream unavailable")
+
+        rendered = self.server.render(kind, city, weather)
+        headers = self.server.cache_headers(weather)
+        headers['ETag'] = rendered.etag
+        if self.headers.get('If-None-Match') == rendered.etag:
+            return self.send_body(304, b"", headers)
+        self.send_body(200, rendered.body, headers)
+
+    def send_body(self, status: int, body: bytes, headers: Dict[str, str],
+                  content_type: str = 'application/json; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def send_quota_exhausted(self):
+        """503 - Retry-After는 쿼터 스케줄러가 다음 토큰을 줄 수 있는 시각 (429 응답의 멈춤 포함)"""
+        retry_after = self.server.service.quota.retry_after(self.server.api_key)
+        body = json.dumps({'error': "upstream quota exhausted"}).encode('utf-8')
+        self.send_body(503, body, {'Cache-Control': 'no-store', 'Retry-After': str(max(1, round(retry_after)))})
+
+    def send_error_json(self, status: int, message: str):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        self.send_body(status, body, {'Cache-Control': 'no-store'})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class WeatherAPIServer(ThreadingHTTPServer):
+    """WeatherService를 감싼 JSON API 서버 (연결마다 스레드 1개)"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, service: WeatherService, api_key: str = "",
+                 address: Tuple[str, int] = ("127.0.0.1", 0), verbose: bool = False):
+        super().__init__(address, APIHandler)
+        self.service = service
+        self.api_key = api_key
+        self.verbose = verbose
+        self._rendered: Dict[Tuple[str, str], RenderedResponse] = {}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def render(self, kind: str, city: str, weather: WeatherData) -> RenderedResponse:
+        """응답 본문 - 관측값(과 추천은 현지 시/요일)이 같으면 만들어 둔 것 재사용"""
+        variant = None
+        if kind == "recommendations":
+            local_time, _ = self.service.get_city_local_time(city, weather.timezone_offset)
+            variant = (local_time.hour, local_time.weekday())
+
+        key = (kind, city)
+        rendered = self._rendered.get(key)
+        if rendered is not None and rendered.weather is weather and rendered.variant == variant:
+            return rendered
+
+        payload = self.weather_payload(city, weather) if kind == "weather" else \
+            self.recommendations_payload(city, weather)
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        rendered = RenderedResponse(weather, variant, body)
+        if len(self._rendered) >= MAX_RENDERED:
+            self._rendered.clear()
+        self._rendered[key] = rendered
+        return rendered
+
+    def weather_payload(self, city: str, weather: WeatherData) -> dict:
+        return {
+            'city': city,
+            'temperature': weather.temperature,
+            'feels_like': weather.feels_like,
+            'humidity': weather.humidity,
+            'pressure': weather.pressure,
+            'condition': weather.weather_condition,
+            'description': weather.weather_description,
+            'icon': self.service.get_weather_icon(weather.weather_condition),
+            'wind_speed': weather.wind_speed,
+            'visibility': weather.visibility,
+            'sunrise': weather.sunrise_at,
+            'sunset': weather.sunset_at,
+            'timezone_offset': weather.timezone_offset,
+            'observed_at': weather.observed_at,
+            'source': weather.source,
+        }
+
+    def recommendations_payload(self, city: str, weather: WeatherData) -> dict:
+        service = self.service
+        return {
+            'city': city,
+            'observed_at': weather.observed_at,
+            'source': weather.source,
+            'outfit': service.get_outfit_recommendation(weather),
+            'transport': service.get_transport_recommendation(weather),
+            'departure': service.get_departure_time_recommendation(weather, city),
+            'health': service.get_health_advice(weather),
+        }
+
+    def cache_headers(self, weather: WeatherData) -> Dict[str, str]:
+        """캐시 헤더 - 캐시 TTL 안의 관측값은 남은 시간만큼 캐시 허용"""
+        if weather.source == DEMO_SOURCE:
+            return {'Cache-Control': 'no-store'}
+        remaining = int(self.service.cache.ttl - (time.time() - weather.observed_at))
+        headers = {'Last-Modified': formatdate(weather.observed_at, usegmt=True)}
+        if remaining > 0:
+            headers['Cache-Control'] = f'public, max-age={remaining}'
+        else:
+            # 만료된 관측값 (백그라운드에서 갱신 중)
+            headers['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        return headers
+
+
+def start_api_server(service: WeatherService, api_key: str = "", host: str = "127.0.0.1",
+                     port: int = 0, verbose: bool = False) -> WeatherAPIServer:
+    """백그라운드 스레드에서 API 서버 시작 (port=0이면 빈 포트)"""
+    server = WeatherAPIServer(service, api_key, (host, port), verbose=verbose)
+    threading.Thread(target=server.serve_forever, name="weather-api", daemon=True).start()
+    return server
+
+
+# ---- 벤치마크 ----
+
+def _bench_client(address: Tuple[str, int], paths: list, duration: float, queue):
+    """keep-alive 연결 하나로 duration초 동안 요청 반복 - (요청 수, 실패 수, 지연 목록) 보고"""
+    conn = HTTPConnection(*address)
+    latencies, failures = [], 0
+    deadline = time.perf_counter() + duration
+    i = 0
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            break
+        conn.request("GET", paths[i % len(paths)])
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            failures += 1
+        latencies.append(time.perf_counter() - started)
+        i += 1
+    conn.close()
+    queue.put((len(latencies), failures, latencies))
+
+
+def run_benchmark(connections: int = 16, duration: float = 5.0) -> dict:
+    """로컬 대역 서버를 업스트림으로 쓰는 API 서버에 클라이언트 프로세스로 부하 - 결과 dict"""
+    from stub_server import start_stub_server
+    from weather_cache import ObservationCache
+    from weather_http import UpstreamClient
+
+    stub = start_stub_server()
+    service = WeatherService(api_key="bench", cache=ObservationCache(ttl=300, max_entries=256),
+                             http=UpstreamClient(base_url=stub.base_url))
+    server = start_api_server(service, api_key="bench")
+    paths = [f"/{kind}/{city.replace(' ', '%20')}" for city in CITIES
+             for kind in ("weather", "recommendations")]
+
+    # 캐시 채우기 (업스트림 호출은 도시당 1번)
+    warm = HTTPConnection(*server.server_address[:2])
+    for path in paths:
+        warm.request("GET", path)
+        warm.getresponse().read()
+    warm.close()
+
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_bench_client,
+                                       args=(server.server_address[:2], paths[i:] + paths[:i], duration, queue))
+               for i in range(connections)]
+    for worker in workers:
+        worker.start()
+    results = [queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    server.shutdown()
+    stub.shutdown()
+
+    total = sum(count for count, _, _ in results)
+    latencies = sorted(latency for _, _, values in results for latency in values)
+    return {
+        'connections': connections,
+        'duration': duration,
+        'requests': total,
+        'failures': sum(failed for _, failed, _ in results),
+        'rps': total / duration,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        'upstream_hits': dict(stub.hits),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨/추천 JSON API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1, help="서버 프로세스 수 (fork, POSIX 전용)")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    parser.add_argument("--benchmark", action="store_true", help="로컬 대역 서버로 처리량 측정")
+    parser.add_argument("--connections", type=int, default=16, help="벤치마크 동시 연결 수")
+    parser.add_argument("--duration", type=float, default=5.0, help="벤치마크 시간 (초)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = run_benchmark(args.connections, args.duration)
+        print(f"⚡ {result['rps']:,.0f} req/s ({result['requests']:,}건 / {result['duration']:.0f}초, "
+              f"연결 {result['connections']}개, 실패 {result['failures']}건)")
+        print(f"   지연 p50 {result['p50_ms']:.2f}ms, p99 {result['p99_ms']:.2f}ms, "
+              f"업스트림 호출 {result['upstream_hits']}")
+        return
+
+    api_key = os.environ.get("OPENWEATHER_API_KEY", "")
+    server = WeatherAPIServer(None, api_key, (args.host, args.port), verbose=args.verbose)
+    print(f"🌤️ 날씨 API: {server.base_url} (API 키 {'설정됨' if api_key else '없음 - 데모 데이터'}, "
+          f"프로세스 {args.workers}개)")
+    # 같은 소켓을 여러 프로세스가 받음 - 메모리 캐시는 프로세스별, SQLite/이력 파일은 공유
+    for _ in range(args.workers - 1):
+        if os.fork() == 0:
+            break
+    server.service = WeatherService(api_key=api_key, cache=create_observation_cache(), history=create_history())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
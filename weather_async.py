@@ -0,0 +1,274 @@
+# weather_async.py - asyncio 업스트림 클라이언트 (이벤트 루프 하나에서 많은 요청 동시 처리)
+#
+# httpx가 설치되어 있으면 httpx.AsyncClient(h2까지 있으면 HTTP/2)를 쓰고, 없으면 내장
+# HTTP/1.1 keep-alive 연결 풀을 씁니다. 요청마다 스레드를 만들지 않고, 요청별 마감 시간
+# (timeout)은 asyncio.wait_for로 강제합니다. httpx 예외는 TimeoutError/ConnectionError로 바꿔
+# 올리므로 호출한 쪽(is_transient, AdaptiveTimeouts)은 전송 방식을 몰라도 됩니다.
+#
+# - 배치 작업처럼 이미 이벤트 루프가 있으면: async with AsyncUpstreamClient(...) as client
+# - Streamlit 스크립트 스레드처럼 루프가 없으면: get_async_engine().run(코루틴)
+#   (프로세스 공유 백그라운드 루프 + get_async_client() 클라이언트)
+
+import asyncio
+import json
+import os
+import ssl
+import threading
+from collections import defaultdict
+from typing import Awaitable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from weather_http import DEFAULT_BASE_URL
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - httpx의 HTTP/2 지원 여부 확인용
+except ImportError:
+    h2 = None
+
+T = TypeVar("T")
+
+
+class AsyncResponse:
+    """업스트림 응답 (requests.Response와 같은 이름의 최소 속성)"""
+    __slots__ = ('status_code', 'content', 'url', 'headers')
+
+    def __init__(self, status_code: int, content: bytes, url: str, headers: Dict[str, str] = None):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self.headers = headers or {}  # 이름은 소문자
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        """4xx/5xx이면 requests.HTTPError - 동기 경로와 같은 예외 처리 사용"""
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class _PooledHTTP11:
+    """asyncio 스트림 기반 HTTP/1.1 keep-alive 연결 풀 (GET 전용)"""
+
+    def __init__(self, pool_size: int, connect_timeout: float):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self._idle: Dict[Tuple[str, str, int], List[tuple]] = defaultdict(list)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ssl = ssl.create_default_context()
+
+    async def get(self, url: str) -> AsyncResponse:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        key = (parts.scheme, parts.hostname, parts.port or (443 if secure else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n"
+                   f"Accept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n").encode("latin-1")
+
+        async with self._slots:
+            # 쉬던 연결이 서버 쪽에서 닫혔을 수 있으므로 재사용 연결은 한 번 새 연결로 재시도
+            while True:
+                reused = bool(self._idle[key])
+                conn = self._idle[key].pop() if reused else await self._connect(key, secure)
+                try:
+                    status, headers, body, keep = await self._exchange(conn, request)
+                except (ConnectionError, asyncio.IncompleteReadError, EOFError):
+                    self._close(conn)
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    # 마감 시간 초과(취소) 등으로 응답을 다 읽지 못한 연결은 버림
+                    self._close(conn)
+                    raise
+                if keep:
+                    self._idle[key].append(conn)
+                else:
+                    self._close(conn)
+                return AsyncResponse(status, body, url, headers)
+
+    async def _connect(self, key: Tuple[str, str, int], secure: bool) -> tuple:
+        _, host, port = key
+        return await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl if secure else None),
+            self.connect_timeout)
+
+    @staticmethod
+    async def _exchange(conn: tuple, request: bytes) -> Tuple[int, Dict[str, str], bytes, bool]:
+        reader, writer = conn
+        writer.write(request)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise EOFError("연결이 닫혔습니다")
+        version, status = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body, keep = await reader.read(), False
+        return int(status), headers, body, keep
+
+    @staticmethod
+    def _close(conn: tuple):
+        conn[1].close()
+
+    async def aclose(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                self._close(conn)
+        self._idle.clear()
+
+
+class _HttpxTransport:
+    """httpx.AsyncClient 래퍼 (h2가 있으면 HTTP/2 다중화)"""
+
+    def __init__(self, pool_size: int, connect_timeout: float, read_timeout: float, http2: bool):
+        self.http2 = http2 and h2 is not None
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+
+    async def get(self, url: str) -> AsyncResponse:
+        """httpx 예외는 내장 전송과 같은 내장 예외(TimeoutError/ConnectionError)로 바꿔 올림 -
+        재시도/회로 차단/타임아웃 기록이 전송 방식과 관계없이 같게"""
+        try:
+            response = await self.client.get(url)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"응답 없음 ({type(e).__name__}): {urlsplit(url).path}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"연결 실패 ({type(e).__name__}): {urlsplit(url).path}") from e
+        return AsyncResponse(response.status_code, response.content, url,
+                             {name.lower(): value for name, value in response.headers.items()})
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AsyncUpstreamClient:
+    """asyncio 업스트림 클라이언트 - UpstreamClient와 같은 주소/풀/타임아웃 설정
+
+    한 인스턴스는 처음 사용한 이벤트 루프에서만 사용하세요 (연결이 루프에 묶임).
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 base_url: str = DEFAULT_BASE_URL, http2: bool = True, use_httpx: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        if use_httpx and httpx is not None:
+            self.transport = _HttpxTransport(pool_size, connect_timeout, read_timeout, http2)
+        else:
+            self.transport = _PooledHTTP11(pool_size, connect_timeout)
+
+    @property
+    def backend(self) -> str:
+        """사용 중인 전송 방식 ('httpx-h2', 'httpx', 'asyncio-http1.1')"""
+        if isinstance(self.transport, _HttpxTransport):
+            return "httpx-h2" if self.transport.http2 else "httpx"
+        return "asyncio-http1.1"
+
+    def url(self, path: str, params: dict = None) -> str:
+        url = path if path.startswith(("http://", "https://")) else self.base_url + path
+        return f"{url}?{urlencode(params)}" if params else url
+
+    async def get(self, path: str, params: dict = None, timeout: float = None) -> AsyncResponse:
+        """GET 요청 - timeout초(기본: 연결+읽기 타임아웃) 안에 끝나지 않으면 TimeoutError"""
+        deadline = timeout or self.connect_timeout + self.read_timeout
+        try:
+            return await asyncio.wait_for(self.transport.get(self.url(path, params)), deadline)
+        except asyncio.TimeoutError:
+            # Python 3.11 전에는 asyncio.TimeoutError가 내장 TimeoutError(OSError)와 다른 클래스 -
+            # 재시도/회로 차단(is_transient)과 타임아웃 집계가 보는 TimeoutError로 맞춤
+            raise TimeoutError(f"{deadline:.2f}초 안에 응답 없음: {path}") from None
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> "AsyncUpstreamClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class AsyncEngine:
+    """백그라운드 스레드 하나에서 도는 이벤트 루프 - 동기 코드에서 코루틴 실행"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-engine", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Awaitable[T]):
+        """코루틴 예약 - concurrent.futures.Future 반환"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: float = None) -> T:
+        """코루틴을 실행하고 결과를 기다림 (호출 스레드만 대기, 루프는 계속 다른 작업 처리)"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_engine: Optional[AsyncEngine] = None
+_client: Optional[AsyncUpstreamClient] = None
+_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """프로세스 공유 백그라운드 이벤트 루프"""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = AsyncEngine()
+    return _engine
+
+
+def get_async_client() -> AsyncUpstreamClient:
+    """get_async_engine() 루프에서 쓰는 공유 클라이언트 - 환경변수는 get_upstream_client와 같음"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = AsyncUpstreamClient(
+                    pool_size=int(os.environ.get("OPENWEATHER_POOL_SIZE", 10)),
+                    connect_timeout=float(os.environ.get("OPENWEATHER_CONNECT_TIMEOUT", 3.05)),
+                    read_timeout=float(os.environ.get("OPENWEATHER_READ_TIMEOUT", 10)),
+                    base_url=os.environ.get("OPENWEATHER_BASE_URL", DEFAULT_BASE_URL),
+                )
+    return _client
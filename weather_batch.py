@@ -0,0 +1,139 @@
+# weather_batch.py - 추천 로직의 배열(NumPy) 버전
+#
+# WeatherApp.get_outfit_recommendation 등 단일 WeatherData용 함수와 같은 규칙 표
+# (weather_rules.RULES)를 관측값 배열 전체에 한 번에 적용합니다. 결과는 문구 대신
+# 범주 ID/점수 배열이며, 각 범주 ID는 weather_rules의 문구 표 인덱스와 같습니다.
+
+from dataclasses import dataclass
+from typing import Iterable, Sequence, Union
+
+import numpy as np
+
+from weather_forecast import condition_code
+from weather_rules import CITY_NOTES, RULES
+
+ArrayLike = Union[np.ndarray, Sequence[float]]
+
+NO_CITY_NOTE_DELAY = np.iinfo(np.int16).max  # 도시별 안내가 없는 도시
+
+
+def _f64(values: ArrayLike) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def condition_codes(conditions: Iterable[str]) -> np.ndarray:
+    """WeatherData.weather_condition 목록을 조건 코드 배열로 변환"""
+    return np.fromiter((condition_code(c) for c in conditions), dtype=np.int16)
+
+
+@dataclass
+class OutfitBatch:
+    temp_band: np.ndarray       # 0: < -10, 1: < 0, 2: < 10, 3: < 15, 4: < 20, 5: < 25, 6: 그 이상
+    condition_extra: np.ndarray  # 0: 없음, 1: 비/이슬비, 2: 뇌우, 3: 눈
+    humidity_extra: np.ndarray   # 0: 없음, 1: > 80, 2: < 30
+    wind_extra: np.ndarray       # wind_speed > 10
+
+
+def outfit_batch(temperature: ArrayLike, feels_like: ArrayLike, humidity: ArrayLike,
+                 wind_speed: ArrayLike, codes: ArrayLike) -> OutfitBatch:
+    """get_outfit_recommendation의 배열 버전"""
+    temp, feels = _f64(temperature), _f64(feels_like)
+    effective = np.where(RULES['outfit_feels_gap'].lookup(np.abs(feels - temp)) == 1, feels, temp)
+    return OutfitBatch(
+        temp_band=RULES['outfit_temp'].lookup(effective).astype(np.int8),
+        condition_extra=RULES['outfit_condition'].lookup(codes).astype(np.int8),
+        humidity_extra=RULES['outfit_humidity'].lookup(humidity).astype(np.int8),
+        wind_extra=RULES['outfit_wind'].lookup(wind_speed).astype(bool),
+    )
+
+
+@dataclass
+class TransportBatch:
+    risk_score: np.ndarray  # 기상 위험도
+    category: np.ndarray    # 0: >= 7, 1: >= 4, 2: >= 2, 3: 그 외
+    rain: np.ndarray        # 우산 안내
+    gust: np.ndarray        # wind_speed > 12
+    low_visibility: np.ndarray  # visibility < 5
+    icy: np.ndarray         # temperature < 0
+    humid: np.ndarray       # humidity > 85
+
+
+def transport_batch(temperature: ArrayLike, humidity: ArrayLike, wind_speed: ArrayLike,
+                    visibility: ArrayLike, codes: ArrayLike) -> TransportBatch:
+    """get_transport_recommendation의 배열 버전"""
+    risk = (RULES['transport_condition_risk'].lookup(codes) + RULES['transport_wind_risk'].lookup(wind_speed)
+            + RULES['transport_visibility_risk'].lookup(visibility)
+            + RULES['transport_temp_risk'].lookup(temperature)).astype(np.int8)
+    return TransportBatch(
+        risk_score=risk,
+        category=RULES['transport_category'].lookup(risk).astype(np.int8),
+        rain=RULES['transport_rain'].lookup(codes).astype(bool),
+        gust=RULES['transport_gust'].lookup(wind_speed).astype(bool),
+        low_visibility=RULES['transport_low_visibility'].lookup(visibility).astype(bool),
+        icy=RULES['transport_icy'].lookup(temperature).astype(bool),
+        humid=RULES['transport_humid'].lookup(humidity).astype(bool),
+    )
+
+
+@dataclass
+class DepartureBatch:
+    delay_minutes: np.ndarray  # 평소보다 일찍 출발할 시간 (분)
+    category: np.ndarray       # 0: >= 30, 1: >= 15, 2: >= 5, 3: 그 외
+    period: np.ndarray         # 0: 해당 없음/주말, 1: 출근, 2: 퇴근, 3: 점심, 4: 심야
+    weekend: np.ndarray
+    city_note: np.ndarray      # 0: 없음, 1: 지하철 권장, 2: 지하철/버스 혼용, 3: 우회로 검토
+
+
+def departure_batch(wind_speed: ArrayLike, visibility: ArrayLike, codes: ArrayLike,
+                    local_hour: ArrayLike, weekday: ArrayLike,
+                    city: Union[str, Sequence[str]]) -> DepartureBatch:
+    """get_departure_time_recommendation의 배열 버전 - 현지 시각(시)과 요일(0=월)을 함께 전달"""
+    hour = np.asarray(local_hour, dtype=np.int64)
+    weekend = np.asarray(weekday, dtype=np.int64) >= 5
+
+    delay = (RULES['departure_condition_delay'].lookup(codes) + RULES['departure_wind_delay'].lookup(wind_speed)
+             + RULES['departure_visibility_delay'].lookup(visibility))
+    delay = (delay + np.where(weekend, 0, RULES['departure_rush_delay'].lookup(hour))).astype(np.int16)
+    period = np.where(weekend, 0, RULES['departure_period'].lookup(hour)).astype(np.int8)
+
+    # 도시별 안내: 도시 → (지연 기준, 안내 번호)
+    cities = np.broadcast_to(np.asarray(city, dtype=object), delay.shape).ravel()
+    unique, inverse = np.unique(cities, return_inverse=True)
+    note_rules = np.array([CITY_NOTES.get(c, (NO_CITY_NOTE_DELAY, 0)) for c in unique],
+                          dtype=np.int64).reshape(-1, 2)[inverse]
+    min_delay = note_rules[:, 0].reshape(delay.shape)
+    city_note = np.where(delay > min_delay, note_rules[:, 1].reshape(delay.shape), 0).astype(np.int8)
+
+    return DepartureBatch(
+        delay_minutes=delay,
+        category=RULES['departure_category'].lookup(delay).astype(np.int8),
+        period=period,
+        weekend=weekend,
+        city_note=city_note,
+    )
+
+
+@dataclass
+class HealthBatch:
+    temp_band: np.ndarray      # 0: 없음, 1: < -10, 2: < 0, 3: > 35, 4: > 30
+    humidity_band: np.ndarray  # 0: 없음, 1: > 85, 2: > 70, 3: < 30, 4: < 40
+    pressure_band: np.ndarray  # 0: 없음, 1: < 1000, 2: > 1030
+    wet: np.ndarray            # 비 또는 뇌우
+    snow: np.ndarray
+    strong_wind: np.ndarray    # wind_speed > 15
+    feels_gap: np.ndarray      # |체감온도 - 기온| > 5
+
+
+def health_batch(temperature: ArrayLike, feels_like: ArrayLike, humidity: ArrayLike,
+                 pressure: ArrayLike, wind_speed: ArrayLike, codes: ArrayLike) -> HealthBatch:
+    """get_health_advice의 배열 버전"""
+    temp, feels = _f64(temperature), _f64(feels_like)
+    return HealthBatch(
+        temp_band=RULES['health_temp'].lookup(temp).astype(np.int8),
+        humidity_band=RULES['health_humidity'].lookup(humidity).astype(np.int8),
+        pressure_band=RULES['health_pressure'].lookup(pressure).astype(np.int8),
+        wet=RULES['health_wet'].lookup(codes).astype(bool),
+        snow=RULES['health_snow'].lookup(codes).astype(bool),
+        strong_wind=RULES['health_wind'].lookup(wind_speed).astype(bool),
+        feels_gap=RULES['health_feels_gap'].lookup(np.abs(feels - temp)).astype(bool),
+    )
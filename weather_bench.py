@@ -0,0 +1,258 @@
+# weather_bench.py - 벤치마크 모음 (추천 함수, 현지 시간, 조회 경로, 전체 페이지 재실행)
+#
+# 실행: python weather_bench.py                    결과를 .cache/bench_results.json에 쓰고 기준선과 비교
+#       python weather_bench.py --update-baseline  현재 결과를 bench_baseline.json(기준선)으로 저장
+#       python weather_bench.py --only scalar,fetch
+#
+# 업스트림은 모두 로컬 대역 서버(stub_server.py)이므로 네트워크 없이 돌아갑니다. 전체 페이지
+# 재실행은 Streamlit의 AppTest로 재며, streamlit이 없으면 건너뜁니다. 기준선보다 tolerance
+# (기본 35% - 공유 기계의 측정 잡음보다 넉넉하게) 넘게 나빠진 항목이 있으면 종료 코드 1.
+# 표본이 수십 개뿐인 p95처럼 더 흔들리는 항목은 결과에 자기 tolerance를 담아 더 넓게 봅니다.
+# 기준선은 같은 기계에서 만든 것과 비교하고, 페이지 구조를 바꾸면 다시 만드세요.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List
+
+# 캐시/이력 파일을 건드리지 않도록 WeatherService를 불러오기 전에 설정
+os.environ.setdefault("WEATHER_CACHE_DB", "")
+os.environ.setdefault("WEATHER_HISTORY_FILE", "")
+
+from stub_server import STUB_CITIES, current_weather_payload, start_stub_server  # noqa: E402
+from weather_cache import ObservationCache  # noqa: E402
+from weather_http import UpstreamClient  # noqa: E402
+from weather_quota import QuotaScheduler  # noqa: E402
+from weather_service import CITIES, WeatherService  # noqa: E402
+
+DEFAULT_OUTPUT = ".cache/bench_results.json"
+DEFAULT_BASELINE = "bench_baseline.json"
+SUITES = ("scalar", "fetch", "page")
+
+# 결과 항목: {'value': 값, 'unit': 단위, 'better': 'higher' | 'lower'[, 'tolerance': 항목별 허용 악화 비율]}
+Results = Dict[str, dict]
+
+# 전체 페이지 재실행의 p95 허용 악화 비율 - 1 CPU에서 AppTest 표본 30개의 p95는 실행마다 60~70%씩 흔들림
+PAGE_TAIL_TOLERANCE = 1.0
+
+
+def _throughput(value: float) -> dict:
+    return {'value': round(value, 1), 'unit': 'ops/s', 'better': 'higher'}
+
+
+def _latency(seconds: float, unit: str = 'ms') -> dict:
+    scale = 1e6 if unit == 'us' else 1e3
+    return {'value': round(seconds * scale, 3), 'unit': unit, 'better': 'lower'}
+
+
+def _percentiles(name: str, samples: List[float], unit: str = 'ms', quantiles=(0.5, 0.95),
+                 tail_tolerance: float = None) -> Results:
+    """지연 백분위 항목 - p99는 표본이 수천 개 이상일 때만 (적으면 최댓값이라 비교가 흔들림)
+
+    tail_tolerance: p50보다 높은 백분위에 붙일 항목별 허용 악화 비율 (없으면 --tolerance)
+    """
+    samples = sorted(samples)
+    results = {}
+    for q in quantiles:
+        result = _latency(samples[min(len(samples) - 1, int(q * len(samples)))], unit)
+        if tail_tolerance is not None and q > 0.5:
+            result['tolerance'] = tail_tolerance
+        results[f"{name}.p{int(q * 100)}"] = result
+    return results
+
+
+def ops_per_second(fn: Callable[[], None], ops_per_call: int, rounds: int = 15) -> float:
+    """fn을 0.2초 이상 걸리도록 반복한 묶음을 rounds번 재서 가장 빠른 묶음 기준 초당 처리량"""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=rounds, number=loops))
+    return loops * ops_per_call / best
+
+
+def sample_observations(service: WeatherService) -> list:
+    """대역 서버 응답으로 만든 도시별 관측값 (하루 동안 3시간 간격 → 다양한 기온/날씨)"""
+    now = time.time()
+    return [service._parse_weather(current_weather_payload(city, now + hours * 3600))
+            for city in STUB_CITIES for hours in range(0, 24, 3)]
+
+
+def bench_scalar(service: WeatherService) -> Results:
+    """단일 관측값용 추천 함수 4개와 get_city_local_time의 초당 처리량"""
+    observations = sample_observations(service)
+    pairs = [(weather, CITIES[i % len(CITIES)]) for i, weather in enumerate(observations)]
+    results = {}
+    for name, fn in (("outfit", service.get_outfit_recommendation),
+                     ("transport", service.get_transport_recommendation),
+                     ("health", service.get_health_advice)):
+        results[f"scalar.{name}"] = _throughput(ops_per_second(
+            lambda fn=fn: [fn(weather) for weather in observations], len(observations)))
+    results["scalar.departure"] = _throughput(ops_per_second(
+        lambda: [service.get_departure_time_recommendation(weather, city) for weather, city in pairs], len(pairs)))
+    results["scalar.local_time"] = _throughput(ops_per_second(
+        lambda: [service.get_city_local_time(city) for city in CITIES], len(CITIES)))
+    return results
+
+
+def bench_fetch(service: WeatherService, hits: int = 20_000, misses: int = 300) -> Results:
+    """fetch_weather_data 캐시 적중(µs)/미스(대역 서버 왕복, ms) 호출당 지연"""
+    for city in CITIES:
+        service.fetch_weather_data(city, fallback=False)
+
+    samples = []
+    for i in range(hits):
+        city = CITIES[i % len(CITIES)]
+        started = time.perf_counter()
+        service.fetch_weather_data(city)
+        samples.append(time.perf_counter() - started)
+    results = _percentiles("fetch.cache_hit", samples, unit='us', quantiles=(0.5, 0.95, 0.99))
+
+    samples = []
+    for i in range(misses):
+        city = CITIES[i % len(CITIES)]
+        service.refresh_city(city)
+        started = time.perf_counter()
+        service.fetch_weather_data(city, fallback=False)
+        samples.append(time.perf_counter() - started)
+    results.update(_percentiles("fetch.cache_miss", samples))
+    return results
+
+
+def bench_page(base_url: str, reruns: int = 30) -> Results:
+    """streamlit_app.py 전체 재실행 시간 (AppTest) - 첫 실행, 같은 도시 재실행, 도시 바꾸기"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("⚠️ streamlit이 없어 전체 페이지 벤치마크를 건너뜁니다")
+        return {}
+
+    # 앱의 공유 클라이언트가 대역 서버를 쓰도록 (첫 실행 전에 설정해야 함)
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py"),
+                            default_timeout=60)
+    app.secrets["OPENWEATHER_API_KEY"] = "bench"
+
+    started = time.perf_counter()
+    app.run()
+    results = {"page.cold": _latency(time.perf_counter() - started)}
+    if app.exception:
+        raise RuntimeError(f"앱 실행 중 예외: {app.exception[0].message}")
+
+    samples = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - started)
+    results.update(_percentiles("page.rerun", samples, tail_tolerance=PAGE_TAIL_TOLERANCE))
+
+    samples = []
+    for i in range(reruns):
+        city = CITIES[(i + 1) % len(CITIES)]
+        started = time.perf_counter()
+        app.selectbox[0].select(city).run()
+        samples.append(time.perf_counter() - started)
+    results.update(_percentiles("page.switch_city", samples, tail_tolerance=PAGE_TAIL_TOLERANCE))
+    return results
+
+
+def run(suites=SUITES) -> dict:
+    """벤치마크 실행 - {'meta': 실행 환경, 'results': {항목: 결과}}"""
+    stub = start_stub_server()
+    service = WeatherService(api_key="bench", cache=ObservationCache(ttl=300, max_entries=256),
+                             http=UpstreamClient(base_url=stub.base_url),
+                             quota=QuotaScheduler(per_minute=1_000_000))
+    results: Results = {}
+    try:
+        if "scalar" in suites:
+            results.update(bench_scalar(service))
+        if "fetch" in suites:
+            results.update(bench_fetch(service))
+        if "page" in suites:
+            results.update(bench_page(stub.base_url))
+    finally:
+        service.prefetcher.stop()
+        stub.shutdown()
+    return {'meta': environment(), 'results': results}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(current: Results, baseline: Results, tolerance: float) -> List[str]:
+    """기준선 대비 표를 출력하고 tolerance(항목에 더 넓은 tolerance가 있으면 그것)보다 나빠진 항목 이름 반환"""
+    regressions = []
+    print(f"{'항목':<28}{'기준선':>14}{'현재':>14}{'변화':>10}")
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None or not base['value']:
+            print(f"{name:<28}{'-':>14}{result['value']:>14,.1f} {result['unit']}")
+            continue
+        change = result['value'] / base['value'] - 1
+        worse = -change if result['better'] == 'higher' else change
+        limit = max(tolerance, result.get('tolerance', tolerance))
+        flag = "❌" if worse > limit else ("✅" if worse < -limit else "")
+        if worse > limit:
+            regressions.append(name)
+        print(f"{name:<28}{base['value']:>14,.1f}{result['value']:>14,.1f}{change:>+10.1%} {result['unit']} {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 앱 벤치마크")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"실행할 묶음 ({', '.join(SUITES)})")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준선 JSON 경로")
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준선으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="허용하는 악화 비율")
+    args = parser.parse_args()
+
+    report = run([suite.strip() for suite in args.only.split(",") if suite.strip()])
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 결과: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"📌 기준선 저장: {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"⚠️ 기준선 {args.baseline} 없음 - --update-baseline으로 만드세요")
+        return
+    print(f"📌 기준선: {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}, "
+          f"{baseline['meta'].get('platform')})")
+    regressions = compare(report['results'], baseline['results'], args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)}개 항목이 {args.tolerance:.0%} 넘게 느려졌습니다: {', '.join(regressions)}")
+        sys.exit(1)
+    print("✅ 기준선 대비 성능 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# weather_breaker.py - 업스트림 장애 대응 (회로 차단기 + 지수 백오프 재시도)
+#
+# 업스트림이 죽어 있으면 요청마다 타임아웃(최대 10초)을 다 기다린 뒤에야 데모 데이터로
+# 넘어갑니다. 일시적 오류(연결 실패, 타임아웃, 5xx)가 연달아 failure_threshold번 나면 회로를
+# 열어 reset_timeout초 동안 업스트림 요청을 보내지 않고 바로 CircuitOpen을 올립니다 - 호출한
+# 쪽은 마지막으로 성공한 관측값이나 데모 데이터를 즉시 보여줍니다. 시간이 지나면 백그라운드
+# 요청 하나만 시험 삼아 보내고(half-open) 성공하면 닫고, 실패하면 더 오래 엽니다.
+
+import random
+import threading
+import time
+
+import requests
+
+from weather_quota import Priority
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 우선순위별 일시적 오류 재시도 횟수 - 사용자 조회는 화면이 기다리므로 한 번만
+MAX_RETRIES = {Priority.INTERACTIVE: 1, Priority.REFRESH: 2, Priority.BATCH: 2}
+
+
+class CircuitOpen(Exception):
+    """회로가 열려 있어 업스트림 요청을 보내지 않음 - retry_after: 다시 시도할 수 있을 때까지 (초)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"업스트림 회로 열림 ({retry_after:.0f}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """재시도/회로 차단 대상인 일시적 오류인지 (연결 실패, 타임아웃, 5xx)
+
+    4xx(없는 도시, 잘못된 키, 429)는 업스트림이 살아 있다는 뜻이므로 제외합니다.
+    """
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code >= 500
+    if isinstance(error, requests.RequestException):
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+    # asyncio 경로: 연결 거부/DNS 실패(OSError), 마감 시간 초과(TimeoutError)
+    return isinstance(error, OSError)
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    """attempt번째 재시도 전 대기 시간 (초) - 상한 있는 지수 백오프 + full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """업스트림 회로 차단기 (모든 세션이 공유)
+
+    - closed: 평소. 일시적 오류가 연달아 failure_threshold번 나면 open
+    - open: reset_timeout초 동안 모든 요청을 바로 거절 (CircuitOpen)
+    - half_open: open 시간이 지난 뒤 시험 요청(probe) 하나만 통과. 성공하면 closed,
+      실패하면 reset_timeout을 두 배로 늘려(max_reset_timeout까지) 다시 open
+
+    before_call(probe=False)로 부르면 시험 요청이 되지 않습니다 - 사용자 조회는 시험 요청을
+    기다리지 않고 바로 대체 데이터를 받고, 시험은 백그라운드 갱신이 맡습니다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 15,
+                 max_reset_timeout: float = 300):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0  # 연속 일시적 오류 수
+        self.opened_until = 0.0  # monotonic
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opened = 0    # 열린 횟수
+        self.rejected = 0  # 회로가 열려 거절한 요청 수
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def retry_after(self) -> float:
+        """시험 요청을 보낼 수 있을 때까지 남은 시간 (초, closed이면 0)"""
+        with self._lock:
+            return max(0.0, self.opened_until - time.monotonic()) if self.state != CLOSED else 0.0
+
+    def before_call(self, probe: bool = True):
+        """업스트림 요청 직전 확인 - 보내면 안 되면 CircuitOpen"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if probe and not self._probing and now >= self.opened_until:
+                self.state = HALF_OPEN
+                self._probing = True
+                return
+            self.rejected += 1
+            raise CircuitOpen(max(0.0, self.opened_until - now))
+
+    def record_success(self):
+        """업스트림이 응답함 (4xx 포함) - 회로 닫기"""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probing = False
+
+    def record_failure(self):
+        """일시적 오류 - 연속 failure_threshold번이거나 시험 요청이 실패하면 회로 열기"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def cancel(self):
+        """결과 없이 끝난 요청 (호출 한도 초과, 취소) - 시험 요청이었으면 다음 요청이 다시 시험"""
+        with self._lock:
+            if self._probing:
+                self._probing = False
+                self.state = OPEN
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_until = time.monotonic() + self.reset_timeout
+        self._probing = False
+        self.opened += 1
@@ -0,0 +1,323 @@
+# weather_cache.py - 도시별 날씨 관측값 캐시
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator as IteratorABC
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """캐시 키에 API 키 원문 대신 사용할 짧은 지문"""
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class CacheEntry:
+    """캐시 항목 - 값과 가져온 시각(epoch 초)"""
+    value: Any
+    fetched_at: float
+
+    def age(self, now: float = None) -> float:
+        """가져온 뒤 지난 시간 (초)"""
+        return (now if now is not None else time.time()) - self.fetched_at
+
+
+class CacheBackend:
+    """관측값 영구 저장소 인터페이스 - 키는 (도시, API 키 지문)"""
+
+    def load(self, since: float) -> Iterator[Tuple[str, str, Any, float]]:
+        """since 이후에 가져온 (도시, 키 지문, 값, 가져온 시각)을 오래된 순으로 반환"""
+        return iter(())
+
+    def save(self, city: str, fingerprint: str, value: Any, fetched_at: float):
+        pass
+
+    def delete(self, city: str, fingerprint: Optional[str] = None):
+        pass
+
+    def delete_key(self, fingerprint: str):
+        pass
+
+    def prune(self, before: float):
+        """before 이전에 가져온 항목 삭제"""
+        pass
+
+    def clear(self):
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    """SQLite 파일 저장소 - 재시작/재배포 후에도 캐시 유지
+
+    WAL 모드와 스레드별 연결을 사용해 여러 세션이 동시에 읽어도 서로 막지 않습니다.
+    값은 encode/decode로 JSON 호환 dict와 변환해 저장합니다.
+    """
+
+    def __init__(self, path: str, encode: Callable[[Any], dict] = None,
+                 decode: Callable[[dict], Any] = None):
+        self.path = path
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda data: data)
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS observations ("
+                " city TEXT NOT NULL, key_id TEXT NOT NULL, fetched_at REAL NOT NULL,"
+                " payload TEXT NOT NULL, PRIMARY KEY (city, key_id))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, since: float) -> Iterator[Tuple[str, str, Any, float]]:
+        rows = self._conn().execute(
+            "SELECT city, key_id, payload, fetched_at FROM observations"
+            " WHERE fetched_at >= ? ORDER BY fetched_at", (since,)
+        ).fetchall()
+        for city, key_id, payload, fetched_at in rows:
+            try:
+                yield city, key_id, self.decode(json.loads(payload)), fetched_at
+            except (ValueError, KeyError, TypeError):
+                continue  # 형식이 바뀐 옛 항목은 건너뜀
+
+    def save(self, city: str, fingerprint: str, value: Any, fetched_at: float):
+        payload = json.dumps(self.encode(value), ensure_ascii=False)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO observations (city, key_id, fetched_at, payload)"
+                " VALUES (?, ?, ?, ?)", (city, fingerprint, fetched_at, payload)
+            )
+
+    def delete(self, city: str, fingerprint: Optional[str] = None):
+        with self._conn() as conn:
+            if fingerprint is None:
+                conn.execute("DELETE FROM observations WHERE city = ?", (city,))
+            else:
+                conn.execute("DELETE FROM observations WHERE city = ? AND key_id = ?", (city, fingerprint))
+
+    def delete_key(self, fingerprint: str):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM observations WHERE key_id = ?", (fingerprint,))
+
+    def prune(self, before: float):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM observations WHERE fetched_at < ?", (before,))
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM observations")
+
+
+class ObservationCache:
+    """(도시, API 키) 단위 관측값 캐시 - TTL 만료 + LRU 제거
+
+    TTL이 지난 항목도 stale_ttl초 동안은 보관해 get_stale()로 꺼낼 수 있습니다
+    (stale-while-revalidate). backend를 주면 저장/삭제를 영구 저장소에도 반영하고
+    warm()으로 재시작 직후 메모리 캐시를 채울 수 있습니다. 모든 Streamlit 세션이
+    하나의 인스턴스를 공유하므로 내부 상태는 락으로 보호합니다.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256, stale_ttl: float = 0,
+                 backend: CacheBackend = None):
+        self.backend = backend or CacheBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def _key(city: str, api_key: Optional[str]) -> Tuple[str, str]:
+        return city, key_fingerprint(api_key)
+
+    def get(self, city: str, api_key: Optional[str] = None) -> Optional[Any]:
+        """만료되지 않은 값 반환 (없으면 None)"""
+        key = self._key(city, api_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            age = entry.age()
+            if age >= self.ttl:
+                if age >= self.ttl + self.stale_ttl:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def get_stale(self, city: str, api_key: Optional[str] = None) -> Optional[CacheEntry]:
+        """TTL이 지났지만 stale_ttl 안에 있는 항목 반환 (없으면 None)"""
+        key = self._key(city, api_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.age() >= self.ttl + self.stale_ttl:
+                return None
+            self._entries.move_to_end(key)
+            self.stale_hits += 1
+            return entry
+
+    def peek(self, city: str, api_key: Optional[str] = None) -> Optional[CacheEntry]:
+        """만료 여부와 관계없이 항목 조회 - LRU 순서와 통계에 영향 없음"""
+        with self._lock:
+            return self._entries.get(self._key(city, api_key))
+
+    def put(self, city: str, api_key: Optional[str], value: Any, fetched_at: float = None):
+        """값 저장 - 용량 초과 시 가장 오래 사용되지 않은 항목부터 제거"""
+        key = self._key(city, api_key)
+        entry = CacheEntry(value, fetched_at if fetched_at is not None else time.time())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        self._backend_call(self.backend.save, city, key[1], value, entry.fetched_at)
+
+    def warm(self) -> int:
+        """영구 저장소에서 아직 쓸 수 있는 항목을 읽어 메모리 캐시 채우기 - 읽은 개수 반환"""
+        since = time.time() - (self.ttl + self.stale_ttl)
+        self._backend_call(self.backend.prune, since)
+        loaded = 0
+        for city, fingerprint, value, fetched_at in self._backend_call(self.backend.load, since) or ():
+            with self._lock:
+                key = (city, fingerprint)
+                self._entries[key] = CacheEntry(value, fetched_at)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            loaded += 1
+        return loaded
+
+    @staticmethod
+    def _backend_call(method, *args):
+        """저장소 오류는 무시 - 메모리 캐시만으로도 동작"""
+        try:
+            result = method(*args)
+            return list(result) if isinstance(result, IteratorABC) else result
+        except sqlite3.Error:
+            return None
+
+    def invalidate(self, city: str, api_key: Optional[str] = None) -> int:
+        """한 도시의 항목 제거 - api_key가 없으면 해당 도시의 모든 키 항목 제거"""
+        with self._lock:
+            if api_key is not None:
+                removed = 1 if self._entries.pop(self._key(city, api_key), None) else 0
+            else:
+                keys = [k for k in self._entries if k[0] == city]
+                for k in keys:
+                    del self._entries[k]
+                removed = len(keys)
+        self._backend_call(self.backend.delete, city,
+                           None if api_key is None else key_fingerprint(api_key))
+        return removed
+
+    def invalidate_key(self, api_key: Optional[str]) -> int:
+        """한 API 키로 가져온 모든 항목 제거"""
+        fingerprint = key_fingerprint(api_key)
+        with self._lock:
+            keys = [k for k in self._entries if k[1] == fingerprint]
+            for k in keys:
+                del self._entries[k]
+        self._backend_call(self.backend.delete_key, fingerprint)
+        return len(keys)
+
+    def clear(self):
+        """전체 항목 제거"""
+        with self._lock:
+            self._entries.clear()
+        self._backend_call(self.backend.clear)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나로 합치기 (single-flight)
+
+    키마다 처음 호출한 쪽(리더)만 실제로 함수를 실행하고, 그동안 들어온 같은 키의 호출은
+    리더의 결과(또는 예외)를 함께 받습니다. 동기 호출(do)과 asyncio 호출(do_async)이 같은
+    진행 중 목록을 쓰므로 스레드와 이벤트 루프 사이에서도 합쳐집니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.leaders = 0    # 실제 실행 횟수
+        self.coalesced = 0  # 다른 호출의 결과를 받은 횟수
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """(진행 중 Future, 리더 여부)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, value: Any = None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """fn() 결과와 공유 여부(다른 호출의 결과를 받았으면 True) 반환"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            value = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value, False
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """do의 asyncio 버전 - 기다리는 동안 이벤트 루프를 막지 않음"""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            value = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value, False
+
+    def in_flight(self) -> int:
+        """진행 중인 키 수"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,490 @@
+# weather_checks.py - WeatherService 동작 점검 (로컬 대역 서버 사용, 네트워크 불필요)
+#
+# 실행: python weather_checks.py                 모든 점검 - 하나라도 실패하면 종료 코드 1
+#       python weather_checks.py quota breaker   이름을 준 점검만
+#
+# 점검: singleflight, quota, breaker, timeouts, metrics, resilience
+#
+# 점검마다 항목을 report(이름, 통과 여부, 설명)로 기록하고, 끝에 실패한 항목이 있으면
+# AssertionError로 끝납니다. 대역 서버와 서비스는 stub_service()로 만들고 정리합니다.
+
+import argparse
+import contextlib
+import itertools
+import os
+import re
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# 캐시/이력 파일을 건드리지 않도록 WeatherService를 불러오기 전에 설정
+os.environ.setdefault("WEATHER_CACHE_DB", "")
+os.environ.setdefault("WEATHER_HISTORY_FILE", "")
+
+import requests  # noqa: E402
+
+from stub_server import Faults, StubWeatherServer, start_stub_server  # noqa: E402
+from weather_async import AsyncUpstreamClient, get_async_engine, httpx  # noqa: E402
+from weather_breaker import MAX_RETRIES, CircuitBreaker, is_transient  # noqa: E402
+from weather_cache import ObservationCache  # noqa: E402
+from weather_data import API_SOURCE, DEMO_SOURCE  # noqa: E402
+from weather_http import UpstreamClient  # noqa: E402
+from weather_metrics import METRICS  # noqa: E402
+from weather_quota import RESERVE, Priority, QuotaExceeded, QuotaScheduler  # noqa: E402
+from weather_service import CITIES, WeatherService  # noqa: E402
+from weather_timeouts import AdaptiveTimeouts  # noqa: E402
+
+API_KEY = "check"
+
+
+class Report:
+    """점검 항목 기록 - finish()는 실패한 항목이 있으면 AssertionError"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failed: List[str] = []
+
+    def __call__(self, label: str, ok: bool, detail: str):
+        if not ok:
+            self.failed.append(label)
+        print(f"{'✅' if ok else '❌'} {label}: {detail}")
+
+    def finish(self):
+        assert not self.failed, f"{self.name}: {', '.join(self.failed)} 실패"
+
+
+@contextlib.contextmanager
+def stub_service(latency: float = 0.0, faults: Faults = None, pool_size: int = 10,
+                 **resources) -> Iterator[Tuple[StubWeatherServer, WeatherService]]:
+    """대역 서버 + 그 서버를 업스트림으로 쓰는 새 WeatherService (캐시/single-flight 등은 점검마다 새로)
+
+    resources는 WeatherService 생성자 인자 (quota, breaker, timeouts 등)로 그대로 넘깁니다.
+    """
+    stub = start_stub_server(latency=latency, faults=faults)
+    resources.setdefault("cache", ObservationCache(ttl=300, max_entries=64, stale_ttl=3600))
+    service = WeatherService(api_key=API_KEY, http=UpstreamClient(base_url=stub.base_url, pool_size=pool_size),
+                             async_http=AsyncUpstreamClient(base_url=stub.base_url), **resources)
+    try:
+        yield stub, service
+    finally:
+        service.prefetcher.stop()
+        stub.shutdown()
+
+
+# ---- 점검 ----
+
+def check_single_flight(report: Report, sessions: int = 50, latency: float = 0.2):
+    """느린 대역 서버에 같은 도시를 sessions개 세션이 동시에 조회 - 업스트림 요청은 늘 1번
+
+    스레드(Streamlit 세션)끼리, asyncio(fetch_*_async)끼리, 둘이 섞인 경우, 업스트림 오류가
+    나는 경우 모두 요청 하나를 보내고 모든 세션이 같은 결과(또는 같은 오류)를 받아야 합니다.
+    """
+    engine = get_async_engine()
+
+    with stub_service(latency=latency, pool_size=sessions) as (stub, service):
+        def run_sessions(city: str, use_async: Callable[[int], bool]) -> list:
+            barrier = threading.Barrier(sessions)
+
+            def session(i: int):
+                barrier.wait()
+                try:
+                    if use_async(i):
+                        return engine.run(service.fetch_weather_data_async(city))
+                    return service.fetch_weather_data(city, allow_stale=True, fallback=False)
+                except Exception as e:
+                    return e
+
+            with ThreadPoolExecutor(max_workers=sessions) as pool:
+                return list(pool.map(session, range(sessions)))
+
+        for label, city, use_async in (("스레드 세션", "Seoul", lambda i: False),
+                                       ("asyncio 세션", "Busan", lambda i: True),
+                                       ("스레드 + asyncio", "Tokyo", lambda i: i % 2 == 1),
+                                       ("업스트림 오류", "Atlantis", lambda i: i % 2 == 1)):
+            before = stub.hits['weather']
+            results = run_sessions(city, use_async)
+            upstream = stub.hits['weather'] - before
+            if city == "Atlantis":
+                shared = all(isinstance(r, requests.HTTPError) for r in results)
+            else:
+                shared = all(r is results[0] for r in results)
+            report(label, upstream == 1 and shared,
+                   f"세션 {sessions}개 → 업스트림 {upstream}번 (기대 1), 결과 공유 {shared}")
+        print(f"   리더 {service.inflight.leaders}번, 합쳐진 호출 {service.inflight.coalesced}번")
+
+
+def check_quota(report: Report, per_minute: int = 10):
+    """호출 한도가 다 찼을 때 우선순위/stale 제공/장부가 맞게 동작하는지 확인
+
+    배치는 버킷의 절반, refresh-ahead는 3/4까지만 쓰고 남은 몫은 사용자 조회가 씁니다.
+    배치 조회에 합류한 사용자 조회는 배치 몫이 다 찼다는 실패를 물려받지 않아야 하고,
+    한도가 다 찬 뒤 사용자 조회는 만료된 캐시 항목을 받아야 합니다.
+    """
+    engine = get_async_engine()
+    quota = QuotaScheduler(per_minute=per_minute, max_wait={p: 0.0 for p in Priority})
+    cities = [city for city in CITIES if city != "Seoul"]
+
+    with stub_service(quota=quota) as (stub, service):
+        async def batch(names: List[str]):
+            return [r async for r in service.fetch_many_async(names, batch=False, max_concurrency=1)]
+
+        # 1) 배치는 예비분을 남기고 멈춤
+        results = engine.run(batch(cities))
+        fetched = sum(r.weather is not None for r in results)
+        expected = int(per_minute * (1 - RESERVE[Priority.BATCH]))
+        report("배치 상한", fetched == expected and all(isinstance(r.error, QuotaExceeded) for r in results
+                                                        if r.weather is None),
+               f"{len(cities)}개 도시 중 {fetched}개 조회 (기대 {expected}), 나머지는 한도 초과")
+
+        # 2) refresh-ahead도 자기 몫까지만
+        refreshed = 0
+        for city in cities:
+            try:
+                service._refresh_entry(city, API_KEY)
+                refreshed += 1
+            except QuotaExceeded:
+                break
+        expected = (int(per_minute * (1 - RESERVE[Priority.REFRESH]))
+                    - int(per_minute * (1 - RESERVE[Priority.BATCH])))
+        report("refresh-ahead 상한", refreshed == expected, f"{refreshed}번 갱신 (기대 {expected})")
+
+        # 3) 토큰을 기다리는 배치 조회에 합류한 사용자 조회는 배치가 한도 초과로 끝나도 자기 몫으로 다시 조회
+        city = next(name for name in reversed(cities) if service.cache.peek(name, API_KEY) is None)
+        quota.max_wait[Priority.BATCH] = 0.5
+        leader = threading.Thread(target=engine.run, args=(batch([city]),))
+        leader.start()
+        deadline = time.monotonic() + 0.3
+        while not service.inflight.in_flight() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        coalesced = service.inflight.coalesced
+        try:
+            served = service.fetch_weather_data(city, fallback=False)
+        except QuotaExceeded as e:
+            served = e
+        leader.join()
+        quota.max_wait[Priority.BATCH] = 0.0
+        report("우선순위 합류", service.inflight.coalesced > coalesced and getattr(served, "source", None) == API_SOURCE,
+               f"배치 조회에 합류, 사용자 조회 결과 {getattr(served, 'source', served)!r}")
+
+        # 4) 사용자 조회는 남은 토큰을 모두 쓰고, 다 쓰면 만료된 캐시 항목을 받음
+        stale = service._get_backup_weather_data("Seoul")
+        service.cache.put("Seoul", API_KEY, stale, fetched_at=time.time() - 600)
+        before = stub.hits['weather']
+        for city in cities:
+            if quota.remaining(API_KEY)["minute"] < 1:
+                break
+            service.refresh_city(city)
+            service.fetch_weather_data(city, fallback=False)
+        interactive = stub.hits['weather'] - before
+        served = service.fetch_weather_data("Seoul", fallback=False)
+        report("사용자 조회", interactive > 0 and served is stale,
+               f"남은 토큰으로 {interactive}번 조회, 한도 초과 후 만료된 캐시 반환 {served is stale}")
+
+        # 5) 장부 = 실제 업스트림 호출 수
+        upstream = stub.hits['weather']
+        report("호출 장부", quota.ledger.calls(minutes=1) == upstream == per_minute,
+               f"장부 {quota.ledger.calls(minutes=1)}번, 업스트림 {upstream}번, "
+               f"한도 초과 {sum(quota.ledger.by_city(outcome='rejected').values())}건")
+
+
+def check_breaker(report: Report, reset_timeout: float = 0.5):
+    """업스트림이 죽었을 때 회로가 열려 바로 대체 데이터를 주고, 살아나면 백그라운드 시험 요청으로
+    다시 닫히는지 확인
+
+    연결이 거부되는 주소로 시작한 뒤 대역 서버로 바꿉니다.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead_url = f"http://127.0.0.1:{sock.getsockname()[1]}/data/2.5"
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=reset_timeout)
+
+    with stub_service(breaker=breaker) as (stub, service):
+        live_http, service.http = service.http, UpstreamClient(base_url=dead_url)
+        stale = service._get_backup_weather_data("Seoul")
+        service.cache.put("Seoul", API_KEY, stale, fetched_at=time.time() - 600)
+
+        # 1) 일시적 오류는 한 번 재시도, 연속 오류가 쌓이면 회로 열림
+        served = service.fetch_weather_data("Seoul")
+        report("재시도", served is stale and breaker.failures == 1 + MAX_RETRIES[Priority.INTERACTIVE],
+               f"업스트림 실패 {breaker.failures}번 후 마지막 관측값 반환")
+        service.fetch_weather_data("Seoul")
+        report("회로 열림", not breaker.closed, f"연속 실패 {breaker.failures}번 → {breaker.state}")
+
+        # 2) 열린 동안은 업스트림을 기다리지 않음
+        started = time.perf_counter()
+        served = service.fetch_weather_data("Seoul")
+        demo = service.fetch_weather_data("Tokyo")
+        elapsed = (time.perf_counter() - started) * 1000
+        report("즉시 대체", served is stale and demo.source == DEMO_SOURCE and elapsed < 50,
+               f"마지막 관측값 + 데모 데이터 {elapsed:.1f}ms, 거절 {breaker.rejected}번")
+
+        # 3) 업스트림이 살아나면 백그라운드 시험 요청으로 닫힘 (사용자 조회는 계속 바로 반환)
+        service.http = live_http
+        time.sleep(reset_timeout)
+        started = time.perf_counter()
+        served = service.fetch_weather_data("Seoul")
+        elapsed = (time.perf_counter() - started) * 1000
+        deadline = time.monotonic() + 5
+        while not breaker.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        while service.is_revalidating("Seoul") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        fresh = service.fetch_weather_data("Seoul")
+        report("회로 닫힘", served is stale and breaker.closed and fresh.source == API_SOURCE,
+               f"사용자 조회 {elapsed:.1f}ms, 시험 요청 {stub.hits['weather']}번 후 {breaker.state}, "
+               f"열린 횟수 {breaker.opened}")
+
+
+def check_timeouts(report: Report, latency: float = 0.02):
+    """관측한 응답 시간으로 타임아웃이 줄었다가, 너무 짧으면 (표본이 많아도) 다시 늘어나고,
+    늦은 요청은 hedged 요청이 먼저 끝나는지 확인"""
+    timeouts = AdaptiveTimeouts(ceiling=5.0, floor=0.2)
+
+    with stub_service(latency=latency, timeouts=timeouts) as (stub, service):
+        # 1) 표본이 쌓이기 전에는 상한, 쌓이면 p99 기준으로 줄어듦
+        cold = timeouts.timeout("/weather")
+        for city in itertools.islice(itertools.cycle(CITIES), timeouts.min_samples):
+            service._request_weather(city, API_KEY)
+        warm = timeouts.timeout("/weather")
+        p99 = timeouts.snapshot()["/weather"]["p99"]
+        report("타임아웃 적응", cold == timeouts.ceiling and warm < cold,
+               f"표본 없음 {cold:.1f}초 → p99 {p99 * 1000:.0f}ms 관측 후 {warm:.2f}초")
+
+        # 2) 업스트림이 느려지면 상한(5초) 대신 적응한 타임아웃에 실패
+        stub.latency = 1.0
+        started = time.perf_counter()
+        try:
+            service._request_weather("Seoul", API_KEY)
+            failed = False
+        except requests.Timeout:
+            failed = True
+        elapsed = time.perf_counter() - started
+        report("빠른 실패", failed and elapsed < timeouts.ceiling / 2,
+               f"재시도 포함 {elapsed:.2f}초 만에 타임아웃 ({timeouts.timeouts}번)")
+
+        # 3) 타임아웃도 표본이 되므로 너무 짧은 타임아웃은 다시 늘어남
+        grown = timeouts.timeout("/weather")
+        report("자동 보정", grown > warm, f"타임아웃 {warm:.2f}초 → {grown:.2f}초")
+        stub.latency = latency
+
+    # 4) 표본이 가득 차 타임아웃 하나로는 p99가 움직이지 않아도 다음 타임아웃은 backoff배로 늘어남
+    def time_out(timeout: float):
+        raise requests.Timeout(f"{timeout:.2f}초 안에 응답 없음")
+
+    for _ in range(timeouts.window):
+        timeouts.observe("/backoff", latency)
+    short = timeouts.timeout("/backoff")
+    try:
+        timeouts.call("/backoff", time_out)
+    except requests.Timeout:
+        pass
+    longer = timeouts.timeout("/backoff")
+    report("타임아웃 후 늘림", longer >= short * timeouts.backoff,
+           f"표본 {timeouts.window}개, 타임아웃 {short:.2f}초 → 한 번 타임아웃 후 {longer:.2f}초")
+
+    # 5) hedged 요청 - 첫 요청이 p95보다 늦으면 두 번째 요청이 먼저 끝남
+    timeouts.hedge = True
+    delays = iter([1.0, 0.0])
+
+    def send(timeout: float) -> float:
+        time.sleep(next(delays))
+        return time.perf_counter()
+
+    for _ in range(timeouts.min_samples):
+        timeouts.observe("/hedge", latency)
+    started = time.perf_counter()
+    timeouts.call("/hedge", send, may_hedge=lambda: True)
+    elapsed = time.perf_counter() - started
+    report("hedged 요청", timeouts.hedge_wins == 1 and elapsed < 0.5,
+           f"{timeouts.hedge_after('/hedge') * 1000:.0f}ms 후 두 번째 요청 → {elapsed * 1000:.0f}ms에 응답")
+
+
+def check_metrics(report: Report, calls: int = 50_000, rounds: int = 5):
+    """지표가 꺼져 있을 때 비용이 무시할 만한지, 켜져 있을 때 JSON API의 /metrics에 단계별 시간과
+    캐시/업스트림 지표가 Prometheus 형식으로 나오는지 확인"""
+    from weather_api import start_api_server
+
+    with stub_service() as (stub, service):
+        # 1) 꺼져 있을 때 - 추천 함수 한 번에 더해지는 시간 (번갈아 잰 rounds번 중 가장 빠른 것끼리 비교)
+        weather = service._get_backup_weather_data("Seoul")
+        bare = WeatherService.get_outfit_recommendation.__wrapped__
+        wrapped = service.get_outfit_recommendation
+        was_enabled, METRICS.enabled = METRICS.enabled, False
+        baseline = timed_call = float('inf')
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(calls):
+                bare(service, weather)
+            baseline = min(baseline, time.perf_counter() - started)
+            started = time.perf_counter()
+            for _ in range(calls):
+                wrapped(weather)
+            timed_call = min(timed_call, time.perf_counter() - started)
+        overhead = (timed_call - baseline) / calls * 1e9
+        report("꺼졌을 때 비용", overhead < 500,
+               f"호출당 {overhead:.0f}ns (추천 함수 {baseline / calls * 1e9:.0f}ns)")
+
+        # 2) 켜져 있을 때 - /metrics 출력
+        METRICS.enabled = True
+        METRICS.reset()
+        server = start_api_server(service, api_key=API_KEY)
+        try:
+            conn = HTTPConnection(*server.server_address[:2])
+            for path in ["/weather/Seoul", "/recommendations/Seoul", "/weather/Tokyo", "/weather/Seoul"]:
+                conn.request("GET", path)
+                conn.getresponse().read()
+            conn.request("GET", "/metrics")
+            response = conn.getresponse()
+            text = response.read().decode("utf-8")
+            conn.close()
+        finally:
+            server.shutdown()
+            METRICS.enabled = was_enabled
+
+    line = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[^}]*\})? -?[0-9.e+-]+$|^[a-zA-Z_:][a-zA-Z0-9_:]*\{[^}]*\} \+?Inf$')
+    malformed = [row for row in text.splitlines() if row and not row.startswith("#") and not line.match(row)]
+    report("Prometheus 형식", response.status == 200 and not malformed,
+           f"{len(text.splitlines())}줄, 형식 오류 {len(malformed)}줄")
+    expected = ['weather_stage_seconds_count{stage="fetch_weather_data"} 4',
+                'weather_stage_seconds_count{stage="get_outfit_recommendation"} 1',
+                'weather_upstream_requests_total{endpoint="/weather",outcome="ok"} 2.0',
+                'weather_cache_hits_total{cache="observation"} 2.0',
+                'weather_cache_misses_total{cache="observation"} 2.0']
+    missing = [row for row in expected if row not in text]
+    stages = METRICS.stages()
+    report("단계/카운터", not missing,
+           f"fetch_weather_data p50 {stages['fetch_weather_data']['p50'] * 1000:.2f}ms, "
+           f"p99 {stages['fetch_weather_data']['p99'] * 1000:.2f}ms" + (f", 없음: {missing}" if missing else ""))
+
+
+def check_resilience(report: Report, calls: int = 300, seed: int = 7):
+    """대역 서버가 지연 분포(lognormal)와 5xx/429/타임아웃/연결 끊김을 섞어 내도 사용자 조회가
+    예외 없이 정해진 시간 안에 최신 관측값 또는 마지막 관측값으로 끝나는지 (데모 데이터 없음),
+    같은 시드면 같은 장애가 나오는지, httpx 전송(설치된 경우)의 타임아웃/연결 끊김도 재시도와
+    타임아웃 기록 대상인지 확인"""
+    def faults() -> Faults:
+        return Faults(latency=0.005, distribution="lognormal", spread=0.5, error_rate=0.08,
+                      rate_limit_rate=0.04, retry_after=0.05, timeout_rate=0.03, hang=2.0, drop_rate=0.03,
+                      seed=seed)
+
+    # 1) 같은 시드 → 같은 지연/장애 순서
+    first, second = faults(), faults()
+    sequence = [first.sample(API_KEY) for _ in range(1000)]
+    report("재현성", sequence == [second.sample(API_KEY) for _ in range(1000)],
+           f"시드 {seed}: 요청 1000개 중 장애 {sum(fault is not None for _, fault in sequence)}개")
+
+    # 2) 장애가 섞인 업스트림 - 매번 만료된 항목을 넣어 두고 조회 (최신이 아니면 마지막 관측값 또는 데모)
+    timeouts = AdaptiveTimeouts(ceiling=0.5, floor=0.2)
+    with stub_service(faults=faults(), timeouts=timeouts,
+                      breaker=CircuitBreaker(failure_threshold=5, reset_timeout=0.5),
+                      quota=QuotaScheduler(per_minute=1_000_000)) as (stub, service):
+        service._on_fetch_error = lambda city, error: None
+        outcomes, raised, elapsed = Counter(), 0, []
+        for i in range(calls):
+            city = CITIES[i % len(CITIES)]
+            stale = service._get_backup_weather_data(city)
+            service.cache.put(city, API_KEY, stale, fetched_at=time.time() - 600)
+            started = time.perf_counter()
+            try:
+                weather = service.fetch_weather_data(city)
+            except Exception:
+                raised += 1
+                continue
+            finally:
+                elapsed.append(time.perf_counter() - started)
+            outcomes["stale" if weather is stale else "demo" if weather.source == DEMO_SOURCE else "fresh"] += 1
+
+    elapsed.sort()
+    worst = elapsed[-1]
+    # 사용자 조회는 재시도 1번: 타임아웃 상한 2번 + 백오프 상한 + 여유
+    bound = timeouts.ceiling * 2 + 0.5
+    report("예외 없음", raised == 0, f"{calls}번 조회, 예외 {raised}번, 주입한 장애 {dict(stub.faults_injected)}")
+    report("응답 시간 상한", worst < bound,
+           f"p50 {elapsed[len(elapsed) // 2] * 1000:.1f}ms, p99 {elapsed[int(len(elapsed) * 0.99)] * 1000:.0f}ms, "
+           f"최대 {worst * 1000:.0f}ms (상한 {bound * 1000:.0f}ms), 타임아웃 {timeouts.timeouts}번")
+    # 429와 일시적 오류 모두 마지막 관측값으로 대신해야 함 (만료된 항목이 늘 있으므로 데모는 0번)
+    report("대체 데이터", outcomes["fresh"] >= calls * 0.7 and outcomes["stale"] > 0 and outcomes["demo"] == 0,
+           f"최신 {outcomes['fresh']}, 마지막 관측값 {outcomes['stale']}, 데모 {outcomes['demo']} (기대 0), "
+           f"회로 열림 {service.breaker.opened}번")
+
+    # 3) httpx 전송 - 읽기 타임아웃(0.3초)이 적응 타임아웃(0.6초~)보다 먼저 끝나도록 해서
+    #    httpx.ReadTimeout과 연결 끊김이 내장 예외로 바뀌어 재시도/타임아웃 기록 대상이 되는지
+    if httpx is None:
+        print("⏭️ httpx 전송: httpx가 설치되어 있지 않아 건너뜀")
+        return
+    engine = get_async_engine()
+    timeouts = AdaptiveTimeouts(ceiling=1.0, floor=0.6)
+    with stub_service(faults=Faults(latency=0.005, timeout_rate=0.1, hang=2.0, drop_rate=0.1, seed=seed),
+                      timeouts=timeouts, breaker=CircuitBreaker(failure_threshold=1_000, reset_timeout=0.5),
+                      quota=QuotaScheduler(per_minute=1_000_000)) as (stub, service):
+        service.async_http = AsyncUpstreamClient(base_url=stub.base_url, read_timeout=0.3, use_httpx=True)
+        errors = []
+        for i in range(calls // 5):
+            city = CITIES[i % len(CITIES)]
+            service.cache.invalidate(city, API_KEY)
+            try:
+                engine.run(service.fetch_weather_data_async(city))
+            except Exception as e:
+                errors.append(e)
+        injected = dict(stub.faults_injected)
+
+    faults_total = injected.get("timeout", 0) + injected.get("drop", 0)
+    report("httpx 예외 분류", all(is_transient(e) for e in errors) and len(errors) < faults_total,
+           f"주입한 장애 {injected}, 재시도 후에도 실패 {len(errors)}번 "
+           f"({', '.join(sorted({type(e).__name__ for e in errors})) or '없음'})")
+    report("httpx 타임아웃 기록", timeouts.timeouts == injected.get("timeout", 0),
+           f"타임아웃 {timeouts.timeouts}번 (주입 {injected.get('timeout', 0)}번), "
+           f"다음 타임아웃 {timeouts.timeout('/weather'):.2f}초")
+
+
+CHECKS: Dict[str, Callable[[Report], None]] = {
+    "singleflight": check_single_flight,
+    "quota": check_quota,
+    "breaker": check_breaker,
+    "timeouts": check_timeouts,
+    "metrics": check_metrics,
+    "resilience": check_resilience,
+}
+
+
+def run(names: List[str]) -> List[str]:
+    """점검 실행 - 실패한 점검 이름 목록 반환"""
+    failed = []
+    for name in names:
+        print(f"── {name}")
+        report = Report(name)
+        try:
+            CHECKS[name](report)
+            report.finish()
+        except AssertionError as e:
+            print(f"❌ {e}")
+            failed.append(name)
+        except Exception as e:
+            print(f"❌ {name}: 예외 {type(e).__name__}: {e}")
+            failed.append(name)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WeatherService 점검 (로컬 대역 서버)")
+    parser.add_argument("checks", nargs="*", metavar="점검",
+                        help=f"실행할 점검 (기본: 전부 - {', '.join(CHECKS)})")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"없는 점검: {', '.join(unknown)} (가능: {', '.join(CHECKS)})")
+
+    failed = run(args.checks or list(CHECKS))
+    if failed:
+        print(f"❌ {len(failed)}개 점검 실패: {', '.join(failed)}")
+        sys.exit(1)
+    print("✅ 모든 점검 통과")
+
+
+if __name__ == "__main__":
+    main()
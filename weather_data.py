@@ -0,0 +1,233 @@
+# weather_data.py - 관측값 표현 (불변 WeatherData + 배열 기반 WeatherBatch)
+#
+# WeatherData는 __slots__ + frozen 데이터클래스입니다. 시각은 정수 epoch 초로, 조건/설명/출처
+# 문자열은 sys.intern으로 보관하므로 캐시/이력에 많이 쌓여도 가볍고 세션 사이에 그대로
+# 공유할 수 있습니다. 많은 관측값은 WeatherBatch 하나의 연속 레코드 배열에 담고, 행은
+# 복사 없이 배열을 가리키는 WeatherRow로 읽습니다.
+# dataclass(slots=True)는 Python 3.10부터라 그 전 버전에서는 __slots__ 없이 만듭니다.
+
+import dataclasses
+import datetime
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from weather_forecast import condition_code
+
+DEMO_SOURCE = "데모 데이터"
+API_SOURCE = "OpenWeatherMap API"
+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+class _TimeFields:
+    """epoch 초 필드를 datetime으로 보여주는 공통 속성 (WeatherData / WeatherRow)"""
+    __slots__ = ()
+
+    @property
+    def local_tz(self) -> datetime.timezone:
+        return datetime.timezone(datetime.timedelta(seconds=self.timezone_offset))
+
+    @property
+    def sunrise(self) -> Optional[datetime.datetime]:
+        """일출 시각 (도시 현지 시간)"""
+        if not self.sunrise_at:
+            return None
+        return datetime.datetime.fromtimestamp(self.sunrise_at, tz=self.local_tz)
+
+    @property
+    def sunset(self) -> Optional[datetime.datetime]:
+        """일몰 시각 (도시 현지 시간)"""
+        if not self.sunset_at:
+            return None
+        return datetime.datetime.fromtimestamp(self.sunset_at, tz=self.local_tz)
+
+    @property
+    def timestamp(self) -> datetime.datetime:
+        """가져온 시각 (서버 현지 시간, naive)"""
+        return datetime.datetime.fromtimestamp(self.observed_at)
+
+
+@dataclass(frozen=True, **_SLOTS)
+class WeatherData(_TimeFields):
+    """날씨 데이터 클래스 (불변)"""
+    temperature: float
+    feels_like: float
+    humidity: int
+    pressure: float
+    weather_condition: str
+    weather_description: str
+    wind_speed: float
+    visibility: float
+    sunrise_at: Optional[int] = None  # UTC epoch 초
+    sunset_at: Optional[int] = None   # UTC epoch 초
+    timezone_offset: int = 0  # UTC 기준 오프셋 (초)
+    observed_at: int = 0      # 가져온 시각, UTC epoch 초
+    source: str = DEMO_SOURCE
+
+    def __post_init__(self):
+        # 같은 문자열은 모든 관측값이 한 객체를 공유
+        for name in ('weather_condition', 'weather_description', 'source'):
+            object.__setattr__(self, name, sys.intern(getattr(self, name)))
+
+
+def weather_to_dict(weather: WeatherData) -> dict:
+    """WeatherData → JSON 저장용 dict"""
+    return dataclasses.asdict(weather)
+
+
+def weather_from_dict(data: dict) -> WeatherData:
+    """weather_to_dict의 역변환 - 예전 형식(ISO 문자열 sunrise/sunset/timestamp)도 읽음"""
+    data = dict(data)
+    for old, new in (('sunrise', 'sunrise_at'), ('sunset', 'sunset_at'), ('timestamp', 'observed_at')):
+        if old in data:
+            value = data.pop(old)
+            data[new] = int(datetime.datetime.fromisoformat(value).timestamp()) if value else None
+    return WeatherData(**data)
+
+
+# ---- 배열 기반 관측값 묶음 ----
+
+# 한 관측값 = 레코드 하나 (문자열은 WeatherBatch.strings의 번호)
+WEATHER_DTYPE = np.dtype([
+    ('city', np.uint16),
+    ('temperature', np.float32),
+    ('feels_like', np.float32),
+    ('humidity', np.uint8),
+    ('pressure', np.float32),
+    ('condition', np.uint16),
+    ('description', np.uint16),
+    ('wind_speed', np.float32),
+    ('visibility', np.float32),
+    ('sunrise_at', np.int64),   # 0: 없음
+    ('sunset_at', np.int64),    # 0: 없음
+    ('timezone_offset', np.int32),
+    ('observed_at', np.int64),
+    ('source', np.uint16),
+])
+
+_NUMBER_FIELDS = ('temperature', 'feels_like', 'humidity', 'pressure', 'wind_speed', 'visibility',
+                  'timezone_offset', 'observed_at')
+_STRING_FIELDS = (('city', 'city'), ('condition', 'weather_condition'),
+                  ('description', 'weather_description'), ('source', 'source'))
+
+
+class WeatherRow(_TimeFields):
+    """WeatherBatch의 한 행 - 배열을 복사하지 않고 WeatherData와 같은 속성으로 읽음"""
+    __slots__ = ('_record', '_strings')
+
+    def __init__(self, record: np.void, strings: Sequence[str]):
+        self._record = record
+        self._strings = strings
+
+    def __getattr__(self, name: str):
+        if name in _NUMBER_FIELDS:
+            return self._record[name].item()
+        raise AttributeError(name)
+
+    @property
+    def city(self) -> str:
+        return self._strings[self._record['city']]
+
+    @property
+    def weather_condition(self) -> str:
+        return self._strings[self._record['condition']]
+
+    @property
+    def weather_description(self) -> str:
+        return self._strings[self._record['description']]
+
+    @property
+    def source(self) -> str:
+        return self._strings[self._record['source']]
+
+    @property
+    def sunrise_at(self) -> Optional[int]:
+        return int(self._record['sunrise_at']) or None
+
+    @property
+    def sunset_at(self) -> Optional[int]:
+        return int(self._record['sunset_at']) or None
+
+    def to_weather(self) -> WeatherData:
+        """독립된 WeatherData로 복사"""
+        return WeatherData(**{field.name: getattr(self, field.name) for field in dataclasses.fields(WeatherData)})
+
+    def __repr__(self) -> str:
+        return f"WeatherRow({self.city!r}, {self.temperature:.1f}°C, {self.weather_condition!r})"
+
+
+class WeatherBatch:
+    """여러 관측값을 연속된 레코드 배열(WEATHER_DTYPE) 하나에 보관
+
+    문자열(도시/조건/설명/출처)은 strings 표에 한 번만 저장하고 레코드에는 번호만 둡니다.
+    column()은 배열 뷰, batch[i]는 WeatherRow 뷰를 돌려주므로 읽을 때 복사가 없습니다.
+    측정값은 Forecast와 같이 float32로 보관합니다.
+    """
+
+    def __init__(self, records: np.ndarray, strings: Sequence[str]):
+        if records.dtype != WEATHER_DTYPE:
+            raise ValueError("WEATHER_DTYPE 레코드 배열이 아닙니다")
+        self.records = records
+        self.strings: Tuple[str, ...] = tuple(sys.intern(s) for s in strings)
+
+    @classmethod
+    def from_observations(cls, observations: Iterable[Tuple[str, WeatherData]]) -> "WeatherBatch":
+        """(도시, WeatherData) 목록으로 묶음 생성"""
+        observations = list(observations)
+        string_ids: Dict[str, int] = {}
+        records = np.zeros(len(observations), dtype=WEATHER_DTYPE)
+        for i, (city, weather) in enumerate(observations):
+            record = records[i]
+            for name in _NUMBER_FIELDS:
+                record[name] = getattr(weather, name)
+            record['sunrise_at'] = weather.sunrise_at or 0
+            record['sunset_at'] = weather.sunset_at or 0
+            values = {'city': city}
+            for column, attr in _STRING_FIELDS[1:]:
+                values[column] = getattr(weather, attr)
+            for column, value in values.items():
+                record[column] = string_ids.setdefault(value, len(string_ids))
+        if len(string_ids) > np.iinfo(np.uint16).max:
+            raise ValueError("문자열 종류가 너무 많습니다")
+        return cls(records, list(string_ids))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, i: int) -> WeatherRow:
+        return WeatherRow(self.records[i], self.strings)
+
+    def __iter__(self) -> Iterator[WeatherRow]:
+        for i in range(len(self.records)):
+            yield self[i]
+
+    def column(self, name: str) -> np.ndarray:
+        """측정값 열 (레코드 배열의 뷰, 복사 없음)"""
+        return self.records[name]
+
+    def cities(self) -> List[str]:
+        return [self.strings[i] for i in self.records['city']]
+
+    def index(self, city: str) -> int:
+        """도시의 첫 행 번호 - 없으면 KeyError"""
+        try:
+            city_id = self.strings.index(city)
+        except ValueError:
+            raise KeyError(city) from None
+        found = np.flatnonzero(self.records['city'] == city_id)
+        if len(found) == 0:
+            raise KeyError(city)
+        return int(found[0])
+
+    def condition_codes(self) -> np.ndarray:
+        """조건 코드 배열 (weather_batch 함수 입력용)"""
+        by_string = np.array([condition_code(s) for s in self.strings], dtype=np.int16)
+        return by_string[self.records['condition']]
+
+    @property
+    def nbytes(self) -> int:
+        """레코드 배열이 차지하는 메모리 (바이트)"""
+        return self.records.nbytes
@@ -0,0 +1,109 @@
+# weather_forecast.py - 5일/3시간 예보 (열 단위 NumPy 저장)
+
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+
+# OpenWeatherMap 조건 코드 → weather_condition(main) 문자열
+ATMOSPHERE_CONDITIONS = {
+    701: 'Mist', 711: 'Smoke', 721: 'Haze', 731: 'Dust', 741: 'Fog',
+    751: 'Sand', 761: 'Dust', 762: 'Ash', 771: 'Squall', 781: 'Tornado'
+}
+
+
+def condition_main(code: int) -> str:
+    """조건 코드(예: 501)를 현재 날씨 응답의 main 값(예: 'Rain')으로 변환"""
+    code = int(code)
+    if 200 <= code < 300:
+        return 'Thunderstorm'
+    if 300 <= code < 400:
+        return 'Drizzle'
+    if 500 <= code < 600:
+        return 'Rain'
+    if 600 <= code < 700:
+        return 'Snow'
+    if 700 <= code < 800:
+        return ATMOSPHERE_CONDITIONS.get(code, 'Mist')
+    if code == 800:
+        return 'Clear'
+    return 'Clouds'
+
+
+# weather_condition(main) 문자열 → 대표 조건 코드
+CONDITION_CODES = {
+    'Thunderstorm': 200, 'Drizzle': 300, 'Rain': 500, 'Snow': 600,
+    'Clear': 800, 'Clouds': 803
+}
+CONDITION_CODES.update({main: code for code, main in ATMOSPHERE_CONDITIONS.items()})
+CONDITION_CODES['Dust'] = 731
+UNKNOWN_CONDITION_CODE = 900  # 어떤 규칙에도 해당하지 않는 코드
+
+
+def condition_code(main: str) -> int:
+    """main 값(예: 'Rain')을 대표 조건 코드(예: 500)로 변환"""
+    return CONDITION_CODES.get(main, UNKNOWN_CONDITION_CODE)
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """도시별 예보 - 예보 시점마다 WeatherData를 만들지 않고 항목별 배열로 보관
+
+    모든 배열은 길이가 같고 i번째 원소가 i번째 예보 시점(3시간 간격)에 해당합니다.
+    """
+    city: str
+    timezone_offset: int     # UTC 기준 오프셋 (초)
+    timestamps: np.ndarray   # int64, UTC epoch 초
+    temperature: np.ndarray  # float32, °C
+    feels_like: np.ndarray   # float32, °C
+    humidity: np.ndarray     # uint8, %
+    pressure: np.ndarray     # float32, hPa
+    wind_speed: np.ndarray   # float32, m/s
+    visibility: np.ndarray   # float32, km
+    condition_code: np.ndarray  # int16, OpenWeatherMap 조건 코드
+
+    @classmethod
+    def from_payload(cls, city: str, data: dict) -> "Forecast":
+        """/forecast 응답을 열 단위 배열로 변환"""
+        steps = data['list']
+        return cls(
+            city=city,
+            timezone_offset=int(data.get('city', {}).get('timezone', 0)),
+            timestamps=np.fromiter((s['dt'] for s in steps), dtype=np.int64, count=len(steps)),
+            temperature=np.fromiter((s['main']['temp'] for s in steps), dtype=np.float32, count=len(steps)),
+            feels_like=np.fromiter((s['main']['feels_like'] for s in steps), dtype=np.float32, count=len(steps)),
+            humidity=np.fromiter((s['main']['humidity'] for s in steps), dtype=np.uint8, count=len(steps)),
+            pressure=np.fromiter((s['main']['pressure'] for s in steps), dtype=np.float32, count=len(steps)),
+            wind_speed=np.fromiter((s['wind']['speed'] for s in steps), dtype=np.float32, count=len(steps)),
+            visibility=np.fromiter((s.get('visibility', 10000) / 1000 for s in steps), dtype=np.float32, count=len(steps)),
+            condition_code=np.fromiter((s['weather'][0]['id'] for s in steps), dtype=np.int16, count=len(steps)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def local_hours(self) -> np.ndarray:
+        """예보 시점의 현지 시각(시)"""
+        return (self.timestamps + self.timezone_offset) // 3600 % 24
+
+    @property
+    def local_weekdays(self) -> np.ndarray:
+        """예보 시점의 현지 요일 (0=월요일, 1970-01-01은 목요일)"""
+        return ((self.timestamps + self.timezone_offset) // 86400 + 3) % 7
+
+    def local_time(self, i: int) -> datetime.datetime:
+        """i번째 예보 시점의 현지 시간"""
+        tz = datetime.timezone(datetime.timedelta(seconds=self.timezone_offset))
+        return datetime.datetime.fromtimestamp(int(self.timestamps[i]), tz=tz)
+
+    def upcoming(self, now: float, hours: float = 24) -> np.ndarray:
+        """now(epoch 초)부터 hours시간 안의 예보 시점 인덱스"""
+        return np.flatnonzero((self.timestamps >= now) & (self.timestamps < now + hours * 3600))
+
+    @property
+    def nbytes(self) -> int:
+        """배열이 차지하는 메모리 (바이트)"""
+        return sum(getattr(self, name).nbytes for name in (
+            'timestamps', 'temperature', 'feels_like', 'humidity', 'pressure',
+            'wind_speed', 'visibility', 'condition_code'))
@@ -0,0 +1,225 @@
+# weather_history.py - 도시별 관측 이력 링 버퍼 (메모리 맵 파일)
+#
+# 파일 구성 (모두 고정 크기):
+#   헤더 64바이트 | 도시 목록 max_cities × 64바이트 | 도시별 링 max_cities × (2 × capacity) 레코드
+#
+# 레코드는 링의 i번째 칸과 i + capacity번째 칸에 두 번 씁니다(거울 링). 그러면 최근 n개
+# (n <= capacity - 1)는 항상 한 덩어리로 이어져 있어 읽을 때 복사 없이 배열 뷰를 돌려줄 수
+# 있습니다. 쓰는 쪽은 레코드를 다 쓴 뒤에 도시별 개수(count)를 올리고, 읽는 쪽은 count만
+# 보고 창을 정하므로 잠금이 필요 없습니다. 다음에 덮어쓸 가장 오래된 칸은 읽기 창에서 뺍니다.
+# 링은 observed_at 순서를 유지합니다 (이미 있는 것보다 오래된 관측값은 추가하지 않음) - 그래서
+# recent(since=)는 이진 탐색으로 창을 자릅니다.
+
+import contextlib
+import os
+import sys
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from weather_forecast import condition_code
+
+try:
+    import fcntl  # 여러 프로세스가 같은 파일에 쓸 때 쓰기끼리만 잠금
+except ImportError:  # Windows
+    fcntl = None
+
+MAGIC = b"WXHIST01"
+
+HISTORY_DTYPE = np.dtype([
+    ('observed_at', np.int64),   # 가져온 시각, UTC epoch 초
+    ('temperature', np.float32),
+    ('feels_like', np.float32),
+    ('pressure', np.float32),
+    ('wind_speed', np.float32),
+    ('visibility', np.float32),
+    ('condition_code', np.int16),
+    ('humidity', np.uint8),
+    ('_pad', np.uint8),
+])
+
+_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'), ('capacity', np.uint32), ('max_cities', np.uint32),
+    ('record_size', np.uint32), ('_pad', 'V44'),
+])
+_CITY_DTYPE = np.dtype([('name', 'S48'), ('count', np.uint64), ('_pad', 'V8')])
+
+
+class ObservationHistory:
+    """도시별 최근 관측값 capacity개를 보관하는 메모리 맵 링 버퍼
+
+    같은 파일을 여러 세션/프로세스가 열 수 있습니다. readonly=True로 열면 쓰기 없이
+    recent()만 사용합니다.
+    """
+
+    def __init__(self, path: str, capacity: int = 288, max_cities: int = 64, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if not readonly:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._lock_file = open(path + ".lock", "a")
+            with self._write_lock():
+                self._map = self._open(capacity, max_cities)
+        else:
+            self._lock_file = None
+            self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        self._bind()
+
+    def _open(self, capacity: int, max_cities: int) -> np.memmap:
+        """파일이 같은 구성이면 그대로 열고, 없거나 구성이 다르면 새로 만듦"""
+        size = self._file_size(capacity, max_cities)
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= _HEADER_DTYPE.itemsize:
+            header = np.fromfile(self.path, dtype=_HEADER_DTYPE, count=1)[0]
+            if (header['magic'] == MAGIC and header['capacity'] == capacity
+                    and header['max_cities'] == max_cities and header['record_size'] == HISTORY_DTYPE.itemsize
+                    and os.path.getsize(self.path) == size):
+                return np.memmap(self.path, dtype=np.uint8, mode='r+')
+
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        mapped = np.memmap(self.path, dtype=np.uint8, mode='r+')
+        header = mapped[:_HEADER_DTYPE.itemsize].view(_HEADER_DTYPE)
+        header['capacity'], header['max_cities'] = capacity, max_cities
+        header['record_size'] = HISTORY_DTYPE.itemsize
+        header['magic'] = MAGIC  # 마지막에 써서 반쯤 만든 파일을 읽지 않게 함
+        mapped.flush()
+        return mapped
+
+    @staticmethod
+    def _file_size(capacity: int, max_cities: int) -> int:
+        return (_HEADER_DTYPE.itemsize + max_cities * _CITY_DTYPE.itemsize
+                + max_cities * 2 * capacity * HISTORY_DTYPE.itemsize)
+
+    def _bind(self):
+        """헤더를 읽고 도시 목록/레코드 영역 뷰 준비"""
+        header = self._map[:_HEADER_DTYPE.itemsize].view(_HEADER_DTYPE)[0]
+        if header['magic'] != MAGIC or header['record_size'] != HISTORY_DTYPE.itemsize:
+            raise ValueError(f"관측 이력 파일 형식이 아닙니다: {self.path}")
+        self.capacity = int(header['capacity'])
+        self.max_cities = int(header['max_cities'])
+        start = _HEADER_DTYPE.itemsize
+        end = start + self.max_cities * _CITY_DTYPE.itemsize
+        self._cities = self._map[start:end].view(_CITY_DTYPE)
+        self._records = self._map[end:].view(HISTORY_DTYPE).reshape(self.max_cities, 2 * self.capacity)
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        """다른 프로세스의 쓰기와 겹치지 않게 잠금 (읽기는 잠그지 않음)"""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _slot(self, city: str, create: bool = False) -> Optional[int]:
+        name = city.encode("utf-8")[:_CITY_DTYPE['name'].itemsize]
+        found = np.flatnonzero(self._cities['name'] == name)
+        if len(found):
+            return int(found[0])
+        if not create:
+            return None
+        empty = np.flatnonzero(self._cities['name'] == b"")
+        if len(empty) == 0:
+            return None
+        slot = int(empty[0])
+        self._cities['count'][slot] = 0
+        self._cities['name'][slot] = name
+        return slot
+
+    def append(self, city: str, weather) -> bool:
+        """관측값 한 건 추가 - 도시 칸이 모두 찼거나 마지막 관측값보다 오래된 관측값이면 False
+
+        새로고침과 묶음 조회가 동시에 저장하면 늦게 가져온 쪽이 먼저 도착할 수 있으므로,
+        순서가 뒤바뀐 관측값은 버려 링을 시각 순서로 유지합니다.
+        """
+        if self.readonly:
+            raise PermissionError("읽기 전용 관측 이력입니다")
+        with self._lock, self._write_lock():
+            slot = self._slot(city, create=True)
+            if slot is None:
+                return False
+            count = int(self._cities['count'][slot])
+            ring = self._records[slot]
+            if count and weather.observed_at < ring[(count - 1) % self.capacity]['observed_at']:
+                return False
+            record = np.zeros(1, dtype=HISTORY_DTYPE)[0]
+            record['observed_at'] = weather.observed_at
+            record['temperature'] = weather.temperature
+            record['feels_like'] = weather.feels_like
+            record['pressure'] = weather.pressure
+            record['wind_speed'] = weather.wind_speed
+            record['visibility'] = weather.visibility
+            record['condition_code'] = condition_code(weather.weather_condition)
+            record['humidity'] = weather.humidity
+            i = count % self.capacity
+            ring[i] = record
+            ring[i + self.capacity] = record
+            # 레코드를 다 쓴 뒤 개수 공개
+            self._cities['count'][slot] = count + 1
+        return True
+
+    def recent(self, city: str, n: Optional[int] = None, since: Optional[float] = None) -> np.ndarray:
+        """최근 관측값 최대 n개 (오래된 순) - 파일을 가리키는 뷰이므로 오래 보관하려면 copy()
+
+        since를 주면 그 시각(epoch 초) 이후 관측값만 반환합니다 (링이 시각 순서라 이진 탐색).
+        """
+        slot = self._slot(city)
+        if slot is None:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+        count = int(self._cities['count'][slot])
+        # 가장 오래된 칸은 다음 쓰기가 덮어쓸 수 있으므로 창에서 제외
+        available = min(count, self.capacity - 1)
+        n = available if n is None else min(n, available)
+        end = count % self.capacity + self.capacity
+        window = self._records[slot][end - n:end]
+        if since is not None:
+            window = window[np.searchsorted(window['observed_at'], since, side='left'):]
+        return window
+
+    def count(self, city: str) -> int:
+        """지금까지 추가된 관측값 수 (링에서 밀려난 것 포함)"""
+        slot = self._slot(city)
+        return 0 if slot is None else int(self._cities['count'][slot])
+
+    def cities(self) -> List[str]:
+        names = self._cities['name']
+        return [name.decode("utf-8") for name in names[names != b""]]
+
+    def flush(self):
+        if not self.readonly:
+            self._map.flush()
+
+    def close(self):
+        self.flush()
+        if self._lock_file is not None:
+            self._lock_file.close()
+        self._map._mmap.close()
+
+    @property
+    def nbytes(self) -> int:
+        """파일 크기 (바이트)"""
+        return self._map.nbytes
+
+
+def main():
+    """저장된 이력 요약 출력: python weather_history.py [파일]"""
+    path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get(
+        "WEATHER_HISTORY_FILE", ".cache/weather_history.bin")
+    history = ObservationHistory(path, readonly=True)
+    print(f"📈 {path}: 도시 {len(history.cities())}개, 도시당 {history.capacity}건, {history.nbytes:,}바이트")
+    for city in history.cities():
+        window = history.recent(city)
+        if len(window):
+            print(f"   {city}: {history.count(city)}건, 최근 기온 "
+                  f"{window['temperature'].min():.1f}~{window['temperature'].max():.1f}°C")
+
+
+if __name__ == "__main__":
+    main()
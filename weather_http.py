@@ -0,0 +1,75 @@
+# weather_http.py - OpenWeatherMap 호출용 공유 HTTP 클라이언트
+
+import os
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+Timeout = Union[float, Tuple[float, float]]
+
+# 기본 업스트림 주소 - 로컬 대역 서버(stub_server.py) 사용 시 OPENWEATHER_BASE_URL로 변경
+DEFAULT_BASE_URL = "https://api.openweathermap.org/data/2.5"
+
+
+class UpstreamClient:
+    """연결 풀 + keep-alive HTTP 클라이언트
+
+    프로세스 전체(모든 Streamlit 세션)가 하나의 세션을 공유해 DNS/TCP/TLS 연결 비용을
+    매 요청마다 다시 치르지 않도록 합니다. pool_size를 넘는 동시 요청은 연결이 반납될
+    때까지 대기합니다.
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 base_url: str = DEFAULT_BASE_URL):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(연결, 읽기) 타임아웃"""
+        return self.connect_timeout, self.read_timeout
+
+    def url(self, path: str) -> str:
+        """'/weather' 같은 경로를 전체 URL로 변환 (전체 URL은 그대로)"""
+        if path.startswith(("http://", "https://")):
+            return path
+        return self.base_url + path
+
+    def get(self, path: str, params: dict = None, timeout: Optional[Timeout] = None) -> requests.Response:
+        """GET 요청 - 풀에 남아 있는 연결 재사용"""
+        return self.session.get(self.url(path), params=params, timeout=timeout or self.timeout)
+
+    def close(self):
+        """풀의 모든 연결 닫기"""
+        self.session.close()
+
+
+_client: Optional[UpstreamClient] = None
+_client_lock = threading.Lock()
+
+
+def get_upstream_client() -> UpstreamClient:
+    """프로세스 공유 클라이언트 반환 - 환경변수로 주소/풀 크기/타임아웃 설정
+
+    OPENWEATHER_BASE_URL, OPENWEATHER_POOL_SIZE, OPENWEATHER_CONNECT_TIMEOUT, OPENWEATHER_READ_TIMEOUT
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpstreamClient(
+                    pool_size=int(os.environ.get("OPENWEATHER_POOL_SIZE", 10)),
+                    connect_timeout=float(os.environ.get("OPENWEATHER_CONNECT_TIMEOUT", 3.05)),
+                    read_timeout=float(os.environ.get("OPENWEATHER_READ_TIMEOUT", 10)),
+                    base_url=os.environ.get("OPENWEATHER_BASE_URL", DEFAULT_BASE_URL),
+                )
+    return _client
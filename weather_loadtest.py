@@ -0,0 +1,421 @@
+# weather_loadtest.py - 동시 세션 부하 시험 (세션 수별 재실행 지연, 업스트림 호출 수, CPU, RSS)
+#
+# 실행: python weather_loadtest.py --sessions 1,5,10,25,50 --duration 30
+#       python weather_loadtest.py --sessions 20 --think 0.5 --latency 0.2 --distribution lognormal --spread 0.5
+#       python weather_loadtest.py --sessions 20 --error-rate 0.05 --timeout-rate 0.01 --hang 15
+#
+# 세션 수마다 streamlit run으로 streamlit_app.py 서버를 새로 띄우고 (업스트림은 stub_server.py
+# 대역 서버, API 키는 임시 폴더의 .streamlit/secrets.toml), 세션 N개가 브라우저 대신
+# 웹소켓(/_stcore/stream)으로 접속해 생각 시간을 두고 도시 바꾸기 / 새로고침 / 탭 보기를
+# 합니다. 탭 전환은 보통 브라우저 안에서만 일어나 생각 시간으로만 세고, 상태를 가진 탭
+# (st.tabs on_change - 사용 기록 중일 때)이면 탭 전환 재실행도 보냅니다.
+# 재실행 지연은 요청(BackMsg)을 보낸 뒤 script_finished를 받을 때까지입니다.
+#
+# 네트워크 없이 한 대에서 돌아가며, CPU/RSS는 서버 프로세스의 /proc 값이라 Linux 전용입니다.
+# 부하 생성기도 같은 기계의 CPU를 쓰므로 결과 표에 함께 적습니다.
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from typing import Dict, List, Optional
+
+from stub_server import add_fault_arguments, faults_from_args, start_stub_server
+from weather_service import CITIES
+
+API_KEY = "loadtest"
+RERUN_TIMEOUT = 60  # 초 - 이보다 오래 끝나지 않는 재실행은 오류로 세고 세션 종료
+DEFAULT_OUTPUT = ".cache/loadtest_results.json"
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+# 사용자 동작 비율 - 탭 보기는 상태를 가진 탭일 때만 서버 재실행
+ACTIONS = (("switch_city", 0.5), ("refresh", 0.15), ("view_tab", 0.35))
+
+
+class WebSocket:
+    """RFC 6455 최소 클라이언트 - 바이너리 프레임 송수신만 (외부 패키지 없이)"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int, path: str, subprotocol: str = "streamlit") -> "WebSocket":
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n"
+                      f"Sec-WebSocket-Protocol: {subprotocol}\r\n\r\n").encode())
+        status = await reader.readline()
+        if b" 101 " not in status:
+            writer.close()
+            raise ConnectionError(f"웹소켓 연결 실패: {status.decode(errors='replace').strip()}")
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        return cls(reader, writer)
+
+    async def send(self, payload: bytes, opcode: int = 0x2):
+        # 클라이언트 → 서버 프레임은 반드시 마스킹
+        mask = os.urandom(4)
+        size = len(payload)
+        if size < 126:
+            header = bytes([0x80 | opcode, 0x80 | size])
+        elif size < 65536:
+            header = bytes([0x80 | opcode, 0x80 | 126]) + size.to_bytes(2, 'big')
+        else:
+            header = bytes([0x80 | opcode, 0x80 | 127]) + size.to_bytes(8, 'big')
+        masked = (int.from_bytes(payload, 'big') ^ int.from_bytes((mask * (size // 4 + 1))[:size], 'big')
+                  ).to_bytes(size, 'big')
+        self.writer.write(header + mask + masked)
+        await self.writer.drain()
+
+    async def recv(self) -> bytes:
+        """메시지 하나 (조각난 프레임은 이어 붙임, ping에는 pong)"""
+        message = b""
+        while True:
+            first, second = await self.reader.readexactly(2)
+            opcode, size = first & 0x0F, second & 0x7F
+            if size == 126:
+                size = int.from_bytes(await self.reader.readexactly(2), 'big')
+            elif size == 127:
+                size = int.from_bytes(await self.reader.readexactly(8), 'big')
+            if second & 0x80:
+                await self.reader.readexactly(4)  # 서버 프레임은 마스킹하지 않음
+            data = await self.reader.readexactly(size)
+            if opcode == 0x8:
+                raise ConnectionError("서버가 웹소켓을 닫음")
+            if opcode == 0x9:
+                await self.send(data, opcode=0xA)
+                continue
+            if opcode == 0xA:
+                continue
+            message += data
+            if first & 0x80:
+                return message
+
+    async def close(self):
+        try:
+            await self.send(b"", opcode=0x8)
+        except (ConnectionError, OSError):
+            pass
+        self.writer.close()
+
+
+class Session:
+    """브라우저 탭 하나 - 위젯 상태를 들고 재실행을 요청하고 끝날 때까지 기다림"""
+
+    def __init__(self, ws: WebSocket):
+        from streamlit.proto.Selectbox_pb2 import Selectbox
+        self.ws = ws
+        self.city = CITIES[0]
+        self.selectbox_id: Optional[str] = None
+        self.refresh_id: Optional[str] = None
+        # 상태를 가진 탭(st.tabs on_change)일 때만 - 탭 전환도 재실행
+        self.tabs_id: Optional[str] = None
+        self.tab_labels: List[str] = []
+        self.tab: Optional[str] = None
+        # streamlit 1.45부터 selectbox 값은 옵션 문자열 (그 전에는 옵션 번호)
+        self.selectbox_string = 'accept_new_options' in Selectbox.DESCRIPTOR.fields_by_name
+        # 위젯 id → 그 위젯을 그린 fragment id (브라우저처럼 그 fragment만 재실행 요청)
+        self.fragments: Dict[str, str] = {}
+
+    async def rerun(self, trigger: str = None, changed: str = None) -> float:
+        """재실행 요청 후 끝날 때까지 걸린 시간 (초) - st.rerun()으로 이어진 재실행까지 포함
+
+        changed(값을 바꾼 위젯, 없으면 trigger)가 fragment 안에 있으면 그 fragment만 재실행.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.SetInParent()  # 위젯 상태가 없는 첫 실행도 rerun_script로 보내도록
+        if self.selectbox_id:
+            widget = state.widget_states.widgets.add()
+            widget.id = self.selectbox_id
+            if self.selectbox_string:
+                widget.string_value = self.city
+            else:
+                widget.int_value = CITIES.index(self.city)
+        if self.tabs_id and self.tab:
+            widget = state.widget_states.widgets.add()
+            widget.id = self.tabs_id
+            widget.string_value = self.tab
+        if trigger:
+            widget = state.widget_states.widgets.add()
+            widget.id = trigger
+            widget.trigger_value = True
+        fragment_id = self.fragments.get(changed or trigger)
+        if fragment_id:
+            state.fragment_id = fragment_id
+
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._until_finished(), RERUN_TIMEOUT)
+        return time.perf_counter() - started
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._remember_widget(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "add_block":
+                self._remember_block(msg.delta.add_block, msg.delta.fragment_id)
+            elif kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("앱 스크립트 컴파일 오류")
+                if msg.script_finished in (ForwardMsg.FINISHED_SUCCESSFULLY,
+                                           ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                    return
+
+    def _remember_widget(self, element, fragment_id: str):
+        kind = element.WhichOneof("type")
+        if kind == "selectbox":
+            self.selectbox_id = element.selectbox.id
+            self.fragments[self.selectbox_id] = fragment_id
+        elif kind == "button" and "새로고침" in element.button.label:
+            self.refresh_id = element.button.id
+            self.fragments[self.refresh_id] = fragment_id
+
+    def _remember_block(self, block, fragment_id: str):
+        kind = block.WhichOneof("type")
+        if kind == "tab_container" and block.tab_container.id:
+            self.tabs_id = block.tab_container.id
+            self.fragments[self.tabs_id] = fragment_id
+            self.tab_labels = []
+        elif kind == "tab" and self.tabs_id and block.tab.label not in self.tab_labels:
+            self.tab_labels.append(block.tab.label)
+
+
+async def run_session(host: str, port: int, rng: random.Random, deadline_start: float, deadline_end: float,
+                      think: float, samples: Dict[str, List[float]], errors: Counter):
+    """세션 하나: 접속 + 첫 실행(측정 제외) 후 deadline_end까지 동작 반복"""
+    try:
+        ws = await WebSocket.connect(host, port, "/_stcore/stream")
+    except (ConnectionError, OSError) as e:
+        errors[type(e).__name__] += 1
+        return
+    session = Session(ws)
+    try:
+        await session.rerun()
+        # 모든 세션이 접속한 뒤부터 측정 (생각 시간만큼 흩어서 시작)
+        await asyncio.sleep(max(0.0, deadline_start - time.monotonic()) + rng.uniform(0, think))
+        names, weights = zip(*ACTIONS)
+        while time.monotonic() < deadline_end:
+            action = rng.choices(names, weights)[0]
+            if action == "switch_city":
+                session.city = rng.choice([city for city in CITIES if city != session.city])
+                samples[action].append(await session.rerun(changed=session.selectbox_id))
+            elif action == "refresh" and session.refresh_id:
+                samples[action].append(await session.rerun(trigger=session.refresh_id))
+            elif action == "view_tab" and session.tabs_id and session.tab_labels:
+                current = session.tab or session.tab_labels[0]
+                session.tab = rng.choice([label for label in session.tab_labels if label != current])
+                samples[action].append(await session.rerun(changed=session.tabs_id))
+            await asyncio.sleep(rng.expovariate(1 / think) if think > 0 else 0)
+    except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, RuntimeError) as e:
+        errors[type(e).__name__] += 1
+    finally:
+        await ws.close()
+
+
+class ServerProcess:
+    """임시 폴더에서 streamlit run으로 띄운 앱 서버 (secrets.toml에 시험용 API 키)"""
+
+    def __init__(self, base_url: str, env: Dict[str, str] = None):
+        self.workdir = tempfile.mkdtemp(prefix="weather-loadtest-")
+        os.makedirs(os.path.join(self.workdir, ".streamlit"))
+        with open(os.path.join(self.workdir, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+            f.write(f'OPENWEATHER_API_KEY = "{API_KEY}"\n')
+        self.port = free_port()
+        self.log = open(os.path.join(self.workdir, "streamlit.log"), "wb")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless=true",
+             f"--server.port={self.port}", "--server.address=127.0.0.1", "--server.fileWatcherType=none",
+             "--browser.gatherUsageStats=false"],
+            cwd=self.workdir, stdout=self.log, stderr=subprocess.STDOUT,
+            env={**os.environ, "OPENWEATHER_BASE_URL": base_url, **(env or {})})
+
+    def wait_ready(self, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"streamlit 서버가 뜨지 않았습니다:\n{self.log_tail()}")
+
+    def cpu_seconds(self) -> float:
+        """서버 프로세스가 쓴 CPU 시간 (user + system, 초)"""
+        with open(f"/proc/{self.process.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def memory(self) -> Dict[str, float]:
+        """{'rss': 현재 RSS, 'peak': 최대 RSS} (MB)"""
+        values = {}
+        with open(f"/proc/{self.process.pid}/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    values[line[:5]] = int(line.split()[1]) / 1024
+        return {'rss': values.get("VmRSS", 0.0), 'peak': values.get("VmHWM", 0.0)}
+
+    def log_tail(self, lines: int = 20) -> str:
+        self.log.flush()
+        with open(self.log.name, encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 1)
+
+
+def run_level(stub, sessions: int, duration: float, think: float, seed: int, env: Dict[str, str] = None) -> dict:
+    """세션 sessions개로 duration초 동안 부하 - 서버는 단계마다 새로 띄움"""
+    server = ServerProcess(stub.base_url, env)
+    try:
+        server.wait_ready()
+        samples: Dict[str, List[float]] = {name: [] for name, _ in ACTIONS}
+        errors: Counter = Counter()
+        window = {}
+
+        def snapshot() -> dict:
+            return {'wall': time.monotonic(), 'cpu': server.cpu_seconds(), 'loadgen': sum(os.times()[:2]),
+                    'hits': Counter(stub.hits), 'faults': Counter(stub.faults_injected)}
+
+        async def measure(start: float, end: float):
+            # 접속/첫 실행(빈 캐시)은 빼고 측정 구간의 CPU/업스트림 호출만 셈
+            await asyncio.sleep(max(0.0, start - time.monotonic()))
+            window['before'] = snapshot()
+            await asyncio.sleep(max(0.0, end - time.monotonic()))
+            window['after'] = snapshot()
+
+        async def drive():
+            # 접속과 첫 실행은 세션 수에 비례하므로 넉넉히 기다림
+            start = time.monotonic() + 2 + sessions * 0.05
+            end = start + duration
+            await asyncio.gather(measure(start, end), *(
+                run_session("127.0.0.1", server.port, random.Random(seed * 1000 + i), start, end, think,
+                            samples, errors)
+                for i in range(sessions)))
+
+        asyncio.run(drive())
+        before, after = window['before'], window['after']
+        wall = after['wall'] - before['wall']
+        cpu = after['cpu'] - before['cpu']
+        loadgen = after['loadgen'] - before['loadgen']
+        upstream = after['hits']
+        upstream.subtract(before['hits'])
+        injected = after['faults']
+        injected.subtract(before['faults'])
+
+        reruns = [sample for values in samples.values() for sample in values]
+        return {
+            'sessions': sessions,
+            'reruns': len(reruns),
+            'reruns_per_second': round(len(reruns) / duration, 2),
+            'latency_ms': {f"p{int(q * 100)}": _percentile(reruns, q) for q in (0.5, 0.95, 0.99)},
+            'latency_ms_by_action': {name: {f"p{int(q * 100)}": _percentile(values, q) for q in (0.5, 0.95)}
+                                     for name, values in samples.items() if values},
+            'upstream_calls': {endpoint: count for endpoint, count in sorted(upstream.items()) if count},
+            'upstream_faults': {fault: count for fault, count in sorted(injected.items()) if count},
+            'server_cpu': round(cpu / wall, 3),  # 코어 수 단위 (1.0 = 한 코어를 다 씀)
+            'server_cpu_per_rerun_ms': round(cpu / len(reruns) * 1000, 2) if reruns else None,
+            'loadgen_cpu': round(loadgen / wall, 3),
+            'server_rss_mb': {key: round(value, 1) for key, value in server.memory().items()},
+            'errors': dict(errors),
+        }
+    finally:
+        server.stop()
+
+
+def print_report(levels: List[dict]):
+    print(f"{'세션':>6}{'재실행':>8}{'회/초':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'업스트림':>10}"
+          f"{'서버CPU':>9}{'CPU/회':>9}{'RSS':>9}{'최대RSS':>9}{'생성기CPU':>10}")
+    for level in levels:
+        latency = level['latency_ms']
+        cells = [f"{latency[q]:>9.1f}" if latency[q] is not None else f"{'-':>9}" for q in ("p50", "p95", "p99")]
+        per_rerun = level['server_cpu_per_rerun_ms']
+        print(f"{level['sessions']:>6}{level['reruns']:>8}{level['reruns_per_second']:>8.1f}{''.join(cells)}"
+              f"{sum(level['upstream_calls'].values()):>10}{level['server_cpu']:>9.0%}"
+              f"{per_rerun if per_rerun is not None else '-':>9}"
+              f"{level['server_rss_mb']['rss']:>9.0f}{level['server_rss_mb']['peak']:>9.0f}"
+              f"{level['loadgen_cpu']:>10.0%}")
+        if level['upstream_faults']:
+            print(f"       💥 주입한 업스트림 장애: {level['upstream_faults']}")
+        if level['errors']:
+            print(f"       ⚠️ 오류: {level['errors']}")
+    print("(지연: ms, 서버CPU: 한 코어 대비, CPU/회: 재실행당 서버 CPU ms, RSS: MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 앱 동시 세션 부하 시험")
+    parser.add_argument("--sessions", default="1,5,10,25", help="동시 세션 수 목록 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=30, help="단계별 측정 시간 (초)")
+    parser.add_argument("--think", type=float, default=2.0, help="동작 사이 평균 생각 시간 (초, 지수 분포)")
+    parser.add_argument("--seed", type=int, default=1, help="세션 동작 난수 시드")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 경로")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        parser.error("서버 CPU/RSS를 /proc에서 읽으므로 Linux에서만 실행할 수 있습니다")
+
+    stub = start_stub_server(faults=faults_from_args(args))
+    # 앱 서버는 실제 배포처럼 캐시/이력 파일을 임시 폴더에 씀 - 호출 한도만 시험 규모에 맞게 넉넉히
+    env = {"OPENWEATHER_CALLS_PER_MINUTE": os.environ.get("OPENWEATHER_CALLS_PER_MINUTE", "100000")}
+    levels = []
+    try:
+        for sessions in (int(n) for n in args.sessions.split(",") if n.strip()):
+            print(f"🚦 세션 {sessions}개, {args.duration:.0f}초 ...", flush=True)
+            levels.append(run_level(stub, sessions, args.duration, args.think, args.seed, env))
+    finally:
+        stub.shutdown()
+
+    print_report(levels)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({'config': vars(args), 'levels': levels}, f, ensure_ascii=False, indent=2)
+    print(f"📄 결과: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
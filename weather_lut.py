@@ -0,0 +1,268 @@
+# weather_lut.py - 구간화한 입력 조합별 추천 결과를 미리 계산한 조회 표
+#
+# 복장/교통/건강 추천은 몇 개 입력 구간(기온대, 조건 계열, 습도대, 풍속대, 가시거리대,
+# 기압대)의 조합에만 의존합니다. 모든 조합의 결과를 시작 시 한 번 계산해 두면
+# 추천은 구간 번호 계산 + 표 읽기 한 번으로 끝납니다.
+#
+#   python weather_lut.py --build lut.json   # 미리 만든 표 파일 저장 (WEATHER_LUT_FILE로 사용)
+#   python weather_lut.py --verify           # 전체 입력 공간에서 weather_rules 함수와 비교
+
+import argparse
+import bisect
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import weather_rules
+from weather_forecast import CONDITION_CODES, condition_main
+from weather_rules import RULES
+
+
+class ThresholdAxis:
+    """여러 임계값 규칙의 경계값을 합친 입력 축 - 같은 구간의 값은 모든 규칙 결과가 같음"""
+
+    def __init__(self, *rule_names: str):
+        self.breakpoints = sorted({k for name in rule_names for k in RULES[name].breakpoints.tolist()})
+        first = math.nextafter(self.breakpoints[0], -math.inf)
+        self.representatives = [first] + self.breakpoints
+
+    def __len__(self) -> int:
+        return len(self.representatives)
+
+    def bucket(self, value: float) -> int:
+        return bisect.bisect_right(self.breakpoints, value)
+
+    def samples(self) -> List[float]:
+        """검증용 값 - 각 경계의 바로 아래/위와 구간 중간값, 양 끝 바깥값"""
+        values = {self.breakpoints[0] - 100, self.breakpoints[-1] + 100}
+        for k in self.breakpoints:
+            values.update((math.nextafter(k, -math.inf), k, math.nextafter(k, math.inf)))
+        for low, high in zip(self.breakpoints, self.breakpoints[1:]):
+            values.add((low + high) / 2)
+        return sorted(values)
+
+
+class ConditionAxis:
+    """여러 조건 규칙의 키워드를 합친 입력 축 - 키워드 포함 여부 조합을 결과가 같은 계열로 묶음"""
+
+    def __init__(self, *rule_names: str):
+        self.keywords = sorted({k for name in rule_names for keywords, _ in RULES[name].chain for k in keywords})
+        families: Dict[Tuple[int, ...], int] = {}
+        self._family_by_mask = []
+        self.representatives = []
+        for mask in range(1 << len(self.keywords)):
+            text = " ".join(k for i, k in enumerate(self.keywords) if mask >> i & 1)
+            outputs = tuple(RULES[name](text) for name in rule_names)
+            if outputs not in families:
+                families[outputs] = len(families)
+                self.representatives.append(text)
+            self._family_by_mask.append(families[outputs])
+        self._memo: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.representatives)
+
+    def bucket(self, condition: str) -> int:
+        family = self._memo.get(condition)
+        if family is None:
+            lowered = condition.lower()
+            mask = sum(1 << i for i, k in enumerate(self.keywords) if k in lowered)
+            family = self._family_by_mask[mask]
+            self._memo[condition] = family
+        return family
+
+    def samples(self) -> List[str]:
+        """검증용 조건 - 실제 조건 코드의 main 값 전체 + 키워드 조합 + 규칙 밖 문자열"""
+        values = {condition_main(code) for code in range(200, 1000)} | set(CONDITION_CODES)
+        for r in range(len(self.keywords) + 1):
+            for combo in itertools.combinations(self.keywords, r):
+                values.add(" ".join(combo).title())
+        values.update(("Unknown", "", "Light Rain", "Heavy SNOW"))
+        return sorted(values)
+
+
+class LookupTable:
+    """축 구간 번호 조합(혼합 진법 인덱스) → 추천 문구 튜플"""
+
+    def __init__(self, axes: Sequence, entries: List[Tuple[str, ...]]):
+        self.axes = list(axes)
+        self.entries = entries
+        self._strides = []
+        stride = 1
+        for axis in reversed(self.axes):
+            self._strides.insert(0, stride)
+            stride *= len(axis)
+        assert len(entries) == stride, "표 크기가 축 구성과 맞지 않습니다"
+
+    @classmethod
+    def build(cls, axes: Sequence, fn: Callable) -> "LookupTable":
+        """모든 구간 조합의 대표값으로 fn을 평가해 표 생성"""
+        entries = [tuple(fn(*values)) for values in itertools.product(*(a.representatives for a in axes))]
+        return cls(axes, entries)
+
+    def __call__(self, *values) -> Tuple[str, ...]:
+        index = 0
+        for axis, stride, value in zip(self.axes, self._strides, values):
+            index += axis.bucket(value) * stride
+        return self.entries[index]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _outfit_axes():
+    return (ThresholdAxis('outfit_temp'), ConditionAxis('outfit_condition'),
+            ThresholdAxis('outfit_humidity'), ThresholdAxis('outfit_wind'))
+
+
+def _transport_axes():
+    return (ThresholdAxis('transport_temp_risk', 'transport_icy'), ThresholdAxis('transport_humid'),
+            ThresholdAxis('transport_wind_risk', 'transport_gust'),
+            ThresholdAxis('transport_visibility_risk', 'transport_low_visibility'),
+            ConditionAxis('transport_condition_risk', 'transport_rain'))
+
+
+def _health_axes():
+    return (ThresholdAxis('health_temp'), ThresholdAxis('health_humidity'), ThresholdAxis('health_pressure'),
+            ThresholdAxis('health_wind'), ConditionAxis('health_wet', 'health_snow'))
+
+
+class RecommendationTables:
+    """복장/교통/건강 추천 조회 표 묶음"""
+
+    def __init__(self, outfit: LookupTable, transport: LookupTable, health: LookupTable):
+        self.outfit_table = outfit
+        self.transport_table = transport
+        self.health_table = health
+
+    @classmethod
+    def build(cls) -> "RecommendationTables":
+        """weather_rules 함수로 모든 구간 조합 계산 (체감온도는 기온과 같게 두고 조회 시 반영)"""
+        return cls(
+            LookupTable.build(_outfit_axes(), lambda temp, condition, humidity, wind:
+                              weather_rules.outfit_recommendation(temp, temp, humidity, wind, condition)),
+            LookupTable.build(_transport_axes(), weather_rules.transport_recommendation),
+            LookupTable.build(_health_axes(), lambda temp, humidity, pressure, wind, condition:
+                              weather_rules.health_advice(temp, temp, humidity, pressure, wind, condition)),
+        )
+
+    # ---- 조회 (weather_rules 함수와 같은 인자/결과) ----
+
+    def outfit(self, temperature: float, feels_like: float, humidity: float,
+               wind_speed: float, condition: str) -> List[str]:
+        effective_temp = feels_like if RULES['outfit_feels_gap'](abs(feels_like - temperature)) else temperature
+        return list(self.outfit_table(effective_temp, condition, humidity, wind_speed))
+
+    def transport(self, temperature: float, humidity: float, wind_speed: float,
+                  visibility: float, condition: str) -> List[str]:
+        return list(self.transport_table(temperature, humidity, wind_speed, visibility, condition))
+
+    def health(self, temperature: float, feels_like: float, humidity: float, pressure: float,
+               wind_speed: float, condition: str) -> List[str]:
+        advice = list(self.health_table(temperature, humidity, pressure, wind_speed, condition))
+        # 체감온도 문구는 값이 들어가므로 표 대신 조회 시 추가
+        if RULES['health_feels_gap'](abs(feels_like - temperature)):
+            advice.append(weather_rules.HEALTH_FEELS_GAP_TEXT.format(feels_like=feels_like))
+        return advice
+
+    # ---- 파일 저장/불러오기 ----
+
+    def save(self, path: str):
+        """문구를 번호로 바꿔 JSON 저장 - 규칙 지문이 다르면 load에서 무시"""
+        pool: Dict[str, int] = {}
+        tables = {}
+        for name in ('outfit', 'transport', 'health'):
+            table = getattr(self, f'{name}_table')
+            tables[name] = [[pool.setdefault(text, len(pool)) for text in entry] for entry in table.entries]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': weather_rules.rules_fingerprint(), 'texts': list(pool),
+                       'tables': tables}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RecommendationTables"]:
+        """미리 만든 표 불러오기 - 파일이 없거나 규칙이 바뀌었으면 None"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != weather_rules.rules_fingerprint():
+            return None
+        texts = data['texts']
+        try:
+            tables = [LookupTable(axes, [tuple(texts[i] for i in entry) for entry in data['tables'][name]])
+                      for name, axes in (('outfit', _outfit_axes()), ('transport', _transport_axes()),
+                                         ('health', _health_axes()))]
+        except (AssertionError, KeyError, IndexError):
+            return None
+        return cls(*tables)
+
+    # ---- 검증 ----
+
+    def verify(self) -> List[tuple]:
+        """모든 축의 경계/내부 값 조합에서 weather_rules 함수와 결과 비교 - 불일치 목록 반환"""
+        mismatches = []
+        outfit_axes, transport_axes, health_axes = _outfit_axes(), _transport_axes(), _health_axes()
+        gaps = [0.0, 2.0, math.nextafter(2.0, math.inf), 3.0, 5.0, math.nextafter(5.0, math.inf), 8.0]
+
+        for temp, condition, humidity, wind in itertools.product(*(a.samples() for a in outfit_axes)):
+            for gap in gaps[:4]:
+                args = (temp, temp - gap, humidity, wind, condition)
+                if self.outfit(*args) != weather_rules.outfit_recommendation(*args):
+                    mismatches.append(('outfit', args))
+
+        for args in itertools.product(*(a.samples() for a in transport_axes)):
+            if self.transport(*args) != weather_rules.transport_recommendation(*args):
+                mismatches.append(('transport', args))
+
+        for temp, humidity, pressure, wind, condition in itertools.product(*(a.samples() for a in health_axes)):
+            for gap in (0.0, 5.0, gaps[5]):
+                args = (temp, temp + gap, humidity, pressure, wind, condition)
+                if self.health(*args) != weather_rules.health_advice(*args):
+                    mismatches.append(('health', args))
+        return mismatches
+
+
+def load_or_build(path: Optional[str] = None) -> RecommendationTables:
+    """WEATHER_LUT_FILE(또는 path)의 표를 불러오고, 없거나 오래됐으면 새로 계산"""
+    path = path or os.environ.get("WEATHER_LUT_FILE")
+    tables = RecommendationTables.load(path) if path else None
+    return tables or RecommendationTables.build()
+
+
+TABLES = load_or_build()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 조회 표 생성/검증")
+    parser.add_argument("--build", metavar="PATH", help="표를 계산해 JSON 파일로 저장")
+    parser.add_argument("--verify", action="store_true", help="전체 입력 공간에서 규칙 함수와 비교")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tables = RecommendationTables.build()
+    print(f"📋 표 계산: 복장 {len(tables.outfit_table)}칸, 교통 {len(tables.transport_table)}칸, "
+          f"건강 {len(tables.health_table)}칸 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+    if args.build:
+        tables.save(args.build)
+        print(f"💾 저장: {args.build}")
+
+    if args.verify:
+        started = time.perf_counter()
+        mismatches = tables.verify()
+        elapsed = time.perf_counter() - started
+        if mismatches:
+            print(f"❌ 불일치 {len(mismatches)}건 ({elapsed:.1f}s)")
+            for kind, values in mismatches[:10]:
+                print(f"   {kind}: {values}")
+            sys.exit(1)
+        print(f"✅ 전체 입력 공간 일치 ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# weather_metrics.py - 단계별 소요 시간 히스토그램 + 카운터 (Prometheus 텍스트 형식)
+#
+# WEATHER_METRICS=1일 때만 시간을 잽니다. 꺼져 있으면 timer()는 아무것도 하지 않는 공용
+# 컨텍스트 관리자를, @timed 함수는 원래 함수를 바로 부르므로 비용은 속성 확인 한 번입니다.
+#
+#   with METRICS.timer("render_weather_card"): ...
+#   @timed("fetch_weather_data")
+#   METRICS.count("upstream_requests", endpoint="/weather", outcome="ok")
+#
+# 캐시/회로 차단기처럼 원래 세고 있는 값은 prometheus(samples)에 (이름, 종류, 라벨, 값)으로
+# 넘겨 같은 출력에 붙입니다. 시간 측정이 꺼져 있어도 이 값들은 나옵니다.
+
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+PREFIX = "weather_"
+
+# 히스토그램 구간 상한 (초) - 100µs(조회 표 추천)부터 10초(업스트림 타임아웃 상한)까지
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (이름, 종류 'counter'/'gauge', 라벨, 값)
+Sample = Tuple[str, str, Dict[str, str], float]
+
+
+class Histogram:
+    """고정 구간 히스토그램 - 백분위는 구간 안에서 선형 보간 (Prometheus histogram_quantile과 같은 방식)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 백분위 추정값 (관측값이 없으면 None, +Inf 구간이면 마지막 상한)"""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, 누적 개수) 목록 - Prometheus _bucket 줄"""
+        with self._lock:
+            counts = list(self.counts)
+        rows, running = [], 0
+        for bound, bucket_count in zip(list(self.buckets) + [float('inf')], counts):
+            running += bucket_count
+            rows.append(("+Inf" if bound == float('inf') else repr(bound), running))
+        return rows
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+class Metrics:
+    """프로세스 공유 지표 저장소 - 단계별 히스토그램과 라벨 붙은 카운터"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage: str):
+        """with 블록의 소요 시간을 stage 히스토그램에 기록 (꺼져 있으면 아무것도 안 함)"""
+        return _Timer(self, stage) if self.enabled else _NOOP
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        """카운터 증가 (꺼져 있으면 무시)"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def stages(self) -> Dict[str, dict]:
+        """단계별 {'count', 'sum', 'p50', 'p95', 'p99'} (초) - 관리 화면용"""
+        with self._lock:
+            stages = dict(self._stages)
+        return {stage: {'count': h.count, 'sum': h.total,
+                        **{f"p{int(q * 100)}": h.quantile(q) for q in QUANTILES}}
+                for stage, h in sorted(stages.items())}
+
+    def counters(self) -> List[Sample]:
+        with self._lock:
+            return [(name, 'counter', dict(labels), value)
+                    for (name, labels), value in sorted(self._counters.items())]
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def prometheus(self, samples: Iterable[Sample] = ()) -> str:
+        """Prometheus 텍스트 형식 (0.0.4) - 단계 히스토그램 + 카운터 + samples"""
+        lines = []
+        with self._lock:
+            stages = sorted(self._stages.items())
+        if stages:
+            name = PREFIX + "stage_seconds"
+            lines += [f"# HELP {name} 단계별 소요 시간", f"# TYPE {name} histogram"]
+            for stage, histogram in stages:
+                for le, running in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {running}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            name = PREFIX + "stage_quantile_seconds"
+            lines.append(f"# TYPE {name} gauge")
+            for stage, histogram in stages:
+                for q in QUANTILES:
+                    value = histogram.quantile(q)
+                    if value is not None:
+                        lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value!r}')
+
+        # 같은 이름의 줄은 한데 모아야 함 (처음 나온 순서 유지)
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        for name, kind, labels, value in list(self.counters()) + list(samples):
+            full = PREFIX + name + ("_total" if kind == 'counter' else "")
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            families.setdefault(full, (kind, []))[1].append(
+                f"{full}{{{label_text}}} {float(value)!r}" if label_text else f"{full} {float(value)!r}")
+        for full, (kind, rows) in families.items():
+            lines.append(f"# TYPE {full} {kind}")
+            lines += rows
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics(enabled=os.environ.get("WEATHER_METRICS", "0") == "1")
+
+
+def timed(stage: str):
+    """함수 소요 시간을 stage 히스토그램에 기록하는 데코레이터 (METRICS가 꺼져 있으면 바로 호출)"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.observe(stage, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = self.server.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(render: Callable[[], str], host: str = "127.0.0.1",
+                         port: int = 0) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 GET /metrics 서버 시작 - render()가 본문을 만듦"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.render = render
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,120 @@
+# weather_prefetch.py - 자주 조회되는 도시를 미리 갱신하는 백그라운드 스케줄러
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from weather_cache import ObservationCache
+
+RefreshFn = Callable[[str, str], None]
+
+
+class RefreshAheadPrefetcher:
+    """refresh-ahead 프리페처
+
+    사용자가 조회한 (도시, API 키)를 기억해 두었다가 캐시 항목이 TTL 만료
+    refresh_margin초 전이 되면 백그라운드에서 다시 가져옵니다.
+    - 추적 도시 수는 max_cities로 제한 (가장 오래 조회되지 않은 도시부터 제외)
+    - 동시 갱신 수는 max_concurrent로 제한
+    - idle_timeout초 동안 아무도 조회하지 않은 도시는 더 이상 갱신하지 않음
+    """
+
+    def __init__(self, refresh: RefreshFn, cache: ObservationCache, max_cities: int = 20,
+                 max_concurrent: int = 4, refresh_margin: float = 30, idle_timeout: float = 900,
+                 interval: float = 5):
+        self.refresh = refresh
+        self.cache = cache
+        self.max_cities = max_cities
+        self.max_concurrent = max_concurrent
+        self.refresh_margin = refresh_margin
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+
+        # (도시, API 키) -> 마지막 조회 시각
+        self._tracked: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="prefetch")
+        self.refreshes = 0
+        self.failures = 0
+
+    def touch(self, city: str, api_key: str):
+        """사용자 조회 기록 - 첫 호출 시 스케줄러 스레드 시작"""
+        key = (city, api_key)
+        with self._lock:
+            self._tracked[key] = time.time()
+            self._tracked.move_to_end(key)
+            while len(self._tracked) > self.max_cities:
+                self._tracked.popitem(last=False)
+        self.start()
+
+    def revalidate(self, city: str, api_key: str) -> bool:
+        """즉시 백그라운드 갱신 예약 - 이미 진행 중이면 False"""
+        key = (city, api_key)
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+        self._pool.submit(self._refresh_one, key)
+        return True
+
+    def is_refreshing(self, city: str, api_key: str) -> bool:
+        """해당 항목을 갱신 중인지 여부"""
+        with self._lock:
+            return (city, api_key) in self._inflight
+
+    def tracked(self) -> list:
+        """현재 갱신 대상 도시 목록"""
+        with self._lock:
+            return [city for city, _ in self._tracked]
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name="refresh-ahead", daemon=True)
+                    self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self, now: float = None) -> int:
+        """만료가 가까운 항목 갱신 예약 - 예약한 개수 반환"""
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            for key, last_seen in list(self._tracked.items()):
+                if now - last_seen > self.idle_timeout:
+                    del self._tracked[key]
+                    continue
+                if key in self._inflight:
+                    continue
+                entry = self.cache.peek(*key)
+                if entry is None or entry.age(now) >= self.cache.ttl - self.refresh_margin:
+                    due.append(key)
+            due = due[:max(0, self.max_concurrent - len(self._inflight))]
+            self._inflight.update(due)
+
+        for key in due:
+            self._pool.submit(self._refresh_one, key)
+        return len(due)
+
+    def _refresh_one(self, key: Tuple[str, str]):
+        try:
+            self.refresh(*key)
+            self.refreshes += 1
+        except Exception:
+            self.failures += 1
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
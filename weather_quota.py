@@ -0,0 +1,264 @@
+# weather_quota.py - 업스트림 호출 한도 관리 (토큰 버킷 + 우선순위 + 호출 장부)
+#
+# OpenWeatherMap은 API 키마다 분당/일일 호출 한도가 있습니다. 모든 업스트림 요청은 먼저
+# QuotaScheduler.acquire로 토큰을 받아야 하며, 우선순위가 낮은 요청일수록 버킷을 덜 쓸 수
+# 있습니다 (사용자 조회 > refresh-ahead > 배치/워밍업). 토큰이 없으면 우선순위별 최대 대기
+# 시간만큼 기다리고, 그래도 없으면 QuotaExceeded - 호출한 쪽은 stale 데이터로 대신합니다.
+# 업스트림의 429 응답도 같은 뜻이므로 (is_rate_limited) 호출한 쪽에서 똑같이 다룹니다.
+
+import asyncio
+import threading
+import time
+from collections import Counter, OrderedDict
+from enum import IntEnum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from weather_cache import key_fingerprint
+
+
+class Priority(IntEnum):
+    """업스트림 요청 우선순위 (작을수록 먼저)"""
+    INTERACTIVE = 0  # 사용자가 보고 있는 도시
+    REFRESH = 1      # refresh-ahead / 백그라운드 재검증
+    BATCH = 2        # 여러 도시 일괄 조회, 워밍업
+
+
+# 우선순위별로 남겨 두어야 하는 분당 버킷 비율 - 낮은 우선순위가 사용자 몫을 다 쓰지 않게 함
+RESERVE = {Priority.INTERACTIVE: 0.0, Priority.REFRESH: 0.25, Priority.BATCH: 0.5}
+# 토큰을 기다리는 최대 시간 (초)
+MAX_WAIT = {Priority.INTERACTIVE: 2.0, Priority.REFRESH: 0.0, Priority.BATCH: 10.0}
+
+
+class QuotaExceeded(Exception):
+    """호출 한도 때문에 업스트림 요청을 보내지 않음 (priority: 한도를 받지 못한 요청의 우선순위)"""
+
+    def __init__(self, message: str = "", priority: Optional[Priority] = None):
+        super().__init__(message)
+        self.priority = priority
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷 (잠금은 호출한 쪽에서)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, level: float) -> float:
+        """토큰이 level개가 될 때까지 남은 시간 (초)"""
+        return max(0.0, (level - self.tokens) / self.rate) if self.rate > 0 else float('inf')
+
+
+class _KeyQuota:
+    """API 키 하나의 한도 상태"""
+
+    def __init__(self, per_minute: int, per_day: int):
+        self.minute = TokenBucket(per_minute / 60.0, per_minute)
+        self.per_day = per_day
+        self.day = int(time.time() // 86400)
+        self.day_calls = 0
+        self.paused_until = 0.0  # 429 응답 후 Retry-After 동안 멈춤 (monotonic)
+        self.waiting = Counter()  # 우선순위별 대기 중인 요청 수
+
+
+class CallLedger:
+    """분 단위 호출 장부 - (분, 도시, 키 지문, 우선순위, 결과)별 횟수
+
+    결과: 'call'(업스트림 호출), 'rejected'(한도 때문에 보내지 않음), 'throttled'(429 응답)
+    group 요청처럼 여러 도시를 한 번에 부르면 도시마다 기록하고 calls에는 1번만 셉니다.
+    """
+
+    def __init__(self, retention_minutes: int = 1440):
+        self.retention_minutes = retention_minutes
+        self._minutes: "OrderedDict[int, Counter]" = OrderedDict()
+        self._calls: "OrderedDict[int, Counter]" = OrderedDict()  # 분 → 키 지문별 실제 호출 수
+        self._lock = threading.Lock()
+
+    def record(self, api_key: str, cities: Iterable[str], priority: Priority, outcome: str,
+               now: float = None):
+        minute = int((now if now is not None else time.time()) // 60)
+        fingerprint = key_fingerprint(api_key)
+        with self._lock:
+            counts = self._minutes.get(minute)
+            if counts is None:
+                counts = self._minutes[minute] = Counter()
+                self._calls[minute] = Counter()
+                while len(self._minutes) > self.retention_minutes:
+                    oldest, _ = self._minutes.popitem(last=False)
+                    self._calls.pop(oldest, None)
+            for city in cities:
+                counts[(city, fingerprint, priority.name.lower(), outcome)] += 1
+            if outcome == 'call':
+                self._calls[minute][fingerprint] += 1
+
+    def rows(self, minutes: int = 60, now: float = None) -> List[Tuple[int, str, str, str, str, int]]:
+        """최근 minutes분의 (분 시작 epoch 초, 도시, 키 지문, 우선순위, 결과, 횟수) 목록"""
+        since = int((now if now is not None else time.time()) // 60) - minutes + 1
+        with self._lock:
+            return [(minute * 60, *key, count) for minute, counts in self._minutes.items()
+                    if minute >= since for key, count in counts.items()]
+
+    def calls(self, minutes: int = 1, api_key: Optional[str] = None, now: float = None) -> int:
+        """최근 minutes분 동안의 업스트림 호출 수 (api_key를 주면 그 키만)"""
+        since = int((now if now is not None else time.time()) // 60) - minutes + 1
+        fingerprint = key_fingerprint(api_key) if api_key else None
+        with self._lock:
+            return sum(counts[fingerprint] if fingerprint else sum(counts.values())
+                       for minute, counts in self._calls.items() if minute >= since)
+
+    def by_city(self, minutes: int = 60, outcome: str = 'call') -> Counter:
+        """최근 minutes분의 도시별 횟수"""
+        totals = Counter()
+        for _, city, _, _, row_outcome, count in self.rows(minutes):
+            if row_outcome == outcome:
+                totals[city] += count
+        return totals
+
+
+class QuotaScheduler:
+    """API 키별 분당/일일 호출 한도 스케줄러
+
+    per_minute: 분당 한도 (버킷 크기이자 분당 충전량), per_day: 일일 한도 (0이면 제한 없음, UTC 기준)
+    max_wait: 우선순위별 최대 대기 시간 중 MAX_WAIT와 다르게 할 것
+    """
+
+    def __init__(self, per_minute: int = 60, per_day: int = 0, ledger: CallLedger = None,
+                 max_wait: Dict[Priority, float] = None):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.max_wait = {**MAX_WAIT, **(max_wait or {})}
+        self.ledger = ledger or CallLedger()
+        self._keys: Dict[str, _KeyQuota] = {}
+        self._cond = threading.Condition()
+
+    def _quota(self, api_key: str) -> _KeyQuota:
+        fingerprint = key_fingerprint(api_key)
+        quota = self._keys.get(fingerprint)
+        if quota is None:
+            quota = self._keys[fingerprint] = _KeyQuota(self.per_minute, self.per_day)
+        return quota
+
+    def _try_take(self, quota: _KeyQuota, priority: Priority) -> Tuple[bool, float]:
+        """토큰 하나 받기 시도 - (성공 여부, 다시 시도할 때까지 기다릴 시간)"""
+        now = time.monotonic()
+        if now < quota.paused_until:
+            return False, quota.paused_until - now
+        day = int(time.time() // 86400)
+        if day != quota.day:
+            quota.day, quota.day_calls = day, 0
+        if quota.per_day and quota.day_calls >= quota.per_day:
+            return False, (day + 1) * 86400 - time.time()
+        # 더 높은 우선순위가 기다리는 중이면 양보
+        if any(quota.waiting[p] for p in Priority if p < priority):
+            return False, 0.05
+
+        bucket = quota.minute
+        bucket.refill(now)
+        level = 1 + RESERVE[priority] * bucket.capacity
+        if bucket.tokens >= level:
+            bucket.tokens -= 1
+            quota.day_calls += 1
+            return True, 0.0
+        return False, bucket.wait_for(level)
+
+    def acquire(self, api_key: str, priority: Priority, cities: Iterable[str] = (),
+                max_wait: float = None) -> bool:
+        """토큰 하나 받기 - max_wait초(기본: 우선순위별 최대 대기 시간)까지 기다려도 없으면 False"""
+        cities = list(cities)
+        deadline = time.monotonic() + (self.max_wait[priority] if max_wait is None else max_wait)
+        with self._cond:
+            quota = self._quota(api_key)
+            quota.waiting[priority] += 1
+            try:
+                while True:
+                    granted, wait = self._try_take(quota, priority)
+                    if granted:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.ledger.record(api_key, cities, priority, 'rejected')
+                        return False
+                    self._cond.wait(min(wait, remaining))
+            finally:
+                quota.waiting[priority] -= 1
+                self._cond.notify_all()
+        self.ledger.record(api_key, cities, priority, 'call')
+        return True
+
+    async def acquire_async(self, api_key: str, priority: Priority, cities: Iterable[str] = (),
+                            max_wait: float = None) -> bool:
+        """acquire의 asyncio 버전 - 기다리는 동안 이벤트 루프를 막지 않음"""
+        cities = list(cities)
+        deadline = time.monotonic() + (self.max_wait[priority] if max_wait is None else max_wait)
+        with self._cond:
+            quota = self._quota(api_key)
+            quota.waiting[priority] += 1
+        try:
+            while True:
+                with self._cond:
+                    granted, wait = self._try_take(quota, priority)
+                if granted:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.ledger.record(api_key, cities, priority, 'rejected')
+                    return False
+                await asyncio.sleep(min(wait, remaining))
+        finally:
+            with self._cond:
+                quota.waiting[priority] -= 1
+                self._cond.notify_all()
+        self.ledger.record(api_key, cities, priority, 'call')
+        return True
+
+    def throttled(self, api_key: str, retry_after: float = 60, cities: Iterable[str] = (),
+                  priority: Priority = Priority.INTERACTIVE):
+        """업스트림이 429를 돌려줌 - 버킷을 비우고 retry_after초 동안 요청 중지"""
+        with self._cond:
+            quota = self._quota(api_key)
+            quota.minute.tokens = 0
+            quota.paused_until = max(quota.paused_until, time.monotonic() + retry_after)
+        self.ledger.record(api_key, cities, priority, 'throttled')
+
+    def retry_after(self, api_key: str, priority: Priority = Priority.INTERACTIVE) -> float:
+        """priority 요청이 토큰을 받을 수 있을 때까지 남은 시간 (초) - 429 응답의 멈춤과 일일 한도 포함"""
+        with self._cond:
+            quota = self._quota(api_key)
+            now = time.monotonic()
+            if now < quota.paused_until:
+                return quota.paused_until - now
+            if quota.per_day and quota.day == int(time.time() // 86400) and quota.day_calls >= quota.per_day:
+                return (quota.day + 1) * 86400 - time.time()
+            bucket = quota.minute
+            bucket.refill(now)
+            return bucket.wait_for(1 + RESERVE[priority] * bucket.capacity)
+
+    def remaining(self, api_key: str) -> dict:
+        """남은 한도 - {'minute': 분당 버킷 토큰 수, 'day': 오늘 남은 호출 수 (제한 없으면 None)}"""
+        with self._cond:
+            quota = self._quota(api_key)
+            quota.minute.refill(time.monotonic())
+            return {
+                'minute': int(quota.minute.tokens),
+                'day': quota.per_day - quota.day_calls if quota.per_day else None,
+            }
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """업스트림이 429(호출 한도 초과)로 거절한 오류인지 - QuotaExceeded처럼 stale 데이터로 대신할 대상"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 429
+
+
+def retry_after_seconds(headers, default: float = 60) -> float:
+    """429 응답의 Retry-After 헤더 (초) - 없거나 날짜 형식이면 default"""
+    try:
+        return max(0.0, float(headers.get('Retry-After') or headers.get('retry-after')))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,442 @@
+# weather_rules.py - 추천 규칙 표 (임계값 + 문구)
+#
+# 복장/교통/출발시간/건강 추천의 모든 임계값을 선언형 표로 정의하고, 모듈을 불러올 때
+# 한 번 정렬된 경계값 배열로 컴파일합니다. 단일 관측값은 bisect, 배열은
+# np.searchsorted로 같은 표를 조회하므로 WeatherApp과 weather_batch가 규칙을 공유합니다.
+#
+# 임계값만 바꾸려면 WEATHER_RULES_FILE에 JSON 파일 경로를 지정하세요. 파일의 항목은
+# 아래 THRESHOLD_RULES / CONDITION_RULES / HOUR_RULES 중 같은 이름의 규칙을 덮어씁니다.
+#   {"outfit_temp": {"chain": [["<", -12, 0], ...], "default": 6}}
+
+import bisect
+import hashlib
+import json
+import math
+import os
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from weather_forecast import condition_main
+
+# 임계값 규칙: if/elif 순서대로 [연산자, 기준값, 결과]를 검사하고, 모두 아니면 default
+THRESHOLD_RULES = {
+    # 체감온도와 기온 차이가 이보다 크면 체감온도 기준으로 복장 추천
+    'outfit_feels_gap': {'chain': [['>', 2, 1]], 'default': 0},
+    'outfit_temp': {'chain': [['<', -10, 0], ['<', 0, 1], ['<', 10, 2], ['<', 15, 3],
+                              ['<', 20, 4], ['<', 25, 5]], 'default': 6},
+    'outfit_humidity': {'chain': [['>', 80, 1], ['<', 30, 2]], 'default': 0},
+    'outfit_wind': {'chain': [['>', 10, 1]], 'default': 0},
+
+    'transport_wind_risk': {'chain': [['>', 15, 3], ['>', 10, 1]], 'default': 0},
+    'transport_visibility_risk': {'chain': [['<', 5, 2], ['<', 10, 1]], 'default': 0},
+    'transport_temp_risk': {'chain': [['<', -5, 2], ['>', 35, 2]], 'default': 0},
+    'transport_category': {'chain': [['>=', 7, 0], ['>=', 4, 1], ['>=', 2, 2]], 'default': 3},
+    'transport_gust': {'chain': [['>', 12, 1]], 'default': 0},
+    'transport_low_visibility': {'chain': [['<', 5, 1]], 'default': 0},
+    'transport_icy': {'chain': [['<', 0, 1]], 'default': 0},
+    'transport_humid': {'chain': [['>', 85, 1]], 'default': 0},
+
+    'departure_wind_delay': {'chain': [['>', 15, 10], ['>', 10, 5]], 'default': 0},
+    'departure_visibility_delay': {'chain': [['<', 5, 15], ['<', 10, 5]], 'default': 0},
+    'departure_category': {'chain': [['>=', 30, 0], ['>=', 15, 1], ['>=', 5, 2]], 'default': 3},
+
+    'health_temp': {'chain': [['<', -10, 1], ['<', 0, 2], ['>', 35, 3], ['>', 30, 4]], 'default': 0},
+    'health_humidity': {'chain': [['>', 85, 1], ['>', 70, 2], ['<', 30, 3], ['<', 40, 4]], 'default': 0},
+    'health_pressure': {'chain': [['<', 1000, 1], ['>', 1030, 2]], 'default': 0},
+    'health_wind': {'chain': [['>', 15, 1]], 'default': 0},
+    'health_feels_gap': {'chain': [['>', 5, 1]], 'default': 0},
+}
+
+# 날씨 조건 규칙: 소문자 weather_condition에 키워드 중 하나가 들어 있으면 결과
+CONDITION_RULES = {
+    'outfit_condition': {'chain': [[['rain', 'drizzle'], 1], [['thunderstorm'], 2], [['snow'], 3]],
+                         'default': 0},
+    'transport_condition_risk': {'chain': [[['rain', 'drizzle'], 3], [['thunderstorm'], 5],
+                                           [['snow'], 4], [['fog', 'mist'], 2]], 'default': 0},
+    'transport_rain': {'chain': [[['rain'], 1]], 'default': 0},
+    'departure_condition_delay': {'chain': [[['thunderstorm'], 30], [['snow'], 25],
+                                            [['rain', 'drizzle'], 15], [['fog', 'mist'], 10]],
+                                  'default': 0},
+    'health_wet': {'chain': [[['rain', 'thunderstorm'], 1]], 'default': 0},
+    'health_snow': {'chain': [[['snow'], 1]], 'default': 0},
+}
+
+# 시간대 규칙 (평일만 적용): [시작 시, 끝 시(포함), 결과], 시작 > 끝이면 자정을 넘는 구간
+HOUR_RULES = {
+    # 0: 해당 없음, 1: 출근, 2: 퇴근, 3: 점심, 4: 심야
+    'departure_period': {'chain': [[6, 9, 1], [17, 20, 2], [11, 13, 3], [22, 5, 4]], 'default': 0},
+    'departure_rush_delay': {'chain': [[6, 9, 10], [17, 20, 15], [11, 13, 5], [23, 4, 20]], 'default': 0},
+}
+
+# 도시별 안내: 도시 → [지연 시간이 이 값보다 클 때, 안내 번호]
+CITY_NOTE_RULES = {
+    'Seoul': [0, 1], 'Busan': [0, 1], 'Tokyo': [0, 1],
+    'New York': [10, 2], 'London': [10, 2],
+    'Los Angeles': [0, 3],
+}
+
+# ---- 추천 문구 (규칙 결과 번호로 조회) ----
+
+OUTFIT_TEMP_TEXTS = [
+    ["🧥 두꺼운 패딩 또는 겨울 코트 필수",
+     "🧤 방한장갑, 목도리, 털모자 착용",
+     "👢 방수 겨울부츠, 미끄럼방지 밑창",
+     "🔥 핫팩 여러 개 준비 (손, 발, 몸통용)"],
+    ["🧥 패딩 재킷 또는 울코트",
+     "🧤 장갑과 목도리 필수",
+     "👢 따뜻한 부츠 착용"],
+    ["🧥 두꺼운 자켓 또는 코트",
+     "👕 니트나 긴팔 셔츠 + 카디건",
+     "👖 긴바지, 두꺼운 양말"],
+    ["👔 얇은 자켓 또는 가디건",
+     "👕 긴팔 셔츠 또는 얇은 니트",
+     "👖 긴바지 추천"],
+    ["👕 긴팔 또는 얇은 가디건",
+     "👖 긴바지 또는 면바지",
+     "🧥 얇은 겉옷 가져가기"],
+    ["👕 반팔 또는 얇은 긴팔",
+     "👖 면바지 또는 7부바지",
+     "🧥 가벼운 겉옷 준비"],
+    ["👕 반팔, 민소매 또는 통풍 잘 되는 옷",
+     "🩳 반바지 또는 치마",
+     "🕶️ 선글라스, 모자 준비",
+     "🧴 선크림 SPF 30+ 필수"],
+]
+OUTFIT_CONDITION_TEXTS = [
+    [],
+    ["☔ 우산 또는 방수 우비 필수",
+     "👢 방수 신발 착용",
+     "🎒 방수 가방 또는 가방 커버"],
+    ["⛈️ 완전 방수 의류 필수",
+     "🏠 가능하면 실내 대기 권장"],
+    ["❄️ 미끄럼방지 신발 필수",
+     "🧥 방수 외투 착용",
+     "🧤 방수 장갑 권장"],
+]
+OUTFIT_HUMIDITY_TEXTS = [
+    [],
+    ["💨 통풍 잘 되는 소재 선택 (면, 리넨)"],
+    ["💧 보습 로션 사용, 립밤 준비"],
+]
+OUTFIT_WIND_TEXT = "💨 바람막이 재킷 또는 윈드브레이커 추천"
+
+TRANSPORT_CATEGORY_TEXTS = [
+    ["🚇 지하철 강력 추천 (가장 안전하고 정시성 우수)",
+     "🏠 가능하면 재택근무 또는 일정 연기 고려",
+     "🚗 자차 이용 시 극도로 주의운전",
+     "🚴‍♂️ 자전거/킥보드/도보 절대 금지"],
+    ["🚇 지하철 이용 강력 추천",
+     "🚌 버스 이용 시 배차간격 지연 예상",
+     "🚗 자차 이용 시 안전거리 충분히 확보",
+     "🚴‍♂️ 개인형 이동수단 피하기"],
+    ["🚇 지하철/🚌 버스 모두 무난",
+     "🚗 자차 이용 시 주의운전",
+     "🚴‍♂️ 자전거/킥보드 신중히 판단",
+     "📱 실시간 교통정보 확인 권장"],
+    ["🚶‍♂️ 도보나 자전거로 이동하기 좋은 날",
+     "🚴‍♂️ 킥보드, 자전거 등 친환경 이동수단 추천",
+     "🚇🚌 모든 대중교통 쾌적하게 이용 가능",
+     "🚗 드라이브하기 좋은 날씨"],
+]
+TRANSPORT_RAIN_TEXT = "☔ 대중교통 이용 시 우산 준비, 젖은 신발 주의"
+TRANSPORT_GUST_TEXT = "💨 고층건물 주변 돌풍 주의"
+TRANSPORT_LOW_VISIBILITY_TEXT = "👁️ 낮은 가시거리, 차량 전조등 점등 필수"
+TRANSPORT_ICY_TEXT = "🧊 노면 결빙 가능성, 미끄럼 주의"
+TRANSPORT_HUMID_TEXT = "💧 높은 습도로 실내 환기 필요"
+
+DEPARTURE_WEEKEND_TEXT = "🎉 주말이므로 교통량이 평일보다 적습니다"
+DEPARTURE_PERIOD_TEXTS = [
+    None,
+    "🌅 출근시간대 ({hour}시): 교통혼잡 예상",
+    "🌆 퇴근시간대 ({hour}시): 극심한 교통혼잡",
+    "🍽️ 점심시간대 ({hour}시): 약간의 혼잡",
+    "🌙 심야시간 ({hour}시): 대중교통 운행 간격 확인",
+]
+DEPARTURE_CATEGORY_TEXTS = [
+    ["⏰ 평소보다 {delay}분 일찍 출발 권장",
+     "🏠 가능하면 재택근무 또는 일정 조정 고려",
+     "📱 실시간 교통정보 필수 확인",
+     "🚇 대중교통 지연 및 운행 중단 가능성 체크"],
+    ["⏰ 평소보다 {delay}분 일찍 출발",
+     "📱 실시간 교통정보 확인 필수",
+     "🚇 대중교통 배차간격 늘어날 수 있음"],
+    ["⏰ 평소보다 {delay}분 정도 일찍 출발",
+     "📱 교통정보 한 번 체크해보기"],
+    ["✅ 평소 시간에 출발해도 충분",
+     "🌤️ 좋은 날씨로 쾌적한 이동 예상"],
+]
+CITY_NOTE_TEXTS = [
+    None,
+    "🚇 지하철망 발달 지역: 지하철 우선 이용 권장",
+    "🚌 대도시 교통체증: 지하철/버스 혼용 고려",
+    "🚗 자동차 도시: 고속도로 우회로 검토",
+]
+
+HEALTH_TEMP_TEXTS = [
+    [],
+    ["🥶 체온저하 위험: 따뜻한 음료 자주 섭취",
+     "🫀 심혈관 질환자 외출 시 특별 주의",
+     "🏠 실내외 온도차 20도 이상 시 서서히 적응",
+     "🤧 호흡기 보호: 마스크나 목도리로 찬공기 차단"],
+    ["🧊 동상 위험 부위 (손가락, 발가락, 귀) 보온 철저",
+     "💧 실내 건조 주의: 가습기 사용 권장",
+     "🍲 따뜻한 음식으로 체온 유지"],
+    ["🌡️ 열사병 주의: 그늘에서 휴식 자주 취하기",
+     "💧 탈수 방지: 30분마다 물 한 컵씩 섭취",
+     "🧂 전해질 보충: 이온음료나 소금 조금 섭취",
+     "❄️ 에어컨 사용 시 실내외 온도차 5-7도 유지"],
+    ["💦 충분한 수분 섭취 (하루 2-3L)",
+     "😎 직사광선 피하고 그늘 이용",
+     "🍉 수분 많은 과일 섭취 권장"],
+]
+HEALTH_HUMIDITY_TEXTS = [
+    [],
+    ["💨 고습도로 인한 답답함: 통풍 자주 시키기",
+     "🦠 세균 번식 주의: 개인위생 철저히",
+     "👕 땀 흡수 잘 되는 면 소재 의류 착용"],
+    ["🌫️ 높은 습도: 체감온도 상승, 수분 섭취 증가"],
+    ["🏜️ 건조 주의: 피부 보습제 수시로 사용",
+     "👃 코 점막 건조 방지: 식염수 스프레이 활용",
+     "💧 가습기 사용 또는 젖은 수건 활용"],
+    ["🌵 약간 건조: 립밤, 핸드크림 준비"],
+]
+HEALTH_PRESSURE_TEXTS = [
+    [],
+    ["📉 저기압: 관절염/두통 악화 가능",
+     "😴 충분한 수면과 휴식 권장",
+     "🧘‍♀️ 스트레칭이나 가벼운 운동으로 혈액순환 개선"],
+    ["📈 고기압: 대체로 몸이 가벼움, 야외활동 좋은 날"],
+]
+HEALTH_WET_TEXTS = ["🌧️ 우울감 주의: 실내 조명 밝게 하기",
+                    "☔ 젖은 옷 즉시 갈아입기 (감기 예방)",
+                    "🦶 발 습기 제거: 양말 여분 준비"]
+HEALTH_SNOW_TEXTS = ["❄️ 미끄러짐 사고 주의: 보폭 줄이고 천천히 걷기",
+                     "👁️ 설맹 주의: 선글라스 착용 권장"]
+HEALTH_WIND_TEXTS = ["💨 강풍으로 인한 안구건조: 인공눈물 사용",
+                     "🌪️ 비산물질 주의: 마스크 착용"]
+HEALTH_BASIC_TEXTS = ["😷 미세먼지 차단: 보건용 마스크 착용",
+                      "🚶‍♂️ 날씨에 맞는 적절한 운동 지속",
+                      "🥗 제철 음식과 비타민 섭취로 면역력 강화",
+                      "💤 규칙적인 수면 패턴 유지 (7-8시간)"]
+HEALTH_FEELS_GAP_TEXT = "🌡️ 체감온도({feels_like:.1f}°C)와 실제온도 차이 큼: 체온조절 신경쓰기"
+
+
+# ---- 규칙 컴파일 ----
+
+_OPS = {
+    '<': lambda v, b: v < b,
+    '<=': lambda v, b: v <= b,
+    '>': lambda v, b: v > b,
+    '>=': lambda v, b: v >= b,
+}
+
+
+class ThresholdTable:
+    """if/elif 임계값 규칙을 정렬된 경계값 배열로 컴파일한 표
+
+    '>' / '<=' 기준값 b는 바로 다음 부동소수점 값(nextafter)을 경계로 삼아 모든 경계를
+    "값 >= 경계" 한 가지 형태로 맞춥니다. 그러면 구간 번호는 bisect_right 한 번이고,
+    구간마다 원래 규칙을 대표값으로 평가해 둔 결과를 읽으면 됩니다.
+    """
+
+    def __init__(self, chain: Sequence[Sequence], default: int):
+        keys = set()
+        for op, threshold, _ in chain:
+            threshold = float(threshold)
+            keys.add(math.nextafter(threshold, math.inf) if op in ('>', '<=') else threshold)
+        self.breakpoints = np.array(sorted(keys), dtype=np.float64)
+
+        def evaluate(v: float) -> int:
+            for op, threshold, result in chain:
+                if _OPS[op](v, threshold):
+                    return result
+            return default
+
+        # 구간 i = [breakpoints[i-1], breakpoints[i]) - 왼쪽 끝값이 대표값
+        first = math.nextafter(self.breakpoints[0], -math.inf) if len(self.breakpoints) else 0.0
+        self.values = np.array([evaluate(first)] + [evaluate(k) for k in self.breakpoints], dtype=np.int64)
+        self._breakpoints = self.breakpoints.tolist()
+        self._values = self.values.tolist()
+
+    def __call__(self, value: float) -> int:
+        """단일 값 조회 (이진 탐색)"""
+        return self._values[bisect.bisect_right(self._breakpoints, value)]
+
+    def lookup(self, values) -> np.ndarray:
+        """배열 조회"""
+        index = np.searchsorted(self.breakpoints, np.asarray(values, dtype=np.float64), side='right')
+        return self.values[index]
+
+
+class ConditionTable:
+    """날씨 조건 키워드 규칙 - 문자열은 결과를 기억해 두고, 조건 코드는 1000칸 배열로 조회"""
+
+    def __init__(self, chain: Sequence[Sequence], default: int):
+        self.chain = [(tuple(keywords), result) for keywords, result in chain]
+        self.default = default
+        self._memo: Dict[str, int] = {}
+        self.by_code = np.array([self(condition_main(code)) for code in range(1000)], dtype=np.int64)
+
+    def __call__(self, condition: str) -> int:
+        result = self._memo.get(condition)
+        if result is None:
+            lowered = condition.lower()
+            result = next((r for keywords, r in self.chain if any(k in lowered for k in keywords)),
+                          self.default)
+            self._memo[condition] = result
+        return result
+
+    def lookup(self, codes) -> np.ndarray:
+        """조건 코드 배열 조회"""
+        return self.by_code[np.asarray(codes, dtype=np.int64)]
+
+
+class HourTable:
+    """시간대 규칙 - 0~23시 결과를 미리 계산한 24칸 표"""
+
+    def __init__(self, chain: Sequence[Sequence], default: int):
+        values = []
+        for hour in range(24):
+            result = default
+            for start, end, value in chain:
+                inside = start <= hour <= end if start <= end else (hour >= start or hour <= end)
+                if inside:
+                    result = value
+                    break
+            values.append(result)
+        self.values = np.array(values, dtype=np.int64)
+        self._values = values
+
+    def __call__(self, hour: int) -> int:
+        return self._values[hour]
+
+    def lookup(self, hours) -> np.ndarray:
+        return self.values[np.asarray(hours, dtype=np.int64)]
+
+
+def load_rule_overrides(path: str) -> dict:
+    """WEATHER_RULES_FILE(JSON)의 규칙 덮어쓰기 읽기"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compile_rules(overrides: dict = None) -> Dict[str, object]:
+    """모든 규칙 표 컴파일 - {규칙 이름: 표}"""
+    overrides = overrides or {}
+    tables = {}
+    for source, table_cls in ((THRESHOLD_RULES, ThresholdTable), (CONDITION_RULES, ConditionTable),
+                              (HOUR_RULES, HourTable)):
+        for name, rule in source.items():
+            rule = overrides.get(name, rule)
+            tables[name] = table_cls(rule['chain'], rule['default'])
+    return tables
+
+
+_rules_file = os.environ.get("WEATHER_RULES_FILE")
+RULE_OVERRIDES = load_rule_overrides(_rules_file) if _rules_file else {}
+RULES = compile_rules(RULE_OVERRIDES)
+CITY_NOTES = {city: tuple(rule) for city, rule in CITY_NOTE_RULES.items()}
+
+
+def rules_fingerprint() -> str:
+    """현재 규칙(덮어쓰기 포함)과 문구의 해시 - 미리 만든 추천 표가 최신인지 확인용"""
+    rules = {name: RULE_OVERRIDES.get(name, rule)
+             for source in (THRESHOLD_RULES, CONDITION_RULES, HOUR_RULES) for name, rule in source.items()}
+    texts = {name: value for name, value in globals().items() if name.endswith(('_TEXT', '_TEXTS'))}
+    payload = json.dumps([rules, CITY_NOTE_RULES, texts], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# ---- 단일 관측값 추천 ----
+
+def outfit_recommendation(temperature: float, feels_like: float, humidity: float,
+                          wind_speed: float, condition: str) -> List[str]:
+    """복장 추천 문구"""
+    # 체감온도 기준 기본 복장
+    effective_temp = feels_like if RULES['outfit_feels_gap'](abs(feels_like - temperature)) else temperature
+    recommendations = list(OUTFIT_TEMP_TEXTS[RULES['outfit_temp'](effective_temp)])
+    recommendations.extend(OUTFIT_CONDITION_TEXTS[RULES['outfit_condition'](condition)])
+    recommendations.extend(OUTFIT_HUMIDITY_TEXTS[RULES['outfit_humidity'](humidity)])
+    if RULES['outfit_wind'](wind_speed):
+        recommendations.append(OUTFIT_WIND_TEXT)
+    return recommendations
+
+
+def transport_risk_score(temperature: float, wind_speed: float, visibility: float, condition: str) -> int:
+    """기상 위험도"""
+    return (RULES['transport_condition_risk'](condition) + RULES['transport_wind_risk'](wind_speed)
+            + RULES['transport_visibility_risk'](visibility) + RULES['transport_temp_risk'](temperature))
+
+
+def transport_recommendation(temperature: float, humidity: float, wind_speed: float,
+                             visibility: float, condition: str) -> List[str]:
+    """교통수단 추천 문구"""
+    risk_score = transport_risk_score(temperature, wind_speed, visibility, condition)
+    recommendations = list(TRANSPORT_CATEGORY_TEXTS[RULES['transport_category'](risk_score)])
+
+    # 세부 조건별 추가 권장사항
+    if RULES['transport_rain'](condition):
+        recommendations.append(TRANSPORT_RAIN_TEXT)
+    if RULES['transport_gust'](wind_speed):
+        recommendations.append(TRANSPORT_GUST_TEXT)
+    if RULES['transport_low_visibility'](visibility):
+        recommendations.append(TRANSPORT_LOW_VISIBILITY_TEXT)
+    if RULES['transport_icy'](temperature):
+        recommendations.append(TRANSPORT_ICY_TEXT)
+    if RULES['transport_humid'](humidity):
+        recommendations.append(TRANSPORT_HUMID_TEXT)
+    return recommendations
+
+
+def departure_delay_minutes(wind_speed: float, visibility: float, condition: str,
+                            hour: int, is_weekend: bool) -> int:
+    """평소보다 일찍 출발해야 할 시간 (분)"""
+    delay = (RULES['departure_condition_delay'](condition) + RULES['departure_wind_delay'](wind_speed)
+             + RULES['departure_visibility_delay'](visibility))
+    if not is_weekend:
+        delay += RULES['departure_rush_delay'](hour)
+    return delay
+
+
+def departure_recommendation(wind_speed: float, visibility: float, condition: str,
+                             hour: int, weekday: int, city: str) -> List[str]:
+    """출발시간 추천 문구 - hour/weekday는 도시 현지 시각 기준 (0=월요일)"""
+    recommendations = []
+    is_weekend = weekday >= 5
+    delay = departure_delay_minutes(wind_speed, visibility, condition, hour, is_weekend)
+
+    if is_weekend:
+        recommendations.append(DEPARTURE_WEEKEND_TEXT)
+    else:
+        period = RULES['departure_period'](hour)
+        if period:
+            recommendations.append(DEPARTURE_PERIOD_TEXTS[period].format(hour=hour))
+
+    recommendations.extend(text.format(delay=delay)
+                           for text in DEPARTURE_CATEGORY_TEXTS[RULES['departure_category'](delay)])
+
+    # 도시별 특수 상황 고려
+    note = CITY_NOTES.get(city)
+    if note and delay > note[0]:
+        recommendations.append(CITY_NOTE_TEXTS[note[1]])
+    return recommendations
+
+
+def health_advice(temperature: float, feels_like: float, humidity: float, pressure: float,
+                  wind_speed: float, condition: str) -> List[str]:
+    """건강 조언 문구"""
+    advice = list(HEALTH_TEMP_TEXTS[RULES['health_temp'](temperature)])
+    advice.extend(HEALTH_HUMIDITY_TEXTS[RULES['health_humidity'](humidity)])
+    advice.extend(HEALTH_PRESSURE_TEXTS[RULES['health_pressure'](pressure)])
+    if RULES['health_wet'](condition):
+        advice.extend(HEALTH_WET_TEXTS)
+    if RULES['health_snow'](condition):
+        advice.extend(HEALTH_SNOW_TEXTS)
+    if RULES['health_wind'](wind_speed):
+        advice.extend(HEALTH_WIND_TEXTS)
+    advice.extend(HEALTH_BASIC_TEXTS)
+    # 체감온도와 실제온도 차이가 클 때 추가 조언
+    if RULES['health_feels_gap'](abs(feels_like - temperature)):
+        advice.append(HEALTH_FEELS_GAP_TEXT.format(feels_like=feels_like))
+    return advice
@@ -0,0 +1,806 @@
+# weather_service.py - 날씨 조회/추천 로직 (Streamlit 없이 사용 가능)
+#
+# streamlit_app.WeatherApp(화면)과 weather_api(JSON API)가 같은 WeatherService를 씁니다.
+# 캐시/이력/HTTP 클라이언트/프리페처는 생성자로 받아 프로세스 안에서 공유합니다.
+
+import asyncio
+import datetime
+import os
+import queue
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytz
+import requests
+
+import weather_rules
+from weather_async import AsyncUpstreamClient, get_async_client, get_async_engine
+from weather_breaker import MAX_RETRIES, CircuitBreaker, CircuitOpen, backoff_delay, is_transient
+from weather_cache import ObservationCache, SingleFlight, SQLiteBackend
+from weather_data import (API_SOURCE, DEMO_SOURCE, WeatherBatch, WeatherData, weather_from_dict,
+                          weather_to_dict)
+from weather_forecast import Forecast
+from weather_history import ObservationHistory
+from weather_http import UpstreamClient, get_upstream_client
+from weather_lut import TABLES as RECOMMENDATION_TABLES
+from weather_metrics import METRICS, Sample, timed
+from weather_prefetch import RefreshAheadPrefetcher
+from weather_quota import Priority, QuotaExceeded, QuotaScheduler, is_rate_limited, retry_after_seconds
+from weather_timeouts import AdaptiveTimeouts
+
+
+@dataclass
+class FetchResult:
+    """fetch_many 도시별 결과 - 실패 시 weather 대신 error"""
+    city: str
+    weather: Optional[WeatherData]
+    error: Optional[Exception] = None
+    from_cache: bool = False
+
+
+# 지원 도시 목록 (선택 박스 순서)
+CITIES = [
+    "Seoul", "Busan", "Incheon", "Daegu", "Daejeon", "Gwangju",
+    "Tokyo", "Osaka", "Beijing", "Shanghai", "Hong Kong", "Singapore",
+    "New York", "Los Angeles", "London", "Paris", "Sydney", "Dubai"
+]
+
+# OpenWeatherMap 도시 ID (group 엔드포인트로 최대 20개 도시를 한 번에 조회)
+OWM_CITY_IDS = {
+    'Seoul': 1835848,
+    'Busan': 1838524,
+    'Incheon': 1843564,
+    'Daegu': 1835329,
+    'Daejeon': 1835235,
+    'Gwangju': 1841811,
+    'Tokyo': 1850147,
+    'Osaka': 1853909,
+    'Beijing': 1816670,
+    'Shanghai': 1796236,
+    'Hong Kong': 1819729,
+    'Singapore': 1880252,
+    'New York': 5128581,
+    'Los Angeles': 5368361,
+    'London': 2643743,
+    'Paris': 2988507,
+    'Sydney': 2147714,
+    'Dubai': 292223,
+    'Bangkok': 1609350,
+    'Mumbai': 1275339
+}
+GROUP_MAX_IDS = 20
+
+# 주요 도시별 시간대 매핑
+CITY_TIMEZONES = {
+    'Seoul': 'Asia/Seoul',
+    'Busan': 'Asia/Seoul',
+    'Incheon': 'Asia/Seoul',
+    'Daegu': 'Asia/Seoul',
+    'Daejeon': 'Asia/Seoul',
+    'Gwangju': 'Asia/Seoul',
+    'Tokyo': 'Asia/Tokyo',
+    'Osaka': 'Asia/Tokyo',
+    'Beijing': 'Asia/Shanghai',
+    'Shanghai': 'Asia/Shanghai',
+    'New York': 'America/New_York',
+    'London': 'Europe/London',
+    'Paris': 'Europe/Paris',
+    'Sydney': 'Australia/Sydney',
+    'Los Angeles': 'America/Los_Angeles',
+    'Bangkok': 'Asia/Bangkok',
+    'Singapore': 'Asia/Singapore',
+    'Hong Kong': 'Asia/Hong_Kong',
+    'Mumbai': 'Asia/Kolkata',
+    'Dubai': 'Asia/Dubai'
+}
+
+# API 키가 없을 때 보여 줄 데모 데이터
+BACKUP_DATA = {
+    "temp": 22,
+    "feels_like": 24,
+    "humidity": 65,
+    "weather": "Clear",
+    "description": "맑음 (데모 데이터)",
+    "wind_speed": 3.2
+}
+
+
+# 캐시/프리페치 정책 (초) - 환경 변수로 바꿔 기록 재생(weather_trace.py)에서 비교
+CACHE_POLICY = {
+    "WEATHER_CACHE_TTL": 300,
+    "WEATHER_CACHE_STALE_TTL": 3600,
+    "WEATHER_PREFETCH_MARGIN": 30,
+    "WEATHER_PREFETCH_IDLE": 900,
+    "WEATHER_PREFETCH_INTERVAL": 5,
+}
+
+
+def cache_policy(name: str) -> float:
+    return float(os.environ.get(name, CACHE_POLICY[name]))
+
+
+def create_observation_cache() -> ObservationCache:
+    """관측값 캐시 (5분 TTL, 만료 후 1시간까지 stale 제공 - WEATHER_CACHE_TTL, WEATHER_CACHE_STALE_TTL)
+
+    WEATHER_CACHE_DB 경로의 SQLite 파일에도 저장해 재시작 후 바로 채워 넣습니다
+    (빈 문자열이면 메모리 캐시만 사용).
+    """
+    db_path = os.environ.get("WEATHER_CACHE_DB", ".cache/weather_cache.sqlite3")
+    backend = SQLiteBackend(db_path, weather_to_dict, weather_from_dict) if db_path else None
+    cache = ObservationCache(ttl=cache_policy("WEATHER_CACHE_TTL"), max_entries=256,
+                             stale_ttl=cache_policy("WEATHER_CACHE_STALE_TTL"), backend=backend)
+    cache.warm()
+    return cache
+
+
+def create_forecast_cache() -> ObservationCache:
+    """예보 캐시 (30분 TTL)"""
+    return ObservationCache(ttl=1800, max_entries=64)
+
+
+def create_history() -> Optional[ObservationHistory]:
+    """도시별 관측 이력 (도시당 최근 288건)
+
+    WEATHER_HISTORY_FILE 경로의 메모리 맵 파일에 저장하므로 다른 프로세스도 같은 이력을
+    읽을 수 있습니다 (빈 문자열이면 이력을 남기지 않음).
+    """
+    path = os.environ.get("WEATHER_HISTORY_FILE", ".cache/weather_history.bin")
+    if not path:
+        return None
+    try:
+        return ObservationHistory(path, capacity=288, max_cities=64)
+    except (OSError, ValueError):
+        return None
+
+
+def create_quota() -> QuotaScheduler:
+    """API 키별 호출 한도 (프로세스 단위)
+
+    OPENWEATHER_CALLS_PER_MINUTE(기본 60, 무료 요금제 한도)와 OPENWEATHER_CALLS_PER_DAY
+    (기본 0 = 제한 없음)로 설정합니다. 여러 프로세스가 같은 키를 쓰면 나눠서 설정하세요.
+    """
+    return QuotaScheduler(per_minute=int(os.environ.get("OPENWEATHER_CALLS_PER_MINUTE", 60)),
+                          per_day=int(os.environ.get("OPENWEATHER_CALLS_PER_DAY", 0)))
+
+
+def create_breaker() -> CircuitBreaker:
+    """업스트림 회로 차단기
+
+    OPENWEATHER_BREAKER_FAILURES(기본 5)번 연속 일시적 오류가 나면 OPENWEATHER_BREAKER_RESET
+    (기본 15)초 동안 요청을 보내지 않고, 이후 시험 요청이 실패할 때마다 두 배씩 (최대 5분) 늘립니다.
+    """
+    return CircuitBreaker(failure_threshold=int(os.environ.get("OPENWEATHER_BREAKER_FAILURES", 5)),
+                          reset_timeout=float(os.environ.get("OPENWEATHER_BREAKER_RESET", 15)))
+
+
+def create_timeouts() -> AdaptiveTimeouts:
+    """엔드포인트별 응답 시간 기반 타임아웃
+
+    최근 p99의 3배를 OPENWEATHER_TIMEOUT_FLOOR(기본 0.5초)와 OPENWEATHER_READ_TIMEOUT(기본 10초)
+    사이로 자릅니다. OPENWEATHER_HEDGE=1이면 사용자 조회가 p95보다 늦을 때 같은 요청을 하나 더
+    보냅니다 (호출 한도가 남아 있을 때만).
+    """
+    return AdaptiveTimeouts(ceiling=float(os.environ.get("OPENWEATHER_READ_TIMEOUT", 10)),
+                            floor=float(os.environ.get("OPENWEATHER_TIMEOUT_FLOOR", 0.5)),
+                            hedge=os.environ.get("OPENWEATHER_HEDGE", "0") == "1")
+
+
+def create_prefetcher(refresh, cache: ObservationCache) -> RefreshAheadPrefetcher:
+    """refresh-ahead 프리페처 (만료 30초 전 갱신, 15분 동안 조회 없는 도시는 중단 - WEATHER_PREFETCH_*)"""
+    return RefreshAheadPrefetcher(refresh, cache, max_cities=20, max_concurrent=4,
+                                  refresh_margin=cache_policy("WEATHER_PREFETCH_MARGIN"),
+                                  idle_timeout=cache_policy("WEATHER_PREFETCH_IDLE"),
+                                  interval=cache_policy("WEATHER_PREFETCH_INTERVAL"))
+
+
+def _outranks(priority: Priority, error: QuotaExceeded) -> bool:
+    """priority 요청이 한도 초과로 실패한 조회보다 우선순위가 높은지 (합류한 조회의 실패를 물려받지 않을 때)"""
+    return error.priority is not None and priority < error.priority
+
+
+class WeatherService:
+    """날씨 조회 + 추천 (화면 없는 부분)"""
+
+    def __init__(self, api_key: str = "", cache: ObservationCache = None,
+                 forecast_cache: ObservationCache = None, history: Optional[ObservationHistory] = None,
+                 http: UpstreamClient = None, prefetcher: RefreshAheadPrefetcher = None,
+                 async_http: AsyncUpstreamClient = None, inflight: SingleFlight = None,
+                 quota: QuotaScheduler = None, breaker: CircuitBreaker = None,
+                 timeouts: AdaptiveTimeouts = None):
+        """공유 자원을 넘기지 않으면 새로 만듦 (Streamlit 앱은 st.cache_resource로 공유한 것을 넘김)
+
+        async_http를 넘기지 않으면 공유 이벤트 루프(get_async_engine)의 클라이언트를 씁니다.
+        자기 이벤트 루프에서 *_async 메서드를 직접 쓰는 배치 작업은 그 루프용 클라이언트를 넘기세요.
+        inflight는 진행 중인 업스트림 조회 목록으로, 캐시를 공유하는 인스턴스끼리 같이 써야 합니다.
+        quota(호출 한도)도 같은 API 키를 쓰는 인스턴스끼리 공유해야 한도가 맞습니다.
+        breaker(회로 차단기)와 timeouts(응답 시간 기반 타임아웃)는 같은 업스트림을 쓰는 인스턴스끼리
+        공유하세요.
+        """
+        self.api_key = api_key
+        self.cache = cache if cache is not None else create_observation_cache()
+        self.forecast_cache = forecast_cache if forecast_cache is not None else create_forecast_cache()
+        self.history = history
+        self.http = http or get_upstream_client()
+        self.async_http = async_http or get_async_client()
+        self.inflight = inflight or SingleFlight()
+        self.quota = quota or create_quota()
+        self.breaker = breaker or create_breaker()
+        self.timeouts = timeouts or create_timeouts()
+        self.prefetcher = prefetcher or create_prefetcher(self._refresh_entry, self.cache)
+        self.backup_data = BACKUP_DATA
+        self.city_timezones = CITY_TIMEZONES
+
+    def get_weather_icon(self, condition: str) -> str:
+        """날씨 조건에 따른 이모지 아이콘 반환"""
+        icons = {
+            'clear': '☀️',
+            'clouds': '☁️',
+            'rain': '🌧️',
+            'drizzle': '🌦️',
+            'thunderstorm': '⛈️',
+            'snow': '❄️',
+            'mist': '🌫️',
+            'fog': '🌫️',
+            'haze': '🌫️'
+        }
+        condition_lower = condition.lower()
+        for key, icon in icons.items():
+            if key in condition_lower:
+                return icon
+        return '🌤️'
+
+    @timed("get_city_local_time")
+    def get_city_local_time(self, city: str, timezone_offset: int = None) -> tuple:
+        """도시의 현지 시간 반환"""
+        try:
+            # 시간대 매핑에서 찾기
+            timezone_name = self.city_timezones.get(city)
+            
+            if timezone_name:
+                # pytz를 사용한 정확한 시간대
+                tz = pytz.timezone(timezone_name)
+                local_time = datetime.datetime.now(tz)
+            elif timezone_offset:
+                # API에서 받은 오프셋 사용
+                offset_hours = timezone_offset / 3600
+                tz = pytz.FixedOffset(int(offset_hours * 60))
+                local_time = datetime.datetime.now(tz)
+            else:
+                # 기본값: UTC
+                local_time = datetime.datetime.utcnow()
+                timezone_name = "UTC"
+            
+            return local_time, timezone_name
+            
+        except Exception as e:
+            # 오류 시 서울 시간 반환
+            seoul_tz = pytz.timezone('Asia/Seoul')
+            return datetime.datetime.now(seoul_tz), 'Asia/Seoul'
+
+    @timed("fetch_weather_data")
+    def fetch_weather_data(self, city: str, api_key: str = None, allow_stale: bool = False,
+                           fallback: bool = True) -> Optional[WeatherData]:
+        """날씨 데이터 가져오기 (공유 캐시 우선)
+
+        allow_stale=True이면 만료된 캐시 항목을 바로 반환하고 백그라운드에서 다시 가져옵니다.
+        호출 한도가 다 찼거나(업스트림 429 포함) 업스트림이 응답하지 않으면 allow_stale과 관계없이 마지막으로 가져온
+        (만료된) 캐시 항목을 반환합니다. 회로가 열려 있으면 업스트림을 기다리지 않고 바로 반환하며
+        다시 시도는 백그라운드 갱신이 맡습니다.
+        fallback=False이면 실패 시 데모 데이터 대신 예외를 그대로 올립니다.
+        """
+        # API 키 우선순위: 매개변수 > 인스턴스 변수
+        current_api_key = api_key or self.api_key
+        
+        if not current_api_key:
+            return self._get_backup_weather_data(city)
+        
+        # 조회 기록 - 자주 보는 도시는 만료 전에 백그라운드에서 미리 갱신
+        self.prefetcher.touch(city, current_api_key)
+        cached = self.cache.get(city, current_api_key)
+        if cached is not None:
+            return cached
+        
+        if allow_stale:
+            stale = self.cache.get_stale(city, current_api_key)
+            if stale is not None:
+                self.prefetcher.revalidate(city, current_api_key)
+                return stale.value
+            
+        try:
+            # 같은 도시를 동시에 조회하는 세션들은 업스트림 요청 하나를 공유
+            return self._fetch_coalesced(city, current_api_key)
+            
+        except Exception as e:
+            if isinstance(e, CircuitOpen):
+                # 회로가 열린 동안의 시험 요청은 백그라운드에서 (사용자는 기다리지 않음)
+                self.prefetcher.revalidate(city, current_api_key)
+            if isinstance(e, (QuotaExceeded, CircuitOpen)) or is_rate_limited(e) or is_transient(e):
+                stale = self.cache.get_stale(city, current_api_key)
+                if stale is not None:
+                    return stale.value
+            if not fallback:
+                raise
+            self._on_fetch_error(city, e)
+            return self._get_backup_weather_data(city)
+
+    def _on_fetch_error(self, city: str, error: Exception):
+        """업스트림 조회 실패 알림 (데모 데이터로 대체하기 직전) - UI에서 재정의"""
+        pass
+
+    def fetch_many(self, cities: Iterable[str], api_key: str = None,
+                   max_workers: int = 8, batch: bool = True, timeout: float = None,
+                   priority: Priority = Priority.BATCH) -> Iterator[FetchResult]:
+        """여러 도시 동시 조회 - 완료되는 순서대로 결과 반환
+
+        캐시에 있는 도시는 바로 반환하고, 나머지는 공유 이벤트 루프(weather_async)에서 최대
+        max_workers개씩 동시에 가져옵니다 (요청마다 스레드를 만들지 않음).
+        batch=True이면 도시 ID가 있는 도시는 group 엔드포인트로 20개씩 묶어 요청합니다.
+        실패한 도시는 error가 채워진 결과로 반환되며 다른 도시에는 영향을 주지 않습니다.
+        업스트림 요청은 priority(기본: 배치) 우선순위로 호출 한도를 받습니다.
+        """
+        current_api_key = api_key or self.api_key
+        if not current_api_key:
+            # API 키가 있을 때(fetch_many_async)와 같이 같은 도시는 한 번만
+            for city in dict.fromkeys(cities):
+                yield FetchResult(city, self._get_backup_weather_data(city))
+            return
+
+        results: "queue.Queue[Optional[FetchResult]]" = queue.Queue()
+
+        async def pump():
+            try:
+                async for result in self.fetch_many_async(cities, current_api_key, max_concurrency=max_workers,
+                                                          batch=batch, timeout=timeout, priority=priority):
+                    results.put(result)
+            finally:
+                results.put(None)
+
+        future = get_async_engine().submit(pump())
+        while (result := results.get()) is not None:
+            yield result
+        future.result()
+
+    async def fetch_many_async(self, cities: Iterable[str], api_key: str = None, max_concurrency: int = 8,
+                               batch: bool = True, timeout: float = None,
+                               priority: Priority = Priority.BATCH) -> AsyncIterator[FetchResult]:
+        """fetch_many의 asyncio 버전 - 현재 이벤트 루프에서 완료 순서대로 결과 반환
+
+        timeout은 업스트림 요청 하나의 마감 시간(초)입니다.
+        """
+        current_api_key = api_key or self.api_key
+        misses = []
+        for city in dict.fromkeys(cities):
+            cached = self.cache.get(city, current_api_key)
+            if cached is not None:
+                yield FetchResult(city, cached, from_cache=True)
+            else:
+                misses.append(city)
+        if not misses:
+            return
+
+        # 작업 단위: group 요청 1건(도시 여러 개) 또는 단일 도시 요청 1건
+        if batch:
+            grouped = [city for city in misses if city in OWM_CITY_IDS]
+            singles = [city for city in misses if city not in OWM_CITY_IDS]
+            chunks = [grouped[i:i + GROUP_MAX_IDS] for i in range(0, len(grouped), GROUP_MAX_IDS)]
+        else:
+            singles, chunks = misses, []
+        slots = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_one(city: str) -> List[FetchResult]:
+            async with slots:
+                weather = await self._fetch_coalesced_async(city, current_api_key, timeout, priority)
+            return [FetchResult(city, weather)]
+
+        async def fetch_chunk(chunk: List[str]) -> List[FetchResult]:
+            async with slots:
+                found = await self._request_group_async(chunk, current_api_key, timeout, priority)
+            return self._group_results(chunk, current_api_key, found)
+
+        async def guarded(job, cities: List[str]) -> List[FetchResult]:
+            try:
+                return await job
+            except Exception as e:
+                return [FetchResult(city, None, error=e) for city in cities]
+
+        jobs = [guarded(fetch_one(city), [city]) for city in singles]
+        jobs += [guarded(fetch_chunk(chunk), chunk) for chunk in chunks]
+        for finished in asyncio.as_completed(jobs):
+            for result in await finished:
+                yield result
+
+    async def fetch_weather_data_async(self, city: str, api_key: str = None,
+                                       timeout: float = None) -> WeatherData:
+        """현재 이벤트 루프에서 한 도시 조회 (캐시 우선) - 실패 시 예외 발생"""
+        current_api_key = api_key or self.api_key
+        if not current_api_key:
+            return self._get_backup_weather_data(city)
+        cached = self.cache.get(city, current_api_key)
+        if cached is not None:
+            return cached
+        return await self._fetch_coalesced_async(city, current_api_key, timeout)
+
+    def fetch_batch(self, cities: Iterable[str], api_key: str = None) -> WeatherBatch:
+        """여러 도시를 fetch_many로 가져와 WeatherBatch 하나로 묶기 (실패한 도시는 제외, 입력 순서 유지)"""
+        cities = list(dict.fromkeys(cities))
+        found = {result.city: result.weather for result in self.fetch_many(cities, api_key)
+                 if result.weather is not None}
+        return WeatherBatch.from_observations((city, found[city]) for city in cities if city in found)
+
+    @timed("fetch_forecast")
+    def fetch_forecast(self, city: str, api_key: str = None) -> Optional[Forecast]:
+        """5일/3시간 예보 가져오기 (예보 캐시 우선, 실패 시 None)"""
+        current_api_key = api_key or self.api_key
+        if not current_api_key:
+            return None
+        
+        cached = self.forecast_cache.get(city, current_api_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            forecast = self._request_forecast(city, current_api_key)
+            self.forecast_cache.put(city, current_api_key, forecast)
+            return forecast
+        except Exception:
+            return None
+
+    def _request_forecast(self, city: str, api_key: str) -> Forecast:
+        """OpenWeatherMap 5일/3시간 예보 조회 - 실패 시 예외 발생"""
+        # 예보는 현재 날씨보다 덜 급하므로 refresh-ahead와 같은 우선순위 (한도가 모자라면 생략)
+        response = self._get("/forecast", self._weather_params(city, api_key), api_key, [city], Priority.REFRESH)
+        return Forecast.from_payload(city, response.json())
+
+    def _refresh_entry(self, city: str, api_key: str):
+        """프리페처용 갱신 - 업스트림에서 다시 가져와 캐시에 저장 (진행 중인 같은 조회가 있으면 공유)"""
+        self.inflight.do((city, api_key), lambda: self._fetch_and_store(city, api_key, Priority.REFRESH))
+
+    def _fetch_and_store(self, city: str, api_key: str,
+                         priority: Priority = Priority.INTERACTIVE) -> WeatherData:
+        """업스트림 조회 후 캐시/이력에 저장 (실제 API 응답만 저장, 데모 데이터는 저장하지 않음)"""
+        weather = self._request_weather(city, api_key, priority)
+        self._store(city, api_key, weather)
+        return weather
+
+    def _fetch_coalesced(self, city: str, api_key: str) -> WeatherData:
+        """single-flight 조회 - (도시, 키)마다 동시에 하나만 업스트림에 요청하고 나머지는 결과 공유
+
+        합류한 조회가 더 낮은 우선순위(refresh-ahead, 일괄 조회)라 그 몫의 한도가 다 차서 실패했으면
+        사용자 조회 우선순위로 한 번 더 시도합니다.
+        """
+        def fetch() -> WeatherData:
+            # 리더가 되기 직전에 앞선 조회가 끝나 캐시를 채웠으면 그대로 사용
+            entry = self.cache.peek(city, api_key)
+            if entry is not None and entry.age() < self.cache.ttl:
+                return entry.value
+            return self._fetch_and_store(city, api_key)
+
+        try:
+            return self.inflight.do((city, api_key), fetch)[0]
+        except QuotaExceeded as e:
+            if not _outranks(Priority.INTERACTIVE, e):
+                raise
+            return self.inflight.do((city, api_key), fetch)[0]
+
+    async def _fetch_coalesced_async(self, city: str, api_key: str, timeout: float = None,
+                                     priority: Priority = Priority.INTERACTIVE) -> WeatherData:
+        """_fetch_coalesced의 asyncio 버전 - 동기 호출과 같은 진행 중 목록 공유 (재시도 규칙도 같음)"""
+        async def fetch() -> WeatherData:
+            entry = self.cache.peek(city, api_key)
+            if entry is not None and entry.age() < self.cache.ttl:
+                return entry.value
+            weather = await self._request_weather_async(city, api_key, timeout, priority)
+            self._store(city, api_key, weather)
+            return weather
+
+        try:
+            return (await self.inflight.do_async((city, api_key), fetch))[0]
+        except QuotaExceeded as e:
+            if not _outranks(priority, e):
+                raise
+            return (await self.inflight.do_async((city, api_key), fetch))[0]
+
+    def _store(self, city: str, api_key: str, weather: WeatherData):
+        """업스트림에서 새로 가져온 관측값을 캐시에 넣고 이력에 추가"""
+        self.cache.put(city, api_key, weather)
+        if self.history is not None:
+            try:
+                self.history.append(city, weather)
+            except (OSError, ValueError):
+                pass
+
+    def _weather_params(self, city: str, api_key: str) -> dict:
+        return {
+            'q': city,
+            'appid': api_key,
+            'units': 'metric',
+            'lang': 'kr'
+        }
+
+    def _group_params(self, cities: List[str], api_key: str) -> Tuple[Dict[int, str], dict]:
+        ids = {OWM_CITY_IDS[city]: city for city in cities}
+        params = {
+            'id': ','.join(str(city_id) for city_id in ids),
+            'appid': api_key,
+            'units': 'metric',
+            'lang': 'kr'
+        }
+        return ids, params
+
+    def _parse_group(self, ids: Dict[int, str], data: dict) -> Dict[str, WeatherData]:
+        results = {}
+        for item in data.get('list', []):
+            city = ids.get(item.get('id'))
+            if city:
+                results[city] = self._parse_weather(item)
+        return results
+
+    def _group_results(self, chunk: List[str], api_key: str, found: Dict[str, WeatherData]) -> List[FetchResult]:
+        """group 응답을 도시별 결과로 - 응답에 빠진 도시는 오류 결과"""
+        results = []
+        for city in chunk:
+            if city in found:
+                self._store(city, api_key, found[city])
+                results.append(FetchResult(city, found[city]))
+            else:
+                results.append(FetchResult(city, None, error=KeyError(f"group 응답에 {city} 없음")))
+        return results
+
+    def _admit(self, api_key: str, cities: List[str], priority: Priority):
+        """업스트림 요청 전 호출 한도 받기 - 우선순위별 최대 대기 후에도 없으면 QuotaExceeded"""
+        if not self.quota.acquire(api_key, priority, cities):
+            raise QuotaExceeded(f"호출 한도 초과 ({priority.name.lower()}): {', '.join(cities)}", priority)
+
+    async def _admit_async(self, api_key: str, cities: List[str], priority: Priority):
+        """_admit의 asyncio 버전"""
+        if not await self.quota.acquire_async(api_key, priority, cities):
+            raise QuotaExceeded(f"호출 한도 초과 ({priority.name.lower()}): {', '.join(cities)}", priority)
+
+    def _check_response(self, response, api_key: str, cities: List[str], priority: Priority):
+        """응답 상태 확인 - 429이면 Retry-After 동안 이 키의 요청을 멈춘 뒤 예외 발생"""
+        if response.status_code == 429:
+            self.quota.throttled(api_key, retry_after_seconds(response.headers), cities, priority)
+        response.raise_for_status()
+
+    def _get(self, path: str, params: dict, api_key: str, cities: List[str], priority: Priority):
+        """업스트림 GET (응답 상태 확인까지) - 회로 차단기, 호출 한도, 일시적 오류 재시도
+
+        일시적 오류는 우선순위별 MAX_RETRIES번까지 지수 백오프 후 다시 보내며, 재시도도 호출
+        한도를 받습니다. 회로가 열리면 재시도를 멈추고 마지막 오류를 올립니다.
+        사용자 조회(INTERACTIVE)는 회로의 시험 요청이 되지 않습니다.
+        타임아웃은 엔드포인트별 최근 응답 시간으로 정하고, 사용자 조회는 hedged 요청을 쓸 수 있습니다.
+        """
+        def send(timeout: float):
+            return self.http.get(path, params=params, timeout=(self.http.connect_timeout, timeout))
+
+        def may_hedge() -> bool:
+            # 두 번째 요청은 호출 한도에 refresh-ahead 몫 이상이 남아 있을 때만 (기다리지 않음)
+            return self.quota.acquire(api_key, Priority.REFRESH, cities, max_wait=0)
+
+        for attempt in range(MAX_RETRIES[priority] + 1):
+            self.breaker.before_call(probe=priority != Priority.INTERACTIVE)
+            try:
+                self._admit(api_key, cities, priority)
+                response = self.timeouts.call(path, send, may_hedge if priority == Priority.INTERACTIVE else None)
+                self._check_response(response, api_key, cities, priority)
+            except BaseException as e:
+                self._count_upstream(path, e)
+                if not self._record_failure(e) or attempt == MAX_RETRIES[priority] or not self.breaker.closed:
+                    raise
+            else:
+                self._count_upstream(path)
+                self.breaker.record_success()
+                return response
+            time.sleep(backoff_delay(attempt))
+
+    async def _get_async(self, path: str, params: dict, api_key: str, cities: List[str], priority: Priority,
+                         timeout: float = None):
+        """_get의 asyncio 버전 (timeout: 요청 하나의 마감 시간, 초 - 없으면 최근 응답 시간으로 정함)"""
+        def send(request_timeout: float):
+            return self.async_http.get(path, params=params, timeout=request_timeout)
+
+        async def may_hedge() -> bool:
+            return await self.quota.acquire_async(api_key, Priority.REFRESH, cities, max_wait=0)
+
+        for attempt in range(MAX_RETRIES[priority] + 1):
+            self.breaker.before_call(probe=priority != Priority.INTERACTIVE)
+            try:
+                await self._admit_async(api_key, cities, priority)
+                response = await self.timeouts.call_async(
+                    path, send, may_hedge if priority == Priority.INTERACTIVE else None, timeout)
+                self._check_response(response, api_key, cities, priority)
+            except BaseException as e:
+                self._count_upstream(path, e)
+                if not self._record_failure(e) or attempt == MAX_RETRIES[priority] or not self.breaker.closed:
+                    raise
+            else:
+                self._count_upstream(path)
+                self.breaker.record_success()
+                return response
+            await asyncio.sleep(backoff_delay(attempt))
+
+    def _count_upstream(self, path: str, error: BaseException = None):
+        """업스트림 요청 수 (엔드포인트, 결과별) - 한도 초과/회로 열림으로 보내지 않은 요청은 제외"""
+        if not METRICS.enabled or isinstance(error, (QuotaExceeded, CircuitOpen)):
+            return
+        if error is None:
+            outcome = "ok"
+        elif isinstance(error, requests.HTTPError) and error.response is not None:
+            outcome = f"{error.response.status_code // 100}xx"
+        elif isinstance(error, (requests.Timeout, TimeoutError)):
+            outcome = "timeout"
+        else:
+            outcome = "error"
+        METRICS.count("upstream_requests", endpoint=path, outcome=outcome)
+
+    def _record_failure(self, error: BaseException) -> bool:
+        """실패한 업스트림 요청을 회로 차단기에 반영 - 재시도할 일시적 오류면 True"""
+        if is_transient(error):
+            self.breaker.record_failure()
+            return True
+        if isinstance(error, requests.HTTPError):
+            self.breaker.record_success()  # 4xx - 업스트림은 응답함
+        else:
+            self.breaker.cancel()  # 호출 한도 초과, 취소 등 - 요청을 보내지 않았거나 결과를 모름
+        return False
+
+    def _request_weather(self, city: str, api_key: str,
+                         priority: Priority = Priority.INTERACTIVE) -> WeatherData:
+        """OpenWeatherMap 현재 날씨 조회 - 실패 시 예외 발생"""
+        response = self._get("/weather", self._weather_params(city, api_key), api_key, [city], priority)
+        return self._parse_weather(response.json())
+
+    def _request_group(self, cities: List[str], api_key: str,
+                       priority: Priority = Priority.BATCH) -> Dict[str, WeatherData]:
+        """group 엔드포인트로 최대 20개 도시 한 번에 조회 - {도시: 날씨} 반환 (호출 1번)"""
+        ids, params = self._group_params(cities, api_key)
+        response = self._get("/group", params, api_key, cities, priority)
+        return self._parse_group(ids, response.json())
+
+    async def _request_weather_async(self, city: str, api_key: str, timeout: float = None,
+                                     priority: Priority = Priority.INTERACTIVE) -> WeatherData:
+        """_request_weather의 asyncio 버전 (timeout: 요청 마감 시간, 초)"""
+        response = await self._get_async("/weather", self._weather_params(city, api_key), api_key, [city],
+                                         priority, timeout)
+        return self._parse_weather(response.json())
+
+    async def _request_group_async(self, cities: List[str], api_key: str, timeout: float = None,
+                                   priority: Priority = Priority.BATCH) -> Dict[str, WeatherData]:
+        """_request_group의 asyncio 버전"""
+        ids, params = self._group_params(cities, api_key)
+        response = await self._get_async("/group", params, api_key, cities, priority, timeout)
+        return self._parse_group(ids, response.json())
+
+    def _parse_weather(self, data: dict) -> WeatherData:
+        """현재 날씨 응답(단일 또는 group 항목)을 WeatherData로 변환"""
+        # group 응답은 시간대 오프셋이 sys 안에 있음
+        timezone_offset = data.get('timezone', data['sys'].get('timezone', 0))
+        
+        return WeatherData(
+            temperature=data['main']['temp'],
+            feels_like=data['main']['feels_like'],
+            humidity=data['main']['humidity'],
+            pressure=data['main']['pressure'],
+            weather_condition=data['weather'][0]['main'],
+            weather_description=data['weather'][0]['description'],
+            wind_speed=data['wind']['speed'],
+            visibility=data.get('visibility', 10000) / 1000,
+            sunrise_at=data['sys']['sunrise'],  # UTC epoch 초 (표시할 때 현지 시간으로 변환)
+            sunset_at=data['sys']['sunset'],
+            timezone_offset=timezone_offset,  # UTC 기준 오프셋 (초)
+            observed_at=int(time.time()),
+            source=API_SOURCE
+        )
+
+    def metric_samples(self) -> List[Sample]:
+        """캐시/single-flight/회로 차단기/타임아웃/프리페처/호출 한도가 원래 세고 있는 값"""
+        samples: List[Sample] = []
+        for name, cache in (("observation", self.cache), ("forecast", self.forecast_cache)):
+            labels = {'cache': name}
+            samples += [("cache_hits", 'counter', labels, cache.hits),
+                        ("cache_misses", 'counter', labels, cache.misses),
+                        ("cache_stale_hits", 'counter', labels, cache.stale_hits),
+                        ("cache_evictions", 'counter', labels, cache.evictions),
+                        ("cache_entries", 'gauge', labels, len(cache))]
+        samples += [("singleflight_leaders", 'counter', {}, self.inflight.leaders),
+                    ("singleflight_coalesced", 'counter', {}, self.inflight.coalesced),
+                    ("breaker_open", 'gauge', {}, 0 if self.breaker.closed else 1),
+                    ("breaker_opened", 'counter', {}, self.breaker.opened),
+                    ("breaker_rejected", 'counter', {}, self.breaker.rejected),
+                    ("upstream_timeouts", 'counter', {}, self.timeouts.timeouts),
+                    ("upstream_hedges", 'counter', {}, self.timeouts.hedges),
+                    ("prefetch_refreshes", 'counter', {}, self.prefetcher.refreshes),
+                    ("prefetch_failures", 'counter', {}, self.prefetcher.failures),
+                    ("upstream_calls_last_minute", 'gauge', {}, self.quota.ledger.calls(minutes=1))]
+        for endpoint, stats in self.timeouts.snapshot().items():
+            samples.append(("upstream_timeout_seconds", 'gauge', {'endpoint': endpoint},
+                            self.timeouts.timeout(endpoint)))
+            for q in ("0.5", "0.95", "0.99"):
+                value = stats[f"p{int(float(q) * 100)}"]
+                if value is not None:
+                    samples.append(("upstream_latency_seconds", 'gauge',
+                                    {'endpoint': endpoint, 'quantile': q}, value))
+        return samples
+
+    def metrics_text(self) -> str:
+        """Prometheus 텍스트 형식 지표 (단계별 시간은 WEATHER_METRICS=1일 때만)"""
+        return METRICS.prometheus(self.metric_samples())
+
+    def is_revalidating(self, city: str, api_key: str = None) -> bool:
+        """stale 데이터를 보여준 뒤 백그라운드 갱신이 진행 중인지 여부"""
+        return self.prefetcher.is_refreshing(city, api_key or self.api_key)
+
+    def has_fresh_data(self, city: str, api_key: str = None) -> bool:
+        """TTL 안의 캐시 항목이 있는지 여부"""
+        entry = self.cache.peek(city, api_key or self.api_key)
+        return entry is not None and entry.age() < self.cache.ttl
+
+    def cache_state(self, city: str, api_key: str = None) -> str:
+        """조회 전 캐시 상태 - 'hit'(TTL 안), 'stale'(만료됐지만 stale_ttl 안), 'miss'"""
+        entry = self.cache.peek(city, api_key or self.api_key)
+        if entry is None:
+            return "miss"
+        age = entry.age()
+        if age < self.cache.ttl:
+            return "hit"
+        return "stale" if age < self.cache.ttl + self.cache.stale_ttl else "miss"
+
+    def refresh_city(self, city: str, api_key: str = None):
+        """선택한 도시의 캐시만 무효화 - 다음 조회 시 해당 도시만 다시 가져옴"""
+        self.cache.invalidate(city, api_key or self.api_key)
+
+    def _get_backup_weather_data(self, city: str) -> WeatherData:
+        """백업 날씨 데이터 반환"""
+        # 현지 시간 기준으로 일출/일몰 설정
+        local_time, _ = self.get_city_local_time(city)
+        
+        # 계절에 맞는 일출/일몰 시간 (7월 기준)
+        sunrise_time = local_time.replace(hour=6, minute=0, second=0, microsecond=0)
+        sunset_time = local_time.replace(hour=19, minute=30, second=0, microsecond=0)
+        
+        return WeatherData(
+            temperature=self.backup_data['temp'],
+            feels_like=self.backup_data['feels_like'],
+            humidity=self.backup_data['humidity'],
+            pressure=1013,
+            weather_condition=self.backup_data['weather'],
+            weather_description=self.backup_data['description'],
+            wind_speed=self.backup_data['wind_speed'],
+            visibility=10.0,
+            sunrise_at=int(sunrise_time.timestamp()),
+            sunset_at=int(sunset_time.timestamp()),
+            timezone_offset=int((local_time.utcoffset() or datetime.timedelta()).total_seconds()),
+            observed_at=int(local_time.timestamp()),
+            source=DEMO_SOURCE
+        )
+
+    @timed("get_outfit_recommendation")
+    def get_outfit_recommendation(self, weather: WeatherData) -> List[str]:
+        """개선된 옷차림 추천 - 실제 기상 데이터 기반 (미리 계산한 조회 표: weather_lut)"""
+        return RECOMMENDATION_TABLES.outfit(
+            weather.temperature, weather.feels_like, weather.humidity,
+            weather.wind_speed, weather.weather_condition)
+
+    @timed("get_transport_recommendation")
+    def get_transport_recommendation(self, weather: WeatherData) -> List[str]:
+        """개선된 교통수단 추천 - 종합적 기상 조건 분석 (미리 계산한 조회 표: weather_lut)"""
+        return RECOMMENDATION_TABLES.transport(
+            weather.temperature, weather.humidity, weather.wind_speed,
+            weather.visibility, weather.weather_condition)
+
+    @timed("get_departure_time_recommendation")
+    def get_departure_time_recommendation(self, weather: WeatherData, city: str) -> List[str]:
+        """개선된 출발시간 추천 - 현지 교통패턴 & 기상조건 분석 (규칙: weather_rules)"""
+        # 현지 시간 기준으로 출퇴근 시간 판단
+        local_time, _ = self.get_city_local_time(city, weather.timezone_offset)
+        return weather_rules.departure_recommendation(
+            weather.wind_speed, weather.visibility, weather.weather_condition,
+            local_time.hour, local_time.weekday(), city)
+
+    @timed("get_health_advice")
+    def get_health_advice(self, weather: WeatherData) -> List[str]:
+        """개선된 건강 조언 - 기상의학 기반 종합 분석 (미리 계산한 조회 표: weather_lut)"""
+        return RECOMMENDATION_TABLES.health(
+            weather.temperature, weather.feels_like, weather.humidity,
+            weather.pressure, weather.wind_speed, weather.weather_condition)
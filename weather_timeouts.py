@@ -0,0 +1,217 @@
+# weather_timeouts.py - 관측한 응답 시간으로 정하는 엔드포인트별 타임아웃 (+ 선택적 hedged 요청)
+#
+# 고정 타임아웃 10초는 화면 재실행에는 너무 길고, 연결을 새로 맺는 첫 요청에는 짧을 때가
+# 있습니다. 엔드포인트('/weather', '/group', '/forecast')마다 최근 응답 시간을 모아
+# p99 × multiplier로 타임아웃을 정하고 [floor, ceiling] 안으로 자릅니다. 표본이 모자라면
+# ceiling을 씁니다. 타임아웃으로 끝난 요청은 타임아웃 값을 표본으로 넣고, 응답을 min_samples개
+# 더 볼 때까지 타임아웃 × backoff를 타임아웃의 하한으로 씁니다 - 표본 하나로는 p99가 거의
+# 움직이지 않으므로, 너무 짧게 잡히면 다음 타임아웃이 바로 늘어나게 하려는 것입니다.
+#
+# hedge=True이면 p95가 지나도 응답이 없을 때 같은 요청을 하나 더 보내 먼저 온 응답을
+# 씁니다 (두 번째 요청을 보낼지는 may_hedge가 정함 - 호출 한도 확인용).
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import requests
+
+T = TypeVar("T")
+
+MIN_HEDGE_DELAY = 0.05  # 초 - 이보다 빨리 두 번째 요청을 보내지 않음
+
+
+class LatencyWindow:
+    """최근 size개 응답 시간 (초) - 백분위는 표본이 바뀐 뒤 처음 물을 때 다시 계산"""
+
+    def __init__(self, size: int = 256):
+        self._samples = deque(maxlen=size)
+        self._sorted = None
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q 백분위 (0~1, 표본이 없으면 None)"""
+        if not self._samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class AdaptiveTimeouts:
+    """엔드포인트별 응답 시간 기반 타임아웃 (모든 세션이 공유)
+
+    ceiling: 타임아웃 상한 (설정한 읽기 타임아웃), floor: 하한
+    multiplier: p99에 곱하는 배수, min_samples: 이보다 표본이 적으면 ceiling 사용
+    backoff: 타임아웃으로 끝난 뒤 다음 타임아웃을 적어도 몇 배로 늘릴지
+    hedge: p95가 지나면 두 번째 요청 보내기
+    """
+
+    def __init__(self, ceiling: float = 10.0, floor: float = 0.5, multiplier: float = 3.0,
+                 min_samples: int = 20, window: int = 256, hedge: bool = False, backoff: float = 2.0):
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.window = window
+        self.hedge = hedge
+        self.backoff = backoff
+        self._windows: Dict[str, LatencyWindow] = {}
+        self._backoffs: Dict[str, List] = {}  # 엔드포인트별 [타임아웃 하한, 남은 응답 수]
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.timeouts = 0  # 타임아웃으로 끝난 요청 수
+        self.hedges = 0    # 보낸 두 번째 요청 수
+        self.hedge_wins = 0  # 두 번째 요청이 먼저 끝난 횟수
+
+    def _window(self, endpoint: str) -> LatencyWindow:
+        window = self._windows.get(endpoint)
+        if window is None:
+            window = self._windows[endpoint] = LatencyWindow(self.window)
+        return window
+
+    def observe(self, endpoint: str, seconds: float):
+        """응답 시간 기록"""
+        with self._lock:
+            self._window(endpoint).add(seconds)
+            backoff = self._backoffs.get(endpoint)
+            if backoff is not None:
+                backoff[1] -= 1
+                if backoff[1] <= 0:
+                    del self._backoffs[endpoint]
+
+    def _timed_out(self, endpoint: str, timeout: float):
+        """타임아웃으로 끝난 요청 기록 - 다음 타임아웃은 응답을 min_samples개 볼 때까지 적어도 timeout × backoff"""
+        with self._lock:
+            self.timeouts += 1
+            self._window(endpoint).add(timeout)
+            self._backoffs[endpoint] = [min(self.ceiling, timeout * self.backoff), self.min_samples]
+
+    def timeout(self, endpoint: str) -> float:
+        """요청 하나의 타임아웃 (초)"""
+        with self._lock:
+            window = self._window(endpoint)
+            if len(window) < self.min_samples:
+                return self.ceiling
+            deadline = window.percentile(0.99) * self.multiplier
+            backoff = self._backoffs.get(endpoint)
+            if backoff is not None:
+                deadline = max(deadline, backoff[0])
+            return max(self.floor, min(self.ceiling, deadline))
+
+    def hedge_after(self, endpoint: str) -> Optional[float]:
+        """두 번째 요청을 보내기 전 기다릴 시간 (초) - hedge가 꺼져 있거나 표본이 모자라면 None"""
+        if not self.hedge:
+            return None
+        with self._lock:
+            window = self._window(endpoint)
+            if len(window) < self.min_samples:
+                return None
+            return max(MIN_HEDGE_DELAY, window.percentile(0.95))
+
+    def snapshot(self) -> Dict[str, dict]:
+        """엔드포인트별 {'samples', 'p50', 'p95', 'p99'} (초)"""
+        with self._lock:
+            return {endpoint: {'samples': len(window), 'p50': window.percentile(0.5),
+                               'p95': window.percentile(0.95), 'p99': window.percentile(0.99)}
+                    for endpoint, window in self._windows.items()}
+
+    def _timed(self, endpoint: str, send: Callable[[float], T], timeout: float) -> Callable[[], T]:
+        def run() -> T:
+            started = time.perf_counter()
+            try:
+                result = send(timeout)
+            except (requests.Timeout, TimeoutError):
+                self._timed_out(endpoint, timeout)
+                raise
+            self.observe(endpoint, time.perf_counter() - started)
+            return result
+        return run
+
+    def call(self, endpoint: str, send: Callable[[float], T],
+             may_hedge: Callable[[], bool] = None, timeout: float = None) -> T:
+        """send(타임아웃)으로 요청하고 응답 시간 기록 - hedge가 켜져 있으면 늦을 때 하나 더 보냄
+
+        timeout을 주면 관측값 대신 그 타임아웃을 씁니다.
+        두 번째 요청은 may_hedge()가 True일 때만 보내며, 둘 다 실패하면 첫 요청의 예외를 올립니다.
+        """
+        run = self._timed(endpoint, send, timeout or self.timeout(endpoint))
+        hedge_after = self.hedge_after(endpoint) if may_hedge is not None else None
+        if hedge_after is None:
+            return run()
+
+        pool = self._hedge_pool()
+        first = pool.submit(run)
+        if wait([first], timeout=hedge_after).done or not may_hedge():
+            return first.result()
+        with self._lock:
+            self.hedges += 1
+        second = pool.submit(run)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        return first.result()
+
+    async def call_async(self, endpoint: str, send: Callable[[float], Awaitable[T]],
+                         may_hedge: Callable[[], Awaitable[bool]] = None, timeout: float = None) -> T:
+        """call의 asyncio 버전 - 늦게 끝난 쪽 요청은 취소"""
+        timeout = timeout or self.timeout(endpoint)
+
+        async def run() -> T:
+            started = time.perf_counter()
+            try:
+                result = await send(timeout)
+            except TimeoutError:
+                self._timed_out(endpoint, timeout)
+                raise
+            self.observe(endpoint, time.perf_counter() - started)
+            return result
+
+        hedge_after = self.hedge_after(endpoint) if may_hedge is not None else None
+        if hedge_after is None:
+            return await run()
+
+        tasks = [asyncio.ensure_future(run())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done or not await may_hedge():
+                return await tasks[0]
+            with self._lock:
+                self.hedges += 1
+            tasks.append(asyncio.ensure_future(run()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+        return self._pool
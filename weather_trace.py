@@ -0,0 +1,289 @@
+# weather_trace.py - 익명 세션 이벤트 기록 (opt-in) + 기록 재생
+#
+# WEATHER_TRACE_FILE=.cache/weather_trace.jsonl 로 앱을 실행하면 main()이 세션별 이벤트를
+# 파일 끝에 한 줄씩 덧붙입니다 (설정하지 않으면 아무것도 기록하지 않음). 한 줄은 JSON 배열:
+#
+#   [시각(초), 세션, 이벤트, 도시 또는 탭, 캐시]
+#   [1760651234.512,"9f2c41ab","city","Tokyo","miss"]
+#
+# 세션은 세션마다 새로 뽑은 임의 토큰이며 API 키, IP, Streamlit 세션 ID는 남기지 않습니다.
+# 이벤트: start(첫 화면) / city(도시 선택) / refresh(새로고침) / tab(탭 전환)
+# 캐시: 그 화면의 관측값이 hit(TTL 안) / stale(만료, 백그라운드 갱신) / miss(업스트림 조회) / demo
+# 탭 전환은 브라우저 안에서만 일어나므로 상태를 가진 탭(st.tabs on_change, streamlit 1.50+)이
+# 있을 때만 기록되며, 기록 중에는 탭 전환마다 재실행이 한 번 생깁니다.
+#
+# 요약: python weather_trace.py summary .cache/weather_trace.jsonl
+# 재생: python weather_trace.py replay .cache/weather_trace.jsonl --speed 10 --env WEATHER_CACHE_TTL=600
+#   기록된 세션마다 앱 서버(streamlit run, 업스트림은 stub_server.py 대역 서버)에 웹소켓 세션을
+#   열고 같은 간격(÷speed)으로 같은 동작을 보냅니다. 캐시/프리페치 정책(CACHE_POLICY)은 speed
+#   배만큼 줄여 넘기므로 빠르게 재생해도 만료 시점이 기록과 맞습니다. 정책을 바꿔 가며 같은
+#   기록에서 업스트림 호출 수, 캐시 적중률, 재실행 지연을 비교하세요.
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+EVENTS = ("start", "city", "refresh", "tab")
+CACHE_STATES = ("hit", "stale", "miss", "demo")
+DEFAULT_TRACE = ".cache/weather_trace.jsonl"
+DEFAULT_OUTPUT = ".cache/replay_results.json"
+
+
+class TraceEvent(NamedTuple):
+    t: float
+    session: str
+    event: str
+    value: str
+    cache: Optional[str]
+
+
+class TraceRecorder:
+    """추가 전용 이벤트 파일 (프로세스 공유) - 이벤트마다 한 줄을 바로 씀"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def record(self, session: str, event: str, value: str, cache: Optional[str] = None):
+        line = json.dumps([round(time.time(), 3), session, event, value, cache],
+                          ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def create_recorder() -> Optional[TraceRecorder]:
+    """WEATHER_TRACE_FILE이 있으면 그 경로의 기록기 (없으면 None - 기록 안 함)"""
+    path = os.environ.get("WEATHER_TRACE_FILE")
+    if not path:
+        return None
+    try:
+        return TraceRecorder(path)
+    except OSError:
+        return None
+
+
+def new_session_id() -> str:
+    """세션 토큰 - 다른 어떤 식별자와도 연결되지 않는 임의 값"""
+    return secrets.token_hex(4)
+
+
+def read_trace(path: str) -> Iterator[TraceEvent]:
+    """기록 파일 읽기 (쓰다 만 마지막 줄 등 깨진 줄은 건너뜀)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                t, session, event, value, cache = json.loads(line)
+            except ValueError:
+                continue
+            if event in EVENTS:
+                yield TraceEvent(float(t), session, event, value, cache)
+
+
+def summarize(events: List[TraceEvent]) -> dict:
+    """세션/이벤트/도시/캐시 상태 개수와 캐시 적중률"""
+    if not events:
+        return {'sessions': 0, 'events': 0}
+    cache = Counter(e.cache for e in events if e.cache)
+    looked_up = sum(cache.values())
+    return {
+        'sessions': len({e.session for e in events}),
+        'events': len(events),
+        'duration_s': round(max(e.t for e in events) - min(e.t for e in events), 1),
+        'by_event': dict(Counter(e.event for e in events)),
+        'top_cities': dict(Counter(e.value for e in events if e.event in ("start", "city")).most_common(10)),
+        'cache': {state: cache[state] for state in CACHE_STATES if cache[state]},
+        'hit_ratio': round((cache["hit"] + cache["stale"]) / looked_up, 3) if looked_up else None,
+    }
+
+
+def print_summary(title: str, summary: dict):
+    print(f"{title}: 세션 {summary['sessions']}개, 이벤트 {summary['events']}개"
+          + (f", {summary['duration_s']:.0f}초" if summary.get('duration_s') is not None else ""))
+    if summary['events']:
+        print(f"  이벤트: {summary['by_event']}")
+        print(f"  캐시: {summary['cache']} (적중률 {summary['hit_ratio']})")
+
+
+def scaled_policy(speed: float, overrides: Dict[str, str]) -> Dict[str, str]:
+    """캐시/프리페치 정책 환경 변수를 speed배 빠른 시간에 맞게 줄인 값"""
+    from weather_service import CACHE_POLICY
+
+    return {name: f"{float(overrides.get(name, default)) / speed:g}" for name, default in CACHE_POLICY.items()}
+
+
+async def replay_session(host: str, port: int, events: List[TraceEvent], t0: float, started: float,
+                         speed: float, samples: Dict[str, List[float]], lag: List[float], errors: Counter):
+    """기록된 세션 하나를 같은 간격(÷speed)으로 재생"""
+    from weather_loadtest import Session, WebSocket
+
+    async def until(t: float):
+        delay = started + (t - t0) / speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lag.append(max(0.0, -delay))
+
+    await until(events[0].t)
+    try:
+        ws = await WebSocket.connect(host, port, "/_stcore/stream")
+    except (ConnectionError, OSError) as e:
+        errors[type(e).__name__] += 1
+        return
+    session = Session(ws)
+    try:
+        for event in events:
+            await until(event.t)
+            if event.event == "start":
+                samples["start"].append(await session.rerun())
+                if event.value != session.city:
+                    session.city = event.value
+                    samples["start"].append(await session.rerun(changed=session.selectbox_id))
+            elif event.event == "city":
+                session.city = event.value
+                samples["city"].append(await session.rerun(changed=session.selectbox_id))
+            elif event.event == "refresh" and session.refresh_id:
+                samples["refresh"].append(await session.rerun(trigger=session.refresh_id))
+            elif event.event == "tab" and session.tabs_id:
+                session.tab = event.value
+                samples["tab"].append(await session.rerun(changed=session.tabs_id))
+    except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, RuntimeError) as e:
+        errors[type(e).__name__] += 1
+    finally:
+        await ws.close()
+
+
+def replay(path: str, speed: float = 1.0, env: Dict[str, str] = None, faults=None,
+           max_sessions: int = 0) -> dict:
+    """기록을 앱 서버 + 대역 서버에 재생하고 {'recorded', 'replayed', ...} 반환
+
+    재생 중 앱 서버도 기록을 남기게 해서(임시 파일) 같은 동작의 캐시 상태를 기록과 비교합니다.
+    """
+    from stub_server import start_stub_server
+    from weather_loadtest import ServerProcess, _percentile
+
+    events = sorted(read_trace(path))
+    sessions: Dict[str, List[TraceEvent]] = defaultdict(list)
+    for event in events:
+        sessions[event.session].append(event)
+    if max_sessions:
+        keep = set(list(sessions)[:max_sessions])
+        sessions = {session: evs for session, evs in sessions.items() if session in keep}
+        events = [event for event in events if event.session in keep]
+    if not events:
+        raise ValueError(f"재생할 이벤트가 없습니다: {path}")
+
+    replay_trace = tempfile.NamedTemporaryFile(prefix="weather-replay-", suffix=".jsonl", delete=False).name
+    env = env or {}
+    server_env = {
+        "OPENWEATHER_CALLS_PER_MINUTE": "100000",
+        **env,
+        **scaled_policy(speed, env),
+        "WEATHER_TRACE_FILE": replay_trace,
+        "WEATHER_CACHE_DB": "",
+    }
+    stub = start_stub_server(faults=faults)
+    server = ServerProcess(stub.base_url, server_env)
+    samples: Dict[str, List[float]] = {event: [] for event in EVENTS}
+    lag: List[float] = []
+    errors: Counter = Counter()
+    try:
+        server.wait_ready()
+        t0 = events[0].t
+        cpu_before = server.cpu_seconds()
+
+        async def drive():
+            started = time.monotonic() + 1
+            await asyncio.gather(*(
+                replay_session("127.0.0.1", server.port, evs, t0, started, speed, samples, lag, errors)
+                for evs in sessions.values()))
+
+        wall_before = time.monotonic()
+        asyncio.run(drive())
+        wall = time.monotonic() - wall_before
+        cpu = server.cpu_seconds() - cpu_before
+        memory = server.memory()
+    finally:
+        server.stop()
+        stub.shutdown()
+
+    replayed = list(read_trace(replay_trace))
+    os.unlink(replay_trace)
+    reruns = [sample for values in samples.values() for sample in values]
+    lag.sort()
+    return {
+        'speed': speed,
+        'policy': server_env,
+        'recorded': summarize(events),
+        'replayed': summarize(replayed),
+        'wall_s': round(wall, 1),
+        'reruns': len(reruns),
+        'latency_ms': {f"p{int(q * 100)}": _percentile(reruns, q) for q in (0.5, 0.95, 0.99)},
+        'latency_ms_by_event': {event: {f"p{int(q * 100)}": _percentile(values, q) for q in (0.5, 0.95)}
+                                for event, values in samples.items() if values},
+        'schedule_lag_ms_p95': round(lag[int(len(lag) * 0.95)] * 1000, 1) if lag else None,
+        'upstream_calls': dict(stub.hits),
+        'upstream_faults': dict(stub.faults_injected),
+        'server_cpu_s': round(cpu, 2),
+        'server_rss_mb': {key: round(value, 1) for key, value in memory.items()},
+        'errors': dict(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사용 기록 요약/재생")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summary = commands.add_parser("summary", help="기록 요약")
+    summary.add_argument("trace", nargs="?", default=DEFAULT_TRACE)
+
+    run = commands.add_parser("replay", help="기록을 앱 서버 + 대역 서버에 재생")
+    run.add_argument("trace", nargs="?", default=DEFAULT_TRACE)
+    run.add_argument("--speed", type=float, default=1.0, help="재생 속도 배수 (1 = 기록과 같은 간격)")
+    run.add_argument("--sessions", type=int, default=0, help="재생할 최대 세션 수 (0 = 전부)")
+    run.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                     help="앱 서버 환경 변수 (예: WEATHER_CACHE_TTL=600), 여러 번 지정 가능")
+    run.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 경로")
+    from stub_server import add_fault_arguments, faults_from_args
+    add_fault_arguments(run)
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        print_summary(args.trace, summarize(list(read_trace(args.trace))))
+        return
+
+    env = dict(item.split("=", 1) for item in args.env)
+    result = replay(args.trace, speed=args.speed, env=env, faults=faults_from_args(args),
+                    max_sessions=args.sessions)
+    print_summary("기록", result['recorded'])
+    print_summary(f"재생 ({args.speed:g}배속, {result['wall_s']:.0f}초)", result['replayed'])
+    latency = result['latency_ms']
+    print(f"재실행 {result['reruns']}번: p50 {latency['p50']}ms, p95 {latency['p95']}ms, p99 {latency['p99']}ms "
+          f"(일정 지연 p95 {result['schedule_lag_ms_p95']}ms)")
+    print(f"업스트림 호출: {result['upstream_calls']}, 서버 CPU {result['server_cpu_s']}초, "
+          f"RSS {result['server_rss_mb']['peak']:.0f}MB")
+    if result['errors']:
+        print(f"⚠️ 오류: {result['errors']}")
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"📄 결과: {args.output}")
+
+
+if __name__ == "__main__":
+    main()